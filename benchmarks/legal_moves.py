@@ -0,0 +1,71 @@
+'''
+Benchmark of the legal moves generation over a fixed set of positions
+Run it with `python benchmarks/legal_moves.py` (the package must be installed or in the PYTHONPATH)
+Add `--bitboards` to run it with Boards keeping bitboards
+
+Boards cache their moves until the position changes, so :func:`legal_moves_by_board` clears the cache at each repetition
+and :func:`legal_moves_cached` shows the cost of a repeated call in the same turn
+'''
+import sys
+from time import perf_counter
+from pygame_chess_api.api import Board
+
+#positions are reached from the start position by playing these moves (ex: "e2e4" moves the piece at e2 to e4)
+POSITIONS = {
+    "start position": (),
+    "italian game": ("e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "f8c5"),
+    "both sides can castle": ("e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "d2d3", "f8c5", "c1g5", "d7d6", "b1c3", "c8g4"),
+    "en passant available": ("e2e4", "a7a6", "e4e5", "d7d5"),
+    "queen's gambit declined": ("d2d4", "d7d5", "c2c4", "e7e6", "b1c3", "g8f6", "c1g5", "f8e7", "e2e3", "e8g8", "g1f3", "b8d7"),
+    "in check": ("e2e4", "d7d5", "f1b5"),
+}
+REPETITIONS = 20
+
+
+def square_to_pos(square:str) -> tuple:
+    return ("abcdefgh".index(square[0]), 8 - int(square[1]))
+
+
+def board_from_moves(moves, use_bitboards=False) -> Board:
+    board = Board(verbose=0, use_bitboards=use_bitboards)
+    for move in moves:
+        piece = board.get_piece_by_pos(square_to_pos(move[:2]))
+        if piece is None or board.move_piece(piece, square_to_pos(move[2:4])) is None:
+            raise ValueError(f"Illegal move {move} in benchmark position")
+    return board
+
+
+def legal_moves_by_piece(board:Board) -> list:
+    moves = []
+    for piece in tuple(board.pieces_by_color[board.cur_color_turn]):
+        moves += piece.get_moves_allowed()
+    return moves
+
+
+def legal_moves_by_board(board:Board) -> list:
+    board.clear_moves_cache()
+    return board.legal_moves()
+
+
+def legal_moves_cached(board:Board) -> list:
+    return board.legal_moves()
+
+
+def run(use_bitboards=False):
+    for generation_function in (legal_moves_by_piece, legal_moves_by_board, legal_moves_cached):
+        print(f"with {generation_function.__name__}:")
+        total_time = 0
+        for name, moves in POSITIONS.items():
+            board = board_from_moves(moves, use_bitboards)
+            board.legal_moves() #fills the cache for legal_moves_cached
+            t_start = perf_counter()
+            for _ in range(REPETITIONS):
+                moves_count = len(generation_function(board))
+            elapsed = perf_counter() - t_start
+            total_time += elapsed
+            print(f"{name:<28} {moves_count:>3} moves  {elapsed / REPETITIONS * 1000:8.3f} ms per generation")
+        print(f"{'total':<28} {'':>9}  {total_time / REPETITIONS * 1000:8.3f} ms per generation of all positions")
+
+
+if __name__ == "__main__":
+    run(use_bitboards="--bitboards" in sys.argv)
@@ -0,0 +1,38 @@
+'''
+Benchmark of the parallel search against the serial Engine over the reference positions (same depth, no time budget)
+Run it with `python benchmarks/parallel.py [depth] [processes]` (the package must be installed or in the PYTHONPATH)
+
+The nodes ratio shows the extra work of the parallel search (processes don't share their transposition tables),
+the speedup can only be above 1 with several CPU cores
+'''
+import sys
+from os import cpu_count
+from time import perf_counter
+from pygame_chess_api.api import Board
+from pygame_chess_api.engine import Engine
+from pygame_chess_api.parallel import ParallelEngine
+from pygame_chess_api.perft import REFERENCE_POSITIONS, move_to_text
+
+
+def run(depth=3, processes=None):
+    print(f"depth {depth}, {processes or cpu_count()} processes, {cpu_count()} CPUs")
+    total_times = [0, 0]
+    with ParallelEngine(max_depth=depth, processes=processes, verbose=0) as parallel_engine:
+        parallel_engine.search(Board(verbose=0), max_depth=1) #starts the processes
+        for name, (fen, expected) in REFERENCE_POSITIONS.items():
+            results = []
+            for i, engine in enumerate((Engine(max_depth=depth, verbose=0), parallel_engine)):
+                t_start = perf_counter()
+                move = engine.search(Board.from_fen(fen, verbose=0))
+                elapsed = perf_counter() - t_start
+                total_times[i] += elapsed
+                results.append((move_to_text(move), engine.last_search_info["score"], engine.last_search_info["nodes"], elapsed))
+            (serial_move, serial_score, serial_nodes, serial_time), (parallel_move, parallel_score, parallel_nodes, parallel_time) = results
+            print(f"{name:<16} serial: {serial_move} {serial_score:>6} {serial_nodes:>7} nodes {serial_time:6.2f} s | "
+                f"parallel: {parallel_move} {parallel_score:>6} {parallel_nodes:>7} nodes {parallel_time:6.2f} s | "
+                f"nodes x{parallel_nodes / serial_nodes:.2f}, speedup x{serial_time / parallel_time:.2f}")
+    print(f"total: serial {total_times[0]:.2f} s, parallel {total_times[1]:.2f} s, speedup x{total_times[0] / total_times[1]:.2f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3, int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,13 @@
+'''
+Perft benchmark and correctness check of the moves generation over the reference positions
+Run it with `python benchmarks/perft.py [max_depth] [max_nodes]` (the package must be installed or in the PYTHONPATH)
+'''
+import sys
+import logging
+from pygame_chess_api.perft import run_benchmark
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    max_nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    sys.exit(0 if run_benchmark(max_depth, max_nodes) else 1)
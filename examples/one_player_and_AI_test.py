@@ -1,3 +1,4 @@
+import logging
 import pygame
 from pygame_chess_api.api import Board, Piece, Bishop
 from pygame_chess_api.render import Gui
@@ -18,6 +19,7 @@ def random_function_for_ai(board:Board):
     random_piece.move(random_move)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s") #shows the messages of the objs with verbose >= 1
     pygame.init()
     
     board = Board()
@@ -0,0 +1,14 @@
+import logging
+import pygame
+from pygame_chess_api.api import Board, Piece
+from pygame_chess_api.render import Gui
+from pygame_chess_api.engine import Engine
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s") #shows the messages of the objs with verbose >= 1
+    pygame.init()
+    
+    board = Board()
+    engine = Engine(max_depth=4, time_budget=2) #the engine will search at most 2 seconds per move
+    gui = Gui(board, (Piece.WHITE,))
+    gui.run_pygame_loop(engine)
@@ -1,6 +1,7 @@
+import logging
 from time import time
-from math import sqrt
 from warnings import warn
+from random import Random
 
 '''
 French pieces' name to english:
@@ -13,6 +14,16 @@ French pieces' name to english:
 '''
 
 
+package_logger = logging.getLogger("pygame_chess_api")
+'''
+| Parent logger of the package's modules: the messages of objs with verbose >= 1 are logged at the INFO level (DEBUG for verbose >= 2, WARNING for warnings)
+| Like for any library, nothing is shown until the application configures logging, like with `logging.basicConfig(level=logging.INFO, format="%(message)s")`
+'''
+if not package_logger.handlers: #the module can be imported twice (as api and as pygame_chess_api.api)
+    package_logger.addHandler(logging.NullHandler())
+logger = logging.getLogger("pygame_chess_api.api")
+
+
 class Move:
     '''Moves will be initiated when getting piece's allowed moves, they can also be used as argument to move a piece
     There is different types of moves'''
@@ -35,6 +46,11 @@ class Move:
     '''For SPECIAL_MOVE'''
     TO_PROMOTE_TYPE = 3
     '''special_type if it's a Pawn promotion move. Be careful, the Move type won't be SPECIAL_MOVE for promotions. To specify promotion, refer to :class:`Pawn`'''
+    FORBIDDEN_SENTINEL = None #will be set after the class
+    '''Shared FORBIDDEN_MOVE returned for every forbidden case (its piece is None), to avoid creating a Move for each one'''
+    LEADING_TO_CHECK_SENTINEL = None
+    '''Shared LEADING_TO_CHECK_SITUATION_MOVE (its piece is None)'''
+    __slots__ = ("type", "piece", "target", "special_type")
     def __init__(self, type: int, piece, target:tuple, special_type=None):
         self.type = type
         '''Move's type (int)'''
@@ -47,6 +63,29 @@ class Move:
     
     def copy(self, new_piece):
         return self.__class__(self.type, new_piece, self.target, self.special_type)
+    
+    def encode(self) -> int:
+        '''
+        | Packs the move in an int: piece's case (bits 0-5), target case (bits 6-11), type (bits 12-14), special_type (bits 15-16)
+        | and for promotions the Pawn's promote_class_wanted (bits 17-19), a case being `y*8 + x`
+        | Use :meth:`decode` to get the Move back
+        '''
+        pos, target = self.piece.pos, self.target
+        code = pos[1]*8 + pos[0] | (target[1]*8 + target[0]) << 6 | self.type << 12
+        if self.special_type is not None:
+            code |= self.special_type << 15
+            if self.special_type == self.TO_PROMOTE_TYPE:
+                code |= _PROMOTE_CLASS_TO_CODE.get(self.piece.promote_class_wanted, 0) << 17
+        return code
+    
+    @classmethod
+    def decode(cls, code:int, board):
+        '''Creates the Move packed by :meth:`encode` for the piece of board at the encoded case (a promoting Pawn gets its promote_class_wanted set)'''
+        piece = board.pieces_by_pos[(code & 7, code >> 3 & 7)]
+        special_type = code >> 15 & 3
+        if special_type == cls.TO_PROMOTE_TYPE and code >> 17 & 7:
+            piece.promote_class_wanted = _CODE_TO_PROMOTE_CLASS[code >> 17 & 7]
+        return cls(code >> 12 & 7, piece, (code >> 6 & 7, code >> 9 & 7), special_type if special_type else None)
 
     @property
     def allowed(self):
@@ -59,17 +98,22 @@ class Move:
     def __str__(self):
         return f"Move of piece {self.piece} to {self.target} type : {self.type}, special_type: {self.special_type}"
 
+Move.FORBIDDEN_SENTINEL = Move(Move.FORBIDDEN_MOVE, None, (-1, -1))
+Move.LEADING_TO_CHECK_SENTINEL = Move(Move.LEADING_TO_CHECK_SITUATION_MOVE, None, (-1, -1))
+
 
 class Piece:
     '''Base class for pieces'''
     WHITE_TEXTURE, BLACK_TEXTURE = None, None #will be used only in children
     SCORE_VALUE = 0 #will be used in children
+    PIECE_SQUARE_TABLE = (0,) * 64 #will be used in children
     WHITE, BLACK = 0, 1
     INT_COLOR_TO_TEXT = {0: "White", 1: "Black"}
     DIAGONALS_VECTORS = ((-1, -1), (1, -1), (-1, 1), (1, 1))
     LINES_VECTORS = ((0, -1), (0, 1), (-1, 0), (1, 0))
     KNIGHT_VECTOR = ((1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2))
     COLLISION_MOVES = (Move.KILL_MOVE, Move.OVER_CHECK_MOVE, Move.FORBIDDEN_MOVE)
+    __slots__ = ("color", "pos", "board", "invicible", "has_already_moved") #children must declare __slots__ too
     def __init__(self, color: int, pos: tuple, board):
         self.color = color
         ''''''
@@ -88,17 +132,7 @@ class Piece:
         '''To test if this specific case is currently allowed for the piece'''
         for c in case_pos:
             if c < 0 or c > 7:
-                return Move(Move.FORBIDDEN_MOVE, self, (-1, -1))
-        
-        def verify_check(skip_check_verification):
-            if skip_check_verification: #for hypothesis, to avoid recursive errors
-                return None
-            #we check for each movement if it will make the piece's color's Check in check
-            #print("checking for", self, "target:", case_pos, self.board.cur_color_turn)
-            hypo_board = self.board.create_hypothesis_board(pieces_with_pos_to_change={self: case_pos})
-            if self.board.check_pieces[self.board.cur_color_turn].in_check_situation(hypothesis=hypo_board):
-                return Move(Move.LEADING_TO_CHECK_SITUATION_MOVE, self, (-1, -1)) #not allowed because would be in check situation
-            return None
+                return Move.FORBIDDEN_SENTINEL
         
         to_promotion_pawn = (isinstance(self, Pawn) and ((self.color == self.WHITE and case_pos[1] == 0) or (self.color == self.BLACK and case_pos[1] == 7)))
         special_type = Move.TO_PROMOTE_TYPE if to_promotion_pawn else None
@@ -107,19 +141,53 @@ class Piece:
             cur_piece = self.board.pieces_by_pos[case_pos]
             if cur_piece.color != self.color and this_move_can_kill:
                 if cur_piece.invicible == False: #invicible means that this is a Check piece
-                    verification = verify_check(skip_check_verification)
-                    if verification: return verification
-                    return Move(Move.KILL_MOVE, self, case_pos,  special_type=special_type) #there is collision
+                    move = Move(Move.KILL_MOVE, self, case_pos,  special_type=special_type) #there is collision
                 else:
-                    verification = verify_check(skip_check_verification)
-                    if verification: return verification
-                    return Move(Move.OVER_CHECK_MOVE, self, case_pos) #over a Check piece (used only in hypothesis)
+                    move = Move(Move.OVER_CHECK_MOVE, self, case_pos) #over a Check piece (used only in hypothesis)
             else:
-                return Move(Move.FORBIDDEN_MOVE, self, (-1, -1)) #not allowed and collision
+                return Move.FORBIDDEN_SENTINEL #not allowed and collision
         else:
-            verification = verify_check(skip_check_verification)
-            if verification: return verification
-            return Move(Move.TO_EMPTY_MOVE, self, case_pos, special_type=special_type) #no collision
+            move = Move(Move.TO_EMPTY_MOVE, self, case_pos, special_type=special_type) #no collision
+        
+        #we check for each movement if it will make the piece's color's Check in check (skipped for hypothesis, to avoid recursive errors)
+        if not skip_check_verification and self.board.is_leading_to_check(move):
+            return Move.LEADING_TO_CHECK_SENTINEL #not allowed because would be in check situation
+        return move
+
+    def iter_moves_allowed(self, skip_check_verification=False):
+        '''
+        | Generator variant of :meth:`get_moves_allowed`, the same moves are yielded lazily and cheap ones first: captures, then moves to empty cases (castlings last)
+        | Stopping the iteration early skips the verification of the remaining moves, like when only captures are wanted (stop at the first TO_EMPTY_MOVE)
+        | The board must be in the same position each time a move is asked (a yielded move can be played then unmade before asking the next one)
+        '''
+        pieces_by_pos = self.board.pieces_by_pos
+        empty_cases = []
+        for case_pos in self._target_cases():
+            target_piece = pieces_by_pos.get(case_pos)
+            if target_piece is None:
+                empty_cases.append(case_pos)
+            elif target_piece.color != self.color:
+                move = self.case_allowed(case_pos, skip_check_verification=skip_check_verification)
+                if move.allowed:
+                    yield move
+        for case_pos in empty_cases:
+            move = self.case_allowed(case_pos, skip_check_verification=skip_check_verification)
+            if move.allowed:
+                yield move
+
+    def _target_cases(self):
+        '''Cases the piece could go to (or kill on) without considering the Check, used by :meth:`iter_moves_allowed`'''
+        return () #will be overrided in children
+
+    def _target_cases_in_rays(self, rays) -> list:
+        cases = []
+        pieces_by_pos = self.board.pieces_by_pos
+        for ray in rays:
+            for cur_pos in ray:
+                cases.append(cur_pos)
+                if cur_pos in pieces_by_pos: #collision
+                    break
+        return cases
 
     def cases_allowed_around(self, skip_check_verification=False):
         cases_around_list = []
@@ -131,29 +199,22 @@ class Piece:
         return cases_around_list
     
     def cases_allowed_in_diagonals(self, skip_check_verification=False):
-        cases_allowed_list = []
-        for vector in self.DIAGONALS_VECTORS: #4 directions of diagonals
-            cur_pos = tuple([self.pos[i] + vector[i] for i in range(2)])
-            cur_move = self.case_allowed(cur_pos, skip_check_verification=skip_check_verification)
-            while cur_move.type not in self.COLLISION_MOVES: #no collision
-                if cur_move.allowed: cases_allowed_list.append(cur_move)
-                cur_pos = tuple([cur_pos[i] + vector[i] for i in range(2)])
-                cur_move = self.case_allowed(cur_pos, skip_check_verification=skip_check_verification)
-            if cur_move.allowed: #to detect in check situations and killing
-                cases_allowed_list.append(cur_move)
-        return cases_allowed_list
+        return self._cases_allowed_in_rays(_DIAGONALS_RAYS[self.pos], skip_check_verification) #4 directions of diagonals
     
     def cases_allowed_in_line(self, skip_check_verification=False): #like for rooks
+        return self._cases_allowed_in_rays(_LINES_RAYS[self.pos], skip_check_verification) #4 directions of lines
+    
+    def _cases_allowed_in_rays(self, rays, skip_check_verification=False):
+        #rays are precomputed cases from the piece's pos to the board's edge in each direction
         cases_allowed_list = []
-        for vector in self.LINES_VECTORS: #4 directions of lines
-            cur_pos = tuple([self.pos[i] + vector[i] for i in range(2)])
-            cur_move = self.case_allowed(cur_pos, skip_check_verification=skip_check_verification)
-            while cur_move.type not in self.COLLISION_MOVES: #no collision
-                if cur_move.allowed: cases_allowed_list.append(cur_move)
-                cur_pos = tuple([cur_pos[i] + vector[i] for i in range(2)])
+        pieces_by_pos = self.board.pieces_by_pos
+        for ray in rays:
+            for cur_pos in ray:
                 cur_move = self.case_allowed(cur_pos, skip_check_verification=skip_check_verification)
-            if cur_move.allowed: #to detect in check situations and killing
-                cases_allowed_list.append(cur_move)
+                if cur_move.allowed: #also to detect in check situations and killing
+                    cases_allowed_list.append(cur_move)
+                if cur_pos in pieces_by_pos: #collision (even if killing this piece would lead to check)
+                    break
         return cases_allowed_list
     
     def cases_allowed_for_knight(self, skip_check_verification=False):
@@ -174,7 +235,9 @@ class Piece:
         return self.WHITE_TEXTURE if self.color == 0 else self.BLACK_TEXTURE
     
     def copy(self, new_board):
-        return self.__class__(self.color, self.pos, new_board)
+        piece_copy = self.__class__(self.color, self.pos, new_board)
+        piece_copy.has_already_moved = self.has_already_moved
+        return piece_copy
     
     def __str__(self):
         return f"{self.INT_COLOR_TO_TEXT[self.color]} {self.NAME} at pos {self.pos}"
@@ -184,16 +247,41 @@ class Rook(Piece):
     NAME = "Rook"
     SCORE_VALUE = 5
     '''Value for score evaluation'''
+    PIECE_SQUARE_TABLE = (
+         0,  0,  0,  0,  0,  0,  0,  0,
+         5, 10, 10, 10, 10, 10, 10,  5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+         0,  0,  0,  5,  5,  0,  0,  0)
+    '''Bonus (in hundredths of a Pawn) for a White piece at each case `y*8 + x`, the table is mirrored for Black pieces'''
+    __slots__ = ()
     def __init__(self, color, pos: tuple, board):
         super().__init__(color, pos, board)
     
     def get_moves_allowed(self, skip_check_verification=False): #returns every move allowed
         return self.cases_allowed_in_line(skip_check_verification)
 
+    def _target_cases(self):
+        return self._target_cases_in_rays(_LINES_RAYS[self.pos])
+
 class Check(Piece):
     '''Class for Checks, please refer to :class:`Piece`'''
     NAME = "Check"
     IN_CHECK_TEXTURE = None
+    PIECE_SQUARE_TABLE = (
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -20,-30,-30,-40,-40,-30,-30,-20,
+        -10,-20,-20,-20,-20,-20,-20,-10,
+         20, 20,  0,  0,  0,  0, 20, 20,
+         20, 30, 10,  0,  0, 10, 30, 20)
+    '''Bonus (in hundredths of a Pawn) for a White piece at each case `y*8 + x`, the table is mirrored for Black pieces'''
+    __slots__ = ("currently_in_check",)
     def __init__(self, color, pos: tuple, board):
         super().__init__(color, pos, board)
         self.invicible = True
@@ -202,96 +290,145 @@ class Check(Piece):
     def in_check_situation(self, hypothesis=None) -> bool:
         '''Detects if this Check is "in check"'''
         if hypothesis:
-            #we create hypothesis to know if some piece could "kill" this Check piece, meaning that we would be in a check situation
             board = hypothesis
             self_in_hypothesis = board.check_pieces[self.color]
         else:
             board = self.board
             self_in_hypothesis = self
         
-        if self.board.hypothesis_board:print("in_check_situation with self hypothesis board")
-        
-        for piece in board.pieces_by_pos.values():
-            if piece.color != self.color:
-                if piece.invicible: #to avoid recursive erros
-                    if sqrt((self_in_hypothesis.pos[0] - piece.pos[0])**2 + (self_in_hypothesis.pos[1] - piece.pos[1])**2) < 2:
-                        #both Checks are too close, this should be impossible (obviously it will only happen in hypothesis)
-                        return True
-                else:
-                    for move in piece.get_moves_allowed(skip_check_verification=True):
-                        if move.type == Move.OVER_CHECK_MOVE:
-                            return True
-
-        return False
+        return board.is_square_attacked(self_in_hypothesis.pos, 1 - self.color)
 
     def get_moves_allowed(self, skip_check_verification=False): #returns every move allowed
-        moves_around = self.cases_allowed_around(skip_check_verification)
+        return self.cases_allowed_around(skip_check_verification) + self._castling_moves(skip_check_verification)
+
+    def iter_moves_allowed(self, skip_check_verification=False):
+        yield from super().iter_moves_allowed(skip_check_verification)
+        yield from self._castling_moves(skip_check_verification)
 
-        if not self.has_already_moved:
+    def _target_cases(self):
+        return _CASES_AROUND[self.pos]
+
+    def _castling_moves(self, skip_check_verification=False) -> list:
+        castling_moves = []
+        #castling isn't allowed if the Check is currently in check, nor if it passes over an attacked case
+        if not self.has_already_moved and (skip_check_verification or not self.in_check_situation()):
+            opponent_color = 1 - self.color
             #little castling
             little_castling_free_pos_needed = [(self.pos[0]+i, self.pos[1]) for i in range(1, 3)]
             pos_little_castling_are_free = True
             for cur_pos in little_castling_free_pos_needed:
-                if cur_pos in self.board.pieces_by_pos or (not skip_check_verification and self.in_check_situation(self.board.create_hypothesis_board({self:cur_pos}))):
+                if cur_pos in self.board.pieces_by_pos or (not skip_check_verification and self.board.is_square_attacked(cur_pos, opponent_color)):
                     pos_little_castling_are_free = False
+                    break
             
-            piece_at_rook_needed_pos = self.board.pieces_by_pos[(self.pos[0]+3, self.pos[1])] if (self.pos[0]+3, self.pos[1]) in self.board.pieces_by_pos else None
-            if pos_little_castling_are_free and type(piece_at_rook_needed_pos) == Rook and not piece_at_rook_needed_pos.has_already_moved:
-                if skip_check_verification or not self.in_check_situation(self.board.create_hypothesis_board({self:(self.pos[0]+2, self.pos[1])})):
-                    moves_around.append(Move(Move.SPECIAL_MOVE, self, (self.pos[0]+2, self.pos[1]), Move.CASTLING_TYPE))
+            piece_at_rook_needed_pos = self.board.get_piece_by_pos((self.pos[0]+3, self.pos[1]))
+            if pos_little_castling_are_free and type(piece_at_rook_needed_pos) == Rook and piece_at_rook_needed_pos.color == self.color and not piece_at_rook_needed_pos.has_already_moved:
+                castling_moves.append(Move(Move.SPECIAL_MOVE, self, (self.pos[0]+2, self.pos[1]), Move.CASTLING_TYPE))
             
-            #big castling
+            #big castling, the third case must be free but it can be attacked
             big_castling_free_pos_needed = [(self.pos[0]-i, self.pos[1]) for i in range(1, 4)]
             pos_big_castling_are_free = True
             for cur_pos in big_castling_free_pos_needed:
-                if cur_pos in self.board.pieces_by_pos or (not skip_check_verification and self.in_check_situation(self.board.create_hypothesis_board({self:cur_pos}))):
+                if cur_pos in self.board.pieces_by_pos or (not skip_check_verification and cur_pos[0] != self.pos[0]-3 and self.board.is_square_attacked(cur_pos, opponent_color)):
                     pos_big_castling_are_free = False
+                    break
             
-            piece_at_rook_needed_pos = self.board.pieces_by_pos[(self.pos[0]-4, self.pos[1])] if (self.pos[0]-4, self.pos[1]) in self.board.pieces_by_pos else None
-            if pos_big_castling_are_free and type(piece_at_rook_needed_pos) == Rook and not piece_at_rook_needed_pos.has_already_moved:
-                if skip_check_verification or not self.in_check_situation(self.board.create_hypothesis_board({self:(self.pos[0]-2, self.pos[1])})):
-                    moves_around.append(Move(Move.SPECIAL_MOVE, self, (self.pos[0]-2, self.pos[1]), Move.CASTLING_TYPE))
-        #TODO: must be filtered with check situations
-        return moves_around   
+            piece_at_rook_needed_pos = self.board.get_piece_by_pos((self.pos[0]-4, self.pos[1]))
+            if pos_big_castling_are_free and type(piece_at_rook_needed_pos) == Rook and piece_at_rook_needed_pos.color == self.color and not piece_at_rook_needed_pos.has_already_moved:
+                castling_moves.append(Move(Move.SPECIAL_MOVE, self, (self.pos[0]-2, self.pos[1]), Move.CASTLING_TYPE))
+        return castling_moves   
 
 class Queen(Piece):
     '''Class for Queens, please refer to :class:`Piece`'''
     NAME = "Queen"
     SCORE_VALUE = 10
     '''Value for score evaluation'''
+    PIECE_SQUARE_TABLE = (
+        -20,-10,-10, -5, -5,-10,-10,-20,
+        -10,  0,  0,  0,  0,  0,  0,-10,
+        -10,  0,  5,  5,  5,  5,  0,-10,
+         -5,  0,  5,  5,  5,  5,  0, -5,
+          0,  0,  5,  5,  5,  5,  0, -5,
+        -10,  5,  5,  5,  5,  5,  0,-10,
+        -10,  0,  5,  0,  0,  0,  0,-10,
+        -20,-10,-10, -5, -5,-10,-10,-20)
+    '''Bonus (in hundredths of a Pawn) for a White piece at each case `y*8 + x`, the table is mirrored for Black pieces'''
+    __slots__ = ()
     def __init__(self, color, pos: tuple, board):
         super().__init__(color, pos, board)
     
     def get_moves_allowed(self, skip_check_verification=False): #returns every move allowed
-        return self.cases_allowed_around(skip_check_verification) + self.cases_allowed_in_diagonals(skip_check_verification) + self.cases_allowed_in_line(skip_check_verification) #may be duplications but we don't matter
+        return self.cases_allowed_in_diagonals(skip_check_verification) + self.cases_allowed_in_line(skip_check_verification) #cases around are the first cases of diagonals and lines
+
+    def _target_cases(self):
+        return self._target_cases_in_rays(_DIAGONALS_RAYS[self.pos] + _LINES_RAYS[self.pos])
 
 class Bishop(Piece):
     '''Class for Bishops, please refer to :class:`Piece`'''
     NAME = "Bishop"
     SCORE_VALUE = 3
     '''Value for score evaluation'''
+    PIECE_SQUARE_TABLE = (
+        -20,-10,-10,-10,-10,-10,-10,-20,
+        -10,  0,  0,  0,  0,  0,  0,-10,
+        -10,  0,  5, 10, 10,  5,  0,-10,
+        -10,  5,  5, 10, 10,  5,  5,-10,
+        -10,  0, 10, 10, 10, 10,  0,-10,
+        -10, 10, 10, 10, 10, 10, 10,-10,
+        -10,  5,  0,  0,  0,  0,  5,-10,
+        -20,-10,-10,-10,-10,-10,-10,-20)
+    '''Bonus (in hundredths of a Pawn) for a White piece at each case `y*8 + x`, the table is mirrored for Black pieces'''
+    __slots__ = ()
     def __init__(self, color, pos: tuple, board):
         super().__init__(color, pos, board)
     
     def get_moves_allowed(self, skip_check_verification=False): #returns every move allowed
         return self.cases_allowed_in_diagonals(skip_check_verification)
+
+    def _target_cases(self):
+        return self._target_cases_in_rays(_DIAGONALS_RAYS[self.pos])
     
 class Knight(Piece):
     '''Class for Knights, please refer to :class:`Piece`'''
     NAME = "Knight"
     SCORE_VALUE = 3
     '''Value for score evaluation'''
+    PIECE_SQUARE_TABLE = (
+        -50,-40,-30,-30,-30,-30,-40,-50,
+        -40,-20,  0,  0,  0,  0,-20,-40,
+        -30,  0, 10, 15, 15, 10,  0,-30,
+        -30,  5, 15, 20, 20, 15,  5,-30,
+        -30,  0, 15, 20, 20, 15,  0,-30,
+        -30,  5, 10, 15, 15, 10,  5,-30,
+        -40,-20,  0,  5,  5,  0,-20,-40,
+        -50,-40,-30,-30,-30,-30,-40,-50)
+    '''Bonus (in hundredths of a Pawn) for a White piece at each case `y*8 + x`, the table is mirrored for Black pieces'''
+    __slots__ = ()
     def __init__(self, color, pos: tuple, board):
         super().__init__(color, pos, board)
     
     def get_moves_allowed(self, skip_check_verification=False): #returns every move allowed
         return self.cases_allowed_for_knight(skip_check_verification)
 
+    def _target_cases(self):
+        return _KNIGHT_ATTACKERS_POS[self.pos] #a Knight attacks the cases from which a Knight would attack it
+
 class Pawn(Piece):
     '''Class for Pawns, please refer to :class:`Piece`'''
     NAME = "Pawn"
     SCORE_VALUE = 1
     '''Value for score evaluation'''
+    PIECE_SQUARE_TABLE = (
+         0,  0,  0,  0,  0,  0,  0,  0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+         5,  5, 10, 25, 25, 10,  5,  5,
+         0,  0,  0, 20, 20,  0,  0,  0,
+         5, -5,-10,  0,  0,-10, -5,  5,
+         5, 10, 10,-20,-20, 10, 10,  5,
+         0,  0,  0,  0,  0,  0,  0,  0)
+    '''Bonus (in hundredths of a Pawn) for a White piece at each case `y*8 + x`, the table is mirrored for Black pieces'''
+    __slots__ = ("promote_class_wanted",)
     def __init__(self, color, pos: tuple, board):
         super().__init__(color, pos, board)
         self.promote_class_wanted = None
@@ -309,29 +446,59 @@ class Pawn(Piece):
         if in_front_move.allowed:
             allowed_moves.append(in_front_move)
 
-            if not self.has_already_moved:
-                #it could try to go 2 cases in front of itself
-                two_cases_in_front_pos = (in_front_case_pos[0], in_front_y + 1*self.color + (self.color - 1))
-                two_cases_move = self.case_allowed(two_cases_in_front_pos, this_move_can_kill=False, skip_check_verification=skip_check_verification)
-                if two_cases_move.allowed:
-                    allowed_moves.append(two_cases_move)
+        #the case in front must be free, but going on it may lead to check while going 2 cases in front doesn't (ex: to block a check)
+        if in_front_move.type != Move.FORBIDDEN_MOVE and not self.has_already_moved:
+            #it could try to go 2 cases in front of itself
+            two_cases_in_front_pos = (in_front_case_pos[0], in_front_y + 1*self.color + (self.color - 1))
+            two_cases_move = self.case_allowed(two_cases_in_front_pos, this_move_can_kill=False, skip_check_verification=skip_check_verification)
+            if two_cases_move.allowed:
+                allowed_moves.append(two_cases_move)
         
         for x in range(self.pos[0]-1, self.pos[0]+2, 2):#x-1 and x+1
             cur_move = self.case_allowed((x, in_front_y), skip_check_verification=skip_check_verification)
             if cur_move.type in (cur_move.KILL_MOVE, cur_move.OVER_CHECK_MOVE):
                 allowed_moves.append(cur_move)
         
-        #En passant move
-        if (self.color == self.WHITE and self.pos[1] == 3) or (self.color == self.BLACK and self.pos[1] == 4):
-            last_move_history = self.board.move_history[-1]
-            piece_of_last_move = last_move_history["piece"]
-            en_passant_pos = (piece_of_last_move.pos[0], piece_of_last_move.pos[1] + (last_move_history["ini_pos"][1] - piece_of_last_move.pos[1])//2)
-            if type(piece_of_last_move) == __class__ and piece_of_last_move.pos[1] == self.pos[1] and abs(piece_of_last_move.pos[0] - self.pos[0]) == 1 and \
-                not last_move_history["has_already_moved"] and self.case_allowed(en_passant_pos, skip_check_verification=skip_check_verification):
-                allowed_moves.append(Move(Move.SPECIAL_MOVE, self, en_passant_pos, Move.EN_PASSANT_TYPE))
+        if self.board.en_passant_x is not None:
+            en_passant_move = self._en_passant_move(in_front_y, skip_check_verification)
+            if en_passant_move is not None:
+                allowed_moves.append(en_passant_move)
 
         return allowed_moves
 
+    def iter_moves_allowed(self, skip_check_verification=False):
+        in_front_y = self.pos[1] + 1*self.color + (self.color - 1)
+        pieces_by_pos = self.board.pieces_by_pos
+        for x in range(self.pos[0]-1, self.pos[0]+2, 2):#x-1 and x+1
+            target_piece = pieces_by_pos.get((x, in_front_y))
+            if target_piece is not None and target_piece.color != self.color:
+                cur_move = self.case_allowed((x, in_front_y), skip_check_verification=skip_check_verification)
+                if cur_move.allowed:
+                    yield cur_move
+        if self.board.en_passant_x is not None:
+            en_passant_move = self._en_passant_move(in_front_y, skip_check_verification)
+            if en_passant_move is not None:
+                yield en_passant_move
+
+        in_front_move = self.case_allowed((self.pos[0], in_front_y), this_move_can_kill=False, skip_check_verification=skip_check_verification)
+        if in_front_move.allowed:
+            yield in_front_move
+        if in_front_move.type != Move.FORBIDDEN_MOVE and not self.has_already_moved:
+            two_cases_move = self.case_allowed((self.pos[0], in_front_y + 1*self.color + (self.color - 1)), this_move_can_kill=False, skip_check_verification=skip_check_verification)
+            if two_cases_move.allowed:
+                yield two_cases_move
+
+    def _en_passant_move(self, in_front_y:int, skip_check_verification=False) -> Move or None:
+        '''En passant move of the Pawn if it is allowed (en_passant_x is only set when the last move was an opponent's Pawn moving 2 cases next to one of ours)'''
+        en_passant_x = self.board.en_passant_x
+        if abs(en_passant_x - self.pos[0]) == 1 and self.pos[1] == (3 if self.color == self.WHITE else 4):
+            last_moved_pawn = self.board.pieces_by_pos.get((en_passant_x, self.pos[1]))
+            if type(last_moved_pawn) == __class__ and last_moved_pawn.color != self.color:
+                en_passant_move = Move(Move.SPECIAL_MOVE, self, (en_passant_x, in_front_y), Move.EN_PASSANT_TYPE)
+                if skip_check_verification or not self.board.is_leading_to_check(en_passant_move):
+                    return en_passant_move
+        return None
+
 class Case:
     BLACK_TEXTURE = None
     WHITE_TEXTURE = None
@@ -341,6 +508,199 @@ class Case:
         self.content = content
         self.type = square_type
 
+def _cases_in_direction(pos:tuple, vector:tuple) -> tuple:
+    '''Every case from pos (excluded) to the board's edge following the vector'''
+    cases = []
+    cur_pos = (pos[0] + vector[0], pos[1] + vector[1])
+    while 0 <= cur_pos[0] <= 7 and 0 <= cur_pos[1] <= 7:
+        cases.append(cur_pos)
+        cur_pos = (cur_pos[0] + vector[0], cur_pos[1] + vector[1])
+    return tuple(cases)
+
+def _cases_at_vectors(pos:tuple, vectors) -> tuple:
+    return tuple((pos[0] + v[0], pos[1] + v[1]) for v in vectors if 0 <= pos[0] + v[0] <= 7 and 0 <= pos[1] + v[1] <= 7)
+
+#precomputed tables used by Board.is_square_attacked, keys are the attacked case
+_ALL_POS = tuple((x, y) for x in range(8) for y in range(8))
+_SQUARE_POS = tuple((square % 8, square // 8) for square in range(64))
+_KING_VECTORS = Piece.DIAGONALS_VECTORS + Piece.LINES_VECTORS
+_KNIGHT_ATTACKERS_POS = {pos: _cases_at_vectors(pos, Piece.KNIGHT_VECTOR) for pos in _ALL_POS}
+_CHECK_ATTACKERS_POS = {pos: _cases_at_vectors(pos, _KING_VECTORS) for pos in _ALL_POS}
+_CASES_AROUND = {(x, y): tuple((around_x, around_y) for around_x in range(max(0, x-1), min(8, x+2)) for around_y in range(max(0, y-1), min(8, y+2))
+    if (around_x, around_y) != (x, y)) for x, y in _ALL_POS} #same cases and order as Piece.cases_allowed_around
+#a White Pawn goes up (y decreasing) so it attacks a case from below, a Black one from above
+_PAWN_ATTACKERS_POS = (
+    {pos: _cases_at_vectors(pos, ((-1, 1), (1, 1))) for pos in _ALL_POS},
+    {pos: _cases_at_vectors(pos, ((-1, -1), (1, -1))) for pos in _ALL_POS}
+)
+_DIAGONALS_RAYS = {pos: tuple(ray for ray in (_cases_in_direction(pos, v) for v in Piece.DIAGONALS_VECTORS) if ray) for pos in _ALL_POS}
+_LINES_RAYS = {pos: tuple(ray for ray in (_cases_in_direction(pos, v) for v in Piece.LINES_VECTORS) if ray) for pos in _ALL_POS}
+PROMOTE_LETTERS = {Queen: "q", Rook: "r", Bishop: "b", Knight: "n"}
+'''Letter of each promote class in the coordinate notation of moves (like e7e8q)'''
+_PROMOTE_CLASS_TO_CODE = {Knight: 1, Bishop: 2, Rook: 3, Queen: 4}
+_CODE_TO_PROMOTE_CLASS = {code: piece_class for piece_class, code in _PROMOTE_CLASS_TO_CODE.items()}
+_DIAGONALS_ATTACKERS = (Bishop, Queen)
+_BITBOARDS_KINDS = {Knight: 1, Bishop: 2, Rook: 3, Queen: 4} #kinds of bitboard.PIECE_KINDS whose moves are generated with the bitboards
+_LINES_ATTACKERS = (Rook, Queen)
+
+#Zobrist hashing: a random 64 bits key for each (piece, color, pos), for the turn's color, for each castling and for each en passant column
+#the seed is fixed so keys are the same between processes and sessions
+_zobrist_random = Random("pygame_chess_api zobrist")
+for _piece_class in (Pawn, Knight, Bishop, Rook, Queen, Check):
+    _piece_class.ZOBRIST_KEYS = tuple({pos: _zobrist_random.getrandbits(64) for pos in _ALL_POS} for color in range(2))
+_ZOBRIST_BLACK_TURN = _zobrist_random.getrandbits(64)
+_ZOBRIST_CASTLINGS = tuple(_zobrist_random.getrandbits(64) for i in range(4))
+_ZOBRIST_CASTLING_RIGHTS = tuple(_ZOBRIST_CASTLINGS[0] * (rights & 1) ^ _ZOBRIST_CASTLINGS[1] * (rights >> 1 & 1) ^
+    _ZOBRIST_CASTLINGS[2] * (rights >> 2 & 1) ^ _ZOBRIST_CASTLINGS[3] * (rights >> 3 & 1) for rights in range(16)) #key for each combination of rights
+_ZOBRIST_EN_PASSANT = tuple(_zobrist_random.getrandbits(64) for x in range(8))
+
+#piece-square values by color and pos, Black pieces use the table upside down
+for _piece_class in (Pawn, Knight, Bishop, Rook, Queen, Check):
+    _piece_class.PIECE_SQUARE_VALUES = ({(x, y): _piece_class.PIECE_SQUARE_TABLE[y*8 + x] for x, y in _ALL_POS},
+        {(x, y): _piece_class.PIECE_SQUARE_TABLE[(7-y)*8 + x] for x, y in _ALL_POS})
+
+_CODE_TO_PIECE_CLASS = (None, Pawn, Knight, Bishop, Rook, Queen, Check)
+_PIECE_CLASS_TO_CODE = {piece_class: code for code, piece_class in enumerate(_CODE_TO_PIECE_CLASS) if piece_class is not None}
+
+
+class HistoryRecord:
+    '''
+    | A move played on a :class:`Board` (element of :attr:`Board.move_history`) with the state needed to revert it
+    | It only keeps ints (cases, piece codes, flags and the Zobrist key) and no reference to a Board or its pieces, so records are shared between Boards
+    | A piece code is the class index in :attr:`Board.BYTES_CODE_TO_CLASS` + 8 for Black pieces
+    '''
+    HAD_MOVED, KILLED_HAD_MOVED, IN_CHECK, GAME_ENDED = 1, 2, 4, 8
+    '''Bits of :attr:`flags`'''
+    __slots__ = ("move_code", "piece_code", "killed_code", "killed_index", "flags", "winner", "end_reason",
+        "zobrist_key", "castling_rights", "en_passant_x", "halfmove_clock", "position_version")
+    def __init__(self, move_code:int, piece_code:int, killed_code:int, killed_index:int, flags:int, winner, end_reason,
+            zobrist_key:int, castling_rights:int, en_passant_x, halfmove_clock:int, position_version:int):
+        self.move_code = move_code
+        '''The move played (see :meth:`Move.encode`), for a promotion it holds the class the Pawn promoted to'''
+        self.piece_code = piece_code
+        '''Code of the moved piece'''
+        self.killed_code = killed_code
+        '''Code of the killed piece, 0 if there is none'''
+        self.killed_index = killed_index
+        '''Index of the killed piece in its color's list of :attr:`Board.pieces_by_color`'''
+        self.flags = flags
+        '''Moved and killed pieces' has_already_moved, check and game end before the move'''
+        #the other attributes are the Board's ones before the move
+        self.winner = winner
+        self.end_reason = end_reason
+        self.zobrist_key = zobrist_key
+        self.castling_rights = castling_rights
+        self.en_passant_x = en_passant_x
+        self.halfmove_clock = halfmove_clock
+        self.position_version = position_version
+
+    @property
+    def ini_pos(self) -> tuple:
+        return (self.move_code & 7, self.move_code >> 3 & 7)
+
+    @property
+    def target(self) -> tuple:
+        return (self.move_code >> 6 & 7, self.move_code >> 9 & 7)
+
+    @property
+    def special_type(self) -> int or None:
+        return self.move_code >> 15 & 3 or None
+
+    @property
+    def piece_class(self):
+        return _CODE_TO_PIECE_CLASS[self.piece_code & 7]
+
+    @property
+    def color(self) -> int:
+        return self.piece_code >> 3
+
+    @property
+    def killed_class(self):
+        '''Class of the killed piece, None if there is none'''
+        return _CODE_TO_PIECE_CLASS[self.killed_code & 7]
+
+    @property
+    def killed_pos(self) -> tuple or None:
+        if not self.killed_code:
+            return None
+        return (self.move_code >> 6 & 7, self.move_code >> 3 & 7) if self.special_type == Move.EN_PASSANT_TYPE else self.target
+
+    @property
+    def promoted_class(self):
+        '''Class the Pawn promoted to, None if the move isn't a promotion'''
+        return _CODE_TO_PROMOTE_CLASS[self.move_code >> 17 & 7] if self.special_type == Move.TO_PROMOTE_TYPE else None
+
+    @property
+    def castling_rook_positions(self) -> tuple or None:
+        '''(initial pos, pos) of the Rook moved by a castling, None if the move isn't a castling'''
+        if self.special_type != Move.CASTLING_TYPE:
+            return None
+        x, y = self.target
+        return ((x+1, y), (x-1, y)) if x > (self.move_code & 7) else ((x-2, y), (x+1, y))
+
+    def __repr__(self):
+        return f"HistoryRecord({self.piece_class.__name__} {self.ini_pos} -> {self.target}, killed: {self.killed_class and self.killed_class.__name__})"
+
+
+class MoveHistory:
+    '''
+    | Persistent list of :class:`HistoryRecord` (the last record is linked to the previous one, and so on), used as :attr:`Board.move_history`
+    | :meth:`copy` is O(1): copies share their records, appending to or popping from one of them doesn't change the others
+    | It can be used like a list (len, iteration from the first move, indexes, slices), the last records being the fastest to get
+    '''
+    __slots__ = ("_last_node", "_length")
+    def __init__(self, records=()):
+        self._last_node = None #(record, previous node)
+        self._length = 0
+        for record in records:
+            self.append(record)
+
+    def append(self, record:HistoryRecord):
+        self._last_node = (record, self._last_node)
+        self._length += 1
+
+    def pop(self) -> HistoryRecord:
+        if self._last_node is None:
+            raise IndexError("pop from an empty MoveHistory")
+        record, self._last_node = self._last_node
+        self._length -= 1
+        return record
+
+    def copy(self):
+        history = MoveHistory()
+        history._last_node, history._length = self._last_node, self._length
+        return history
+
+    def __len__(self):
+        return self._length
+
+    def __reversed__(self):
+        node = self._last_node
+        while node is not None:
+            yield node[0]
+            node = node[1]
+
+    def __iter__(self):
+        return iter(list(reversed(self))[::-1])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index == -1 and self._last_node is not None:
+            return self._last_node[0]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MoveHistory index out of range")
+        node = self._last_node
+        for i in range(self._length - 1 - index):
+            node = node[1]
+        return node[0]
+
+    def __repr__(self):
+        return f"MoveHistory({list(self)})"
+
+
 class Board:
     '''Represents the whole game board, containing pieces and data about current and past turns'''
     #we'll always consider that white starts in the bottom screen and black in the upper, so the white knight will be (4, 8) and the black one at (4, 0)
@@ -348,11 +708,22 @@ class Board:
         (3, 0): Queen, (4, 0): Check, (5, 0): Bishop,
         (6, 0): Knight, (7, 0): Rook} #uses 0 as y back line
     COLORS = (Piece.WHITE, Piece.BLACK)
+    WHITE_LITTLE_CASTLING, WHITE_BIG_CASTLING, BLACK_LITTLE_CASTLING, BLACK_BIG_CASTLING = 1, 2, 4, 8
+    '''Bits of :attr:`castling_rights`'''
+    CHECKMATE, STALEMATE, THREEFOLD_REPETITION, FIFTY_MOVES_RULE, INSUFFICIENT_MATERIAL = "checkmate", "stalemate", "threefold repetition", "fifty moves rule", "insufficient material"
+    '''Values of :attr:`end_reason`'''
+    TABLEBASE_ADJUDICATION = "tablebase adjudication"
+    '''Value of :attr:`end_reason` when the game is ended by :attr:`tablebase`'''
     
-    def __init__(self, pieces_by_pos=None, move_history=[], cur_color_turn=Case.WHITE, verbose=1):
+    def __init__(self, pieces_by_pos=None, move_history=None, cur_color_turn=Case.WHITE, verbose=1, use_bitboards=False):
         self.verbose = verbose
-        self.move_history = move_history
-        ''''''
+        self.use_bitboards = use_bitboards
+        '''If True, the Board keeps a :class:`bitboard.BitboardPosition` up to date, attack questions (like :meth:`is_square_attacked`), checks, pins and the Check's moves are then answered with it'''
+        self.bitboards = None
+        self.move_history = move_history.copy() if isinstance(move_history, MoveHistory) else MoveHistory(move_history or ())
+        '''Moves played (:class:`MoveHistory` of :class:`HistoryRecord`), shared with the hypothesis boards created from this Board'''
+        self._removed_pieces = {} #HistoryRecord: (killed piece, promoted Pawn) of moves played on this Board, to put back the same objs
+        self._redo_codes = []
         self.hypothesis_board = False
         self.cur_color_turn = cur_color_turn
         ''''''
@@ -362,6 +733,34 @@ class Board:
         ''''''
         self.winner = False
         ''''''
+        self.end_reason = None
+        '''Why the game ended: :attr:`CHECKMATE`, :attr:`STALEMATE`, :attr:`THREEFOLD_REPETITION`, :attr:`FIFTY_MOVES_RULE` or :attr:`INSUFFICIENT_MATERIAL` (None while it isn't ended)'''
+
+        self.zobrist_key = 0 #will be overidden in _init_vars
+        '''64 bits key identifying the position (pieces, turn's color, castling rights and en passant), updated at each move'''
+        self.castling_rights = 0
+        '''Castlings still possible in the game (bits are :attr:`WHITE_LITTLE_CASTLING`, etc.), deduced from pieces' has_already_moved'''
+        self.en_passant_x = None
+        '''Column (x) where an en passant kill is possible this turn, None otherwise'''
+        self.halfmove_clock = 0
+        '''Half-moves played since the last kill or Pawn move'''
+        self.material = [0, 0]
+        '''Sum of the pieces' SCORE_VALUE by color, updated at each move'''
+        self.piece_square_scores = [0, 0]
+        '''Sum of the pieces' piece-square values (see :attr:`Piece.PIECE_SQUARE_TABLE`) by color, updated at each move'''
+        self.tablebase = None
+        ''':class:`tablebase.Tablebase` probed at each new turn (None for no tablebase), the game ends as soon as the position is in a table'''
+        self.position_counts = {}
+        '''Number of times each position (by :attr:`zobrist_key`) has been reached in the game, updated at each move to detect repetitions'''
+        self.start_ply = 0
+        '''Half-moves played before the first move of move_history (for a Board created from a FEN), used to count the moves'''
+        self.position_version = 0
+        '''Changes each time the position changes (a move gets a new version, unmake_move gets back the previous one), used to cache moves'''
+        self._last_position_version = 0
+        self._moves_cache_version = None
+        self._moves_cache = {}
+        self._legal_moves_cache = None
+        self._checkers_and_pins_cache = None
 
         self.pieces_by_color = [[], []] #will be overidden in _init_vars
         '''2-dimensional list representing pieces by color (self.pieces_by_color[0] for white pieces and self.pieces_by_color[0] for black pieces)'''
@@ -387,15 +786,221 @@ class Board:
             self.pieces_by_pos = pieces_by_pos
             self.hypothesis_board = True
     
+    FEN_LETTER_TO_CLASS = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen, "k": Check}
+    CLASS_TO_FEN_LETTER = {piece_class: letter for letter, piece_class in FEN_LETTER_TO_CLASS.items()}
+    START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+    @classmethod
+    def from_fen(cls, fen:str, verbose=1, use_bitboards=False):
+        '''
+        | Creates a Board from a FEN string (Forsyth-Edwards Notation, like :attr:`START_FEN`)
+        | Castling rights are turned into pieces' has_already_moved, and an en passant case into a last move in move_history
+        '''
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Invalid FEN {fen}: it must have at least 4 fields")
+        placement, color_field, castling_field, en_passant_field = fields[:4]
+        if color_field not in ("w", "b"):
+            raise ValueError(f"Invalid FEN {fen}: the color must be w or b")
+
+        board = cls._new_empty(Piece.WHITE if color_field == "w" else Piece.BLACK, verbose, use_bitboards)
+        rows = placement.split("/")
+        if len(rows) != 8:
+            raise ValueError(f"Invalid FEN {fen}: it must have 8 rows")
+        for y, row in enumerate(rows): #the first row is the Black back line (y=0)
+            x = 0
+            previous_letter = None
+            for letter in row:
+                if letter.isdigit():
+                    #empty cases are counted by a single digit (like 8, never 44 or 0)
+                    if letter not in "12345678" or (previous_letter is not None and previous_letter.isdigit()):
+                        raise ValueError(f"Invalid FEN {fen}: unexpected {letter} in row {row}")
+                    x += int(letter)
+                    previous_letter = letter
+                    continue
+                if letter.lower() not in cls.FEN_LETTER_TO_CLASS or x > 7:
+                    raise ValueError(f"Invalid FEN {fen}: unexpected {letter} in row {row}")
+                color = Piece.WHITE if letter.isupper() else Piece.BLACK
+                board.pieces_by_pos[(x, y)] = cls.FEN_LETTER_TO_CLASS[letter.lower()](color, (x, y), board)
+                x += 1
+                previous_letter = letter
+            if x != 8:
+                raise ValueError(f"Invalid FEN {fen}: row {row} hasn't 8 cases")
+
+        castling_rights = 0
+        for letter in castling_field.replace("-", ""):
+            if letter not in "KQkq":
+                raise ValueError(f"Invalid FEN {fen}: unexpected castling {letter}")
+            castling_rights |= {"K": cls.WHITE_LITTLE_CASTLING, "Q": cls.WHITE_BIG_CASTLING, "k": cls.BLACK_LITTLE_CASTLING, "q": cls.BLACK_BIG_CASTLING}[letter]
+
+        en_passant_x = None
+        if en_passant_field != "-":
+            #the en passant case is behind a Pawn of the color which has just played
+            if len(en_passant_field) != 2 or en_passant_field[0] not in "abcdefgh" or en_passant_field[1] != ("6" if board.cur_color_turn == Piece.WHITE else "3"):
+                raise ValueError(f"Invalid FEN {fen}: wrong en passant case {en_passant_field}")
+            en_passant_x = "abcdefgh".index(en_passant_field[0])
+
+        board._set_moved_pieces(castling_rights)
+        board._finish_setup(en_passant_x)
+        #optional move counters
+        try:
+            halfmove_clock, fullmove_number = (int(field) for field in (fields[4:6] + ["0", "1"][len(fields[4:6]):]))
+        except ValueError:
+            raise ValueError(f"Invalid FEN {fen}: the move counters must be numbers")
+        board.halfmove_clock = halfmove_clock
+        board.start_ply = (fullmove_number - 1) * 2 + board.cur_color_turn - len(board.move_history)
+        return board
+
+    def to_fen(self) -> str:
+        '''
+        | FEN string of the position (see :meth:`from_fen`)
+        | The en passant case is only given if an en passant kill is possible
+        '''
+        rows = []
+        for y in range(8):
+            row, empty_cases = "", 0
+            for x in range(8):
+                piece = self.pieces_by_pos.get((x, y))
+                if piece is None:
+                    empty_cases += 1
+                    continue
+                if empty_cases:
+                    row += str(empty_cases)
+                    empty_cases = 0
+                letter = self.CLASS_TO_FEN_LETTER[type(piece)]
+                row += letter.upper() if piece.color == Piece.WHITE else letter
+            rows.append(row + (str(empty_cases) if empty_cases else ""))
+
+        castling_field = "".join(letter for letter, right in (("K", self.WHITE_LITTLE_CASTLING), ("Q", self.WHITE_BIG_CASTLING),
+            ("k", self.BLACK_LITTLE_CASTLING), ("q", self.BLACK_BIG_CASTLING)) if self.castling_rights & right) or "-"
+        en_passant_field = "-"
+        if self.en_passant_x is not None:
+            en_passant_field = "abcdefgh"[self.en_passant_x] + ("6" if self.cur_color_turn == Piece.WHITE else "3")
+
+        fullmove_number = 1 + (self.start_ply + len(self.move_history)) // 2
+        return f"{'/'.join(rows)} {'w' if self.cur_color_turn == Piece.WHITE else 'b'} {castling_field} {en_passant_field} {self.halfmove_clock} {fullmove_number}"
+
+    BYTES_SIZE = 34
+    '''Size of a position packed by :meth:`to_bytes`'''
+    BYTES_CODE_TO_CLASS = (None, Pawn, Knight, Bishop, Rook, Queen, Check)
+
+    def to_bytes(self) -> bytes:
+        '''
+        | Packs the position in :attr:`BYTES_SIZE` bytes: a 4 bits code per case (2 cases by byte, case index `y*8 + x`),
+        | then the turn's color (bit 0) with the castling rights (bits 1-4), then the en passant column + 1 (0 if there is no en passant)
+        | A case code is 0 if the case is empty, otherwise the class index in :attr:`BYTES_CODE_TO_CLASS` + 8 for Black pieces
+        | Like FEN, it doesn't keep the move history (use :meth:`from_bytes` to get a Board back), see :mod:`encoding` for lists of positions
+        '''
+        data = bytearray(self.BYTES_SIZE)
+        for (x, y), piece in self.pieces_by_pos.items():
+            square = y*8 + x
+            data[square >> 1] |= (self.BYTES_CODE_TO_CLASS.index(type(piece)) | piece.color << 3) << (square & 1) * 4
+        data[32] = self.cur_color_turn | self.castling_rights << 1
+        data[33] = self.en_passant_x + 1 if self.en_passant_x is not None else 0
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data:bytes or memoryview, verbose=1, use_bitboards=False):
+        '''Creates a Board from a position packed by :meth:`to_bytes` (the first :attr:`BYTES_SIZE` bytes of data are read)'''
+        if len(data) < cls.BYTES_SIZE:
+            raise ValueError(f"A packed position must have {cls.BYTES_SIZE} bytes, got {len(data)}")
+        board = cls._new_empty(data[32] & 1, verbose, use_bitboards)
+        for index in range(32):
+            byte = data[index]
+            for square, code in ((index * 2, byte & 15), (index * 2 + 1, byte >> 4)):
+                if code:
+                    if not 1 <= code & 7 <= 6:
+                        raise ValueError(f"Invalid packed position: unknown piece code {code}")
+                    pos = (square % 8, square // 8)
+                    board.pieces_by_pos[pos] = cls.BYTES_CODE_TO_CLASS[code & 7](code >> 3, pos, board)
+        board._set_moved_pieces(data[32] >> 1 & 15)
+        board._finish_setup(data[33] - 1 if data[33] else None)
+        return board
+
+    SNAPSHOT_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, Check)
+    '''Pieces' classes order in snapshots (see :meth:`to_snapshot`)'''
+
+    def to_snapshot(self) -> tuple:
+        '''
+        | Compact picklable copy of the position: (cases, cur_color_turn, en_passant_x), to send a Board to another process without its objs graph
+        | cases is 64 bytes (index `y*8 + x`), 0 for an empty case, otherwise the class index + 1 (bits 0-2), the color (bit 3) and has_already_moved (bit 4)
+        | Unlike :meth:`to_bytes`, every piece's has_already_moved is kept. Use :meth:`from_snapshot` to get a Board back (the move history isn't kept, only what is needed to play the next moves)
+        '''
+        cases = bytearray(64)
+        for (x, y), piece in self.pieces_by_pos.items():
+            cases[y*8 + x] = (self.SNAPSHOT_CLASSES.index(type(piece)) + 1) | piece.color << 3 | piece.has_already_moved << 4
+        return (bytes(cases), self.cur_color_turn, self.en_passant_x)
+
+    @classmethod
+    def from_snapshot(cls, snapshot:tuple, verbose=1, use_bitboards=False):
+        '''Creates a Board from a snapshot made by :meth:`to_snapshot`'''
+        cases, cur_color_turn, en_passant_x = snapshot
+        board = cls._new_empty(cur_color_turn, verbose, use_bitboards)
+        for square, code in enumerate(cases):
+            if code:
+                pos = (square % 8, square // 8)
+                piece = cls.SNAPSHOT_CLASSES[(code & 7) - 1](code >> 3 & 1, pos, board)
+                piece.has_already_moved = bool(code >> 4 & 1)
+                board.pieces_by_pos[pos] = piece
+        board._finish_setup(en_passant_x)
+        return board
+
+    @classmethod
+    def _new_empty(cls, cur_color_turn:int, verbose:int, use_bitboards:bool):
+        '''Board without pieces which isn't a hypothesis, to fill pieces_by_pos then call :meth:`_finish_setup`'''
+        board = cls(pieces_by_pos={}, cur_color_turn=cur_color_turn, verbose=verbose, use_bitboards=use_bitboards)
+        board.hypothesis_board = False
+        return board
+
+    def _set_moved_pieces(self, castling_rights:int):
+        '''Sets pieces' has_already_moved from castling rights (Checks and Rooks which can't castle anymore are considered as moved, Pawns if they aren't on their initial line)'''
+        for (x, y), piece in self.pieces_by_pos.items():
+            piece.has_already_moved = type(piece) in (Check, Rook) or (type(piece) == Pawn and y != (6 if piece.color == Piece.WHITE else 1))
+        for color in self.COLORS:
+            y = 7 if color == Piece.WHITE else 0
+            for rook_x, right in ((7, self.WHITE_LITTLE_CASTLING), (0, self.WHITE_BIG_CASTLING)):
+                if not castling_rights & right << (2 * color):
+                    continue
+                check, rook = self.pieces_by_pos.get((4, y)), self.pieces_by_pos.get((rook_x, y))
+                if type(check) != Check or type(rook) != Rook or check.color != color or rook.color != color:
+                    raise ValueError(f"Invalid position: the castling of the {Piece.INT_COLOR_TO_TEXT[color]} Check with the Rook at {(rook_x, y)} isn't possible")
+                check.has_already_moved = rook.has_already_moved = False
+
+    def _finish_setup(self, en_passant_x:int or None):
+        '''Inits the Board vars once pieces_by_pos is filled, en passant being possible at column en_passant_x'''
+        en_passant_pawn = None
+        if en_passant_x is not None:
+            #the Pawn which has just moved 2 cases is put back on its initial case, its move is played again to be in move_history
+            pawn_color = 1 - self.cur_color_turn
+            pawn_y, pawn_ini_y = (4, 6) if pawn_color == Piece.WHITE else (3, 1)
+            en_passant_pawn = self.pieces_by_pos.get((en_passant_x, pawn_y))
+            if type(en_passant_pawn) != Pawn or en_passant_pawn.color != pawn_color or (en_passant_x, pawn_ini_y) in self.pieces_by_pos \
+                    or (en_passant_x, (pawn_y + pawn_ini_y) // 2) in self.pieces_by_pos:
+                raise ValueError(f"Invalid position: no Pawn which has just moved 2 cases for an en passant at column {en_passant_x}")
+            self.pieces_by_pos.pop(en_passant_pawn.pos)
+            en_passant_pawn.pos = (en_passant_x, pawn_ini_y)
+            en_passant_pawn.has_already_moved = False
+            self.pieces_by_pos[en_passant_pawn.pos] = en_passant_pawn
+            self.cur_color_turn = pawn_color
+
+        self._init_vars()
+        if None in self.check_pieces:
+            raise ValueError("Invalid position: each color must have a Check")
+        if en_passant_pawn is not None:
+            self.make_move(Move(Move.TO_EMPTY_MOVE, en_passant_pawn, (en_passant_x, pawn_y)))
+    
     def score_evaluation(self) -> dict:
         '''Returns the current score evaluation for each color 
-        | (basic calculation with a static value for each piece type)'''
-        scores = {self.COLORS[0]: 0, self.COLORS[1]: 0}
-        for c in self.COLORS:
-            for p in self.pieces_by_color[c]:
-                scores[c] += p.SCORE_VALUE
-        
-        return scores
+        | (basic calculation with a static value for each piece type, the sums are kept up to date at each move)'''
+        return {self.COLORS[0]: self.material[0], self.COLORS[1]: self.material[1]}
+
+    def _compute_scores(self):
+        '''Computes :attr:`material` and :attr:`piece_square_scores` from scratch'''
+        self.material = [0, 0]
+        self.piece_square_scores = [0, 0]
+        for pos, piece in self.pieces_by_pos.items():
+            self.material[piece.color] += piece.SCORE_VALUE
+            self.piece_square_scores[piece.color] += piece.PIECE_SQUARE_VALUES[piece.color][pos]
     
     def _init_vars(self):
         '''Used to init self.check_pieces and self.pieces_by_color (used when initiating a new obj or hypothesis)'''
@@ -406,6 +1011,57 @@ class Board:
         
         for piece in tuple(self.pieces_by_pos.values()):
             self.pieces_by_color[piece.color].append(piece)
+        
+        if self.use_bitboards:
+            from pygame_chess_api.bitboard import BitboardPosition
+            self.bitboards = BitboardPosition.from_board(self)
+        
+        self.castling_rights = self._compute_castling_rights()
+        self.en_passant_x = self._compute_en_passant_x()
+        self.zobrist_key = self.compute_zobrist_key()
+        self._compute_scores()
+        self.position_counts = {}
+        for key in [record.zobrist_key for record in self.move_history] + [self.zobrist_key]:
+            self.position_counts[key] = self.position_counts.get(key, 0) + 1
+        self.clear_moves_cache()
+    
+    def compute_zobrist_key(self) -> int:
+        '''Computes the Zobrist key from scratch (:attr:`zobrist_key` is already kept up to date at each move)'''
+        key = _ZOBRIST_CASTLING_RIGHTS[self.castling_rights]
+        for pos, piece in self.pieces_by_pos.items():
+            key ^= piece.ZOBRIST_KEYS[piece.color][pos]
+        if self.cur_color_turn == Piece.BLACK:
+            key ^= _ZOBRIST_BLACK_TURN
+        if self.en_passant_x is not None:
+            key ^= _ZOBRIST_EN_PASSANT[self.en_passant_x]
+        return key
+    
+    def _compute_castling_rights(self) -> int:
+        rights = 0
+        for color in self.COLORS:
+            y = 7 if color == Piece.WHITE else 0
+            check = self.pieces_by_pos.get((4, y))
+            if check is None or not check.invicible or check.color != color or check.has_already_moved:
+                continue
+            for rook_x, right in ((7, self.WHITE_LITTLE_CASTLING), (0, self.WHITE_BIG_CASTLING)):
+                rook = self.pieces_by_pos.get((rook_x, y))
+                if type(rook) == Rook and rook.color == color and not rook.has_already_moved:
+                    rights |= right << (2 * color)
+        return rights
+    
+    def _compute_en_passant_x(self) -> int or None:
+        '''Column of the last move if it was a Pawn moving 2 cases and an opponent's Pawn could kill it en passant'''
+        if not self.move_history:
+            return None
+        move_code = self.move_history[-1].move_code
+        pawn = self.pieces_by_pos.get((move_code >> 6 & 7, move_code >> 9 & 7))
+        if type(pawn) != Pawn or abs((move_code >> 9 & 7) - (move_code >> 3 & 7)) != 2:
+            return None
+        for x in (pawn.pos[0] - 1, pawn.pos[0] + 1):
+            piece = self.pieces_by_pos.get((x, pawn.pos[1]))
+            if type(piece) == Pawn and piece.color != pawn.color:
+                return pawn.pos[0]
+        return None
 
             
     def get_piece_by_pos(self, pos):
@@ -414,31 +1070,318 @@ class Board:
         else:
             return None
     
+    def is_square_attacked(self, pos:tuple, by_color:int) -> bool:
+        '''
+        | Returns True if a piece of by_color could kill a piece at pos (it doesn't matter if the attacking piece is pinned)
+        | Looks outward from pos for knights, pawns, Checks and the first piece met in each line/diagonal, without creating any Move
+        '''
+        if self.bitboards is not None:
+            return self.bitboards.is_square_attacked(pos[1]*8 + pos[0], by_color)
+        pieces_by_pos = self.pieces_by_pos
+        for attacker_pos in _KNIGHT_ATTACKERS_POS[pos]:
+            piece = pieces_by_pos.get(attacker_pos)
+            if piece is not None and piece.color == by_color and isinstance(piece, Knight):
+                return True
+        for attacker_pos in _PAWN_ATTACKERS_POS[by_color][pos]:
+            piece = pieces_by_pos.get(attacker_pos)
+            if piece is not None and piece.color == by_color and isinstance(piece, Pawn):
+                return True
+        for attacker_pos in _CHECK_ATTACKERS_POS[pos]:
+            piece = pieces_by_pos.get(attacker_pos)
+            if piece is not None and piece.color == by_color and piece.invicible:
+                return True
+        for ray in _LINES_RAYS[pos]:
+            for attacker_pos in ray:
+                piece = pieces_by_pos.get(attacker_pos)
+                if piece is not None:
+                    if piece.color == by_color and isinstance(piece, _LINES_ATTACKERS):
+                        return True
+                    break #the first piece met blocks the line
+        for ray in _DIAGONALS_RAYS[pos]:
+            for attacker_pos in ray:
+                piece = pieces_by_pos.get(attacker_pos)
+                if piece is not None:
+                    if piece.color == by_color and isinstance(piece, _DIAGONALS_ATTACKERS):
+                        return True
+                    break
+        return False
+    
+    def legal_moves(self) -> list:
+        '''
+        | **Every move allowed for the current playing color**, in one pass
+        | Pieces giving check and pinned pieces are found once, so the moves of the other pieces don't need to be played to be verified
+        | Moves are cached until the position changes, so calling it again in the same turn is cheap
+        '''
+        self._valid_moves_cache()
+        if self._legal_moves_cache is None:
+            moves = []
+            for piece in self._pieces_to_move():
+                moves += self.get_piece_moves_allowed(piece)
+            self._legal_moves_cache = moves
+        return list(self._legal_moves_cache)
+    
+    def iter_legal_moves(self):
+        '''
+        | Generator variant of :meth:`legal_moves`, the same moves are yielded lazily: the captures of every piece first, then the other moves (castlings last)
+        | Stopping the iteration early skips generating and verifying the remaining moves
+        | The board must be in the same position each time a move is asked (a yielded move can be played then unmade before asking the next one)
+        '''
+        self._valid_moves_cache()
+        if self._legal_moves_cache is not None:
+            legal_moves = self._legal_moves_cache
+            yield from [move for move in legal_moves if move.type == Move.KILL_MOVE or move.special_type == Move.EN_PASSANT_TYPE]
+            yield from [move for move in legal_moves if move.type != Move.KILL_MOVE and move.special_type != Move.EN_PASSANT_TYPE and move.special_type != Move.CASTLING_TYPE]
+            yield from [move for move in legal_moves if move.special_type == Move.CASTLING_TYPE]
+            return
+        checkers_and_pins = self._current_checkers_and_pins()
+        quiet_moves_left = [] #(first quiet move, iterator of the following moves) of each piece
+        for moves_iterator in [self._iter_piece_legal_moves(piece, checkers_and_pins) for piece in self._pieces_to_move()]:
+            for move in moves_iterator:
+                if move.type != Move.KILL_MOVE and move.special_type != Move.EN_PASSANT_TYPE:
+                    quiet_moves_left.append((move, moves_iterator))
+                    break
+                yield move
+        for move, moves_iterator in quiet_moves_left: #the Check is the last piece, so castlings are the last moves
+            yield move
+            yield from moves_iterator
+
+    def has_legal_move(self) -> bool:
+        '''Returns True if the current playing color has at least one move allowed (stops at the first move found)'''
+        self._valid_moves_cache()
+        if self._legal_moves_cache is not None:
+            return bool(self._legal_moves_cache)
+        checkers_and_pins = self._current_checkers_and_pins()
+        for piece in self._pieces_to_move():
+            for move in self._iter_piece_legal_moves(piece, checkers_and_pins):
+                return True
+        return False
+    
+    def get_piece_moves_allowed(self, piece:Piece) -> list:
+        '''
+        | Same as :meth:`Piece.get_moves_allowed`, but the moves of the current playing color's pieces are cached until the position changes
+        | (a repeated call in the same turn doesn't compute anything), the returned list must not be modified
+        '''
+        if piece.color != self.cur_color_turn or self.pieces_by_pos.get(piece.pos) is not piece:
+            return piece.get_moves_allowed()
+        moves_cache = self._valid_moves_cache()
+        moves = moves_cache.get(piece)
+        if moves is None:
+            moves = moves_cache[piece] = self._compute_piece_legal_moves(piece)
+        return moves
+    
+    def clear_moves_cache(self):
+        '''To call if pieces are changed without :meth:`make_move`/:meth:`move_piece` (moves are cached by :attr:`position_version`)'''
+        self._last_position_version += 1
+        self.position_version = self._last_position_version
+    
+    def _valid_moves_cache(self) -> dict:
+        if self._moves_cache_version != self.position_version:
+            self._moves_cache = {}
+            self._legal_moves_cache = None
+            self._checkers_and_pins_cache = None
+            self._moves_cache_version = self.position_version
+        return self._moves_cache
+    
+    def _pieces_to_move(self) -> list:
+        '''Pieces of the current playing color, the Check being the last one (its moves are the most expensive to verify)'''
+        check = self.check_pieces[self.cur_color_turn]
+        return [piece for piece in self.pieces_by_color[self.cur_color_turn] if piece is not check] + [check]
+    
+    def _current_checkers_and_pins(self) -> tuple:
+        self._valid_moves_cache()
+        if self._checkers_and_pins_cache is None:
+            self._checkers_and_pins_cache = self._checkers_and_pins(self.cur_color_turn)
+        return self._checkers_and_pins_cache
+
+    def _iter_piece_legal_moves(self, piece:Piece, checkers_and_pins:tuple):
+        '''Generator variant of :meth:`_compute_piece_legal_moves` for a piece of the current playing color'''
+        if piece is self.check_pieces[piece.color]:
+            yield from piece.iter_moves_allowed() if self.bitboards is None else self._bitboards_check_moves(piece)
+            return
+        checkers_cases, pins = checkers_and_pins
+        if len(checkers_cases) >= 2: #if the Check is attacked twice, only the Check can move
+            return
+        stop_check_cases = checkers_cases[0] if checkers_cases else None
+        pin_cases = pins.get(piece)
+        if self.bitboards is not None and type(piece) in _BITBOARDS_KINDS:
+            pseudo_moves = self._bitboards_piece_moves(piece)
+        else:
+            pseudo_moves = piece.iter_moves_allowed(skip_check_verification=True)
+        for move in pseudo_moves:
+            if move.type == Move.OVER_CHECK_MOVE:
+                continue
+            if move.special_type == Move.EN_PASSANT_TYPE:
+                #two pieces leave the line of the Check, so it is played to be verified
+                if not self.is_leading_to_check(move):
+                    yield move
+                continue
+            if stop_check_cases is not None and move.target not in stop_check_cases:
+                continue
+            if pin_cases is not None and move.target not in pin_cases:
+                continue
+            yield move
+
+    def _compute_piece_legal_moves(self, piece:Piece) -> list:
+        check = self.check_pieces[piece.color]
+        if piece is check:
+            #the Check verifies its own moves (it can't go to an attacked case, and castling has its own rules)
+            return check.get_moves_allowed() if self.bitboards is None else self._bitboards_check_moves(check)
+        if self._checkers_and_pins_cache is None:
+            self._checkers_and_pins_cache = self._checkers_and_pins(piece.color)
+        checkers_cases, pins = self._checkers_and_pins_cache
+        if len(checkers_cases) >= 2: #if the Check is attacked twice, only the Check can move
+            return []
+        stop_check_cases = checkers_cases[0] if checkers_cases else None
+        pin_cases = pins.get(piece)
+        if self.bitboards is not None and type(piece) in _BITBOARDS_KINDS:
+            pseudo_moves = self._bitboards_piece_moves(piece)
+        else:
+            pseudo_moves = piece.get_moves_allowed(skip_check_verification=True)
+        moves = []
+        for move in pseudo_moves:
+            if move.type == Move.OVER_CHECK_MOVE:
+                continue
+            if move.special_type == Move.EN_PASSANT_TYPE:
+                #two pieces leave the line of the Check, so it is played to be verified
+                if not self.is_leading_to_check(move):
+                    moves.append(move)
+                continue
+            if stop_check_cases is not None and move.target not in stop_check_cases:
+                continue
+            if pin_cases is not None and move.target not in pin_cases:
+                continue
+            moves.append(move)
+        return moves
+    
+    def _checkers_and_pins(self, color:int) -> tuple:
+        '''
+        | Returns (checkers_cases, pins) for the Check of color
+        | checkers_cases is a list with, for each piece giving check, the cases where a move would stop this check (the piece's case and the cases between it and the Check)
+        | pins is a dict with, for each pinned piece of color, the cases it can go to (the line between the Check and the pinning piece, included)
+        '''
+        pieces_by_pos = self.pieces_by_pos
+        if self.bitboards is not None:
+            checkers_cases, pins_by_pos = self.bitboards.checkers_and_pins(color)
+            return checkers_cases, {pieces_by_pos[pos]: cases for pos, cases in pins_by_pos.items()}
+        king_pos = self.check_pieces[color].pos
+        opponent_color = 1 - color
+        checkers_cases = []
+        pins = {}
+        for attacker_pos in _KNIGHT_ATTACKERS_POS[king_pos]:
+            piece = pieces_by_pos.get(attacker_pos)
+            if piece is not None and piece.color == opponent_color and isinstance(piece, Knight):
+                checkers_cases.append((attacker_pos,))
+        for attacker_pos in _PAWN_ATTACKERS_POS[opponent_color][king_pos]:
+            piece = pieces_by_pos.get(attacker_pos)
+            if piece is not None and piece.color == opponent_color and isinstance(piece, Pawn):
+                checkers_cases.append((attacker_pos,))
+        for rays, attackers in ((_LINES_RAYS[king_pos], _LINES_ATTACKERS), (_DIAGONALS_RAYS[king_pos], _DIAGONALS_ATTACKERS)):
+            for ray in rays:
+                own_piece = None
+                for i, cur_pos in enumerate(ray):
+                    piece = pieces_by_pos.get(cur_pos)
+                    if piece is None:
+                        continue
+                    if piece.color == color:
+                        if own_piece is not None:
+                            break #two pieces of color protect the Check
+                        own_piece = piece
+                        continue
+                    if isinstance(piece, attackers):
+                        if own_piece is None:
+                            checkers_cases.append(ray[:i+1])
+                        else:
+                            pins[own_piece] = ray[:i+1]
+                    break
+        return checkers_cases, pins
+    
+    def _bitboards_piece_moves(self, piece:Piece) -> list:
+        '''Moves of a Knight, Bishop, Rook or Queen found with the bitboards without verifying the Check (captures first), like `piece.get_moves_allowed(skip_check_verification=True)` without the OVER_CHECK_MOVE'''
+        pieces_by_pos = self.pieces_by_pos
+        kill_moves, empty_moves = [], []
+        for square in self.bitboards.piece_targets(_BITBOARDS_KINDS[type(piece)], piece.color, piece.pos[1]*8 + piece.pos[0]):
+            pos = _SQUARE_POS[square]
+            if pos in pieces_by_pos:
+                kill_moves.append(Move(Move.KILL_MOVE, piece, pos))
+            else:
+                empty_moves.append(Move(Move.TO_EMPTY_MOVE, piece, pos))
+        return kill_moves + empty_moves
+    
+    def _bitboards_check_moves(self, check:Check) -> list:
+        '''Moves of the Check found with the bitboards: a case is allowed if it isn't attacked once the Check left its case, so no move is played to be verified'''
+        pieces_by_pos = self.pieces_by_pos
+        kill_moves, empty_moves = [], []
+        for square in self.bitboards.check_targets(check.color):
+            pos = _SQUARE_POS[square]
+            if pos in pieces_by_pos:
+                kill_moves.append(Move(Move.KILL_MOVE, check, pos))
+            else:
+                empty_moves.append(Move(Move.TO_EMPTY_MOVE, check, pos))
+        return kill_moves + empty_moves + check._castling_moves()
+    
     def is_allowed_move(self, piece: Piece, future_pos:tuple): #return bool, Move
-        moves_allowed = piece.get_moves_allowed()
+        moves_allowed = self.get_piece_moves_allowed(piece)
         for move in moves_allowed:
             if move.target == future_pos:
                 return True, move
         return False, None
     
-    def _new_turn(self): #returns if there is a checkmate
-        self.cur_color_turn = 1 - self.cur_color_turn
+    def is_threefold_repetition(self) -> bool:
+        '''Returns True if the current position has been reached at least 3 times'''
+        return self.position_counts.get(self.zobrist_key, 0) >= 3
+
+    def is_fifty_moves_rule(self) -> bool:
+        '''Returns True if 50 moves of each color have been played without any kill or Pawn move'''
+        return self.halfmove_clock >= 100
+
+    def is_insufficient_material(self) -> bool:
+        '''Returns True if no color can checkmate: only Checks remain, plus one Knight or one Bishop, or Bishops which are all on cases of the same color'''
+        minor_pieces = []
+        for pos, piece in self.pieces_by_pos.items():
+            if piece.invicible:
+                continue
+            if type(piece) not in (Knight, Bishop):
+                return False
+            minor_pieces.append((piece, pos))
+        if len(minor_pieces) <= 1:
+            return True
+        return all(type(piece) == Bishop for piece, pos in minor_pieces) and len({(pos[0] + pos[1]) % 2 for piece, pos in minor_pieces}) == 1
+
+    def _new_turn(self): #returns if the game ended, the turn's color has already been changed by make_move
         self.cur_color_turn_in_check = self.check_pieces[self.cur_color_turn].in_check_situation()
-        if self.cur_color_turn_in_check: print(f"{self.check_pieces[self.cur_color_turn]} is in check situation")
+        if self.cur_color_turn_in_check and self.verbose >= 1: logger.info(f"{self.check_pieces[self.cur_color_turn]} is in check situation")
         #we check if it is a checkmate situation
-        for piece in tuple(self.pieces_by_pos.values()):
-            if piece.color == self.cur_color_turn:
-                if len(piece.get_moves_allowed()) > 0:
-                    return False
-        #no piece can move, this is a checkmate or an ending in a stalemate situation
-        self.game_ended = True
-        if self.cur_color_turn_in_check:
-            self.winner = 1 - self.cur_color_turn
-            print(f"Checkmate! color {self.winner} won!")
-        else:
-            self.winner = None
-            print("Pat! Nobody won!")
-        return True
+        if not self.has_legal_move():
+            #no piece can move, this is a checkmate or an ending in a stalemate situation
+            self.game_ended = True
+            if self.cur_color_turn_in_check:
+                self.winner = 1 - self.cur_color_turn
+                self.end_reason = self.CHECKMATE
+                if self.verbose >= 1: logger.info(f"Checkmate! color {self.winner} won!")
+            else:
+                self.winner = None
+                self.end_reason = self.STALEMATE
+                if self.verbose >= 1: logger.info("Pat! Nobody won!")
+            return True
+
+        for end_reason, is_draw in ((self.THREEFOLD_REPETITION, self.is_threefold_repetition), (self.FIFTY_MOVES_RULE, self.is_fifty_moves_rule),
+                (self.INSUFFICIENT_MATERIAL, self.is_insufficient_material)):
+            if is_draw():
+                self.game_ended = True
+                self.winner = None
+                self.end_reason = end_reason
+                if self.verbose >= 1: logger.info(f"Draw by {end_reason}! Nobody won!")
+                return True
+
+        if self.tablebase is not None:
+            result = self.tablebase.probe_wdl(self)
+            if result is not None:
+                self.game_ended = True
+                self.winner = None if result == 0 else (self.cur_color_turn if result > 0 else 1 - self.cur_color_turn)
+                self.end_reason = self.TABLEBASE_ADJUDICATION
+                if self.verbose >= 1: logger.info(f"Game adjudicated by the tablebase: {'draw' if self.winner is None else f'color {self.winner} won'}!")
+                return True
+        return False
 
     def move_piece(self, piece, pos_or_move:tuple or Move, skip_allowed_verif=False, call_new_turn=True) -> None or tuple:
         '''Enables you to move a piece instead of doing it with the :class:`Piece` obj, returns None if the move isn't allowed'''
@@ -452,60 +1395,241 @@ class Board:
                 allowed = False
         else:
             allowed = True
-            move = Move(Move.KILL_MOVE, piece, pos) #to avoid any problem
-            #when skip_allowed_verif move_history won't be important so move type doesn't matter
+            #when skip_allowed_verif move_history won't be important so move type doesn't matter, except for Pawn promotions
+            to_promotion_pawn = call_new_turn and isinstance(piece, Pawn) and ((piece.color == Piece.WHITE and pos[1] == 0) or (piece.color == Piece.BLACK and pos[1] == 7))
+            move = Move(Move.KILL_MOVE, piece, pos, Move.TO_PROMOTE_TYPE if to_promotion_pawn else None) #to avoid any problem
 
         if allowed:
-            ini_pos = piece.pos
-            self.move_history.append({"ini_pos": ini_pos, "move": move, "piece": piece, "has_already_moved": piece.has_already_moved})
-            self.pieces_by_pos.pop(piece.pos)
-            piece.pos = pos
-            piece.has_already_moved = True
-            if move.special_type == move.CASTLING_TYPE:
-                #moving rook
-                little_castling = True if pos == (ini_pos[0]+2, ini_pos[1]) else False
-                rook = self.pieces_by_pos.pop((pos[0]+1, pos[1])) if little_castling else self.pieces_by_pos.pop((pos[0]-2, pos[1]))
-                new_rook_pos = (pos[0]-1, pos[1]) if little_castling else (pos[0]+1, pos[1])
-                rook.pos = new_rook_pos
-                self.pieces_by_pos[new_rook_pos] = rook
-            elif move.special_type == move.EN_PASSANT_TYPE:
-                #killing pawn
-                self.pieces_by_pos.pop((pos[0], ini_pos[1]))
-
-            if pos in self.pieces_by_pos:
-                if move.type == move.TO_EMPTY_MOVE:
-                    print("WARNING: overriding an existing piece pos", pos, "for piece obj", piece)
-                else:
-                    self.pieces_by_color[self.pieces_by_pos[pos].color].remove(self.pieces_by_pos[pos])
-                
-            self.pieces_by_pos[pos] = piece
+            if call_new_turn and move.special_type == Move.TO_PROMOTE_TYPE:
+                #we must make a Pawn promote
+                if self.verbose >= 1: logger.info(f"{piece} upgrading!")
+                if piece.promote_class_wanted is None:
+                    warn(f"No promote_class_wanted for {piece}, you should set the pawn's attribute promote_class_wanted before moving it\nWe'll use a Queen to promote it")
+
+            self.make_move(move)
+            self._redo_codes.clear()
             
             if call_new_turn:
-                #if we must make a Pawn promote
-                if isinstance(piece, Pawn) and ((piece.color == Piece.WHITE and piece.pos[1] == 0) or (piece.color == Piece.BLACK and piece.pos[1] == 7)):
-                    if self.verbose >= 1: print(f"{piece} upgrading!")
-                    new_piece_class = piece.promote_class_wanted
-                    if new_piece_class is None:
-                        warn(f"No promote_class_wanted for {piece}, you should set the pawn's attribute promote_class_wanted before moving it\nWe'll use a Queen to promote it")
-                        new_piece_class = Queen
-                    new_piece = new_piece_class(piece.color, piece.pos, self)
-                    self.pieces_by_pos[pos] = new_piece
-                    self.pieces_by_color[piece.color].append(new_piece)
-                    #deleting the pawn
-                    self.pieces_by_color[piece.color].remove(piece)
-
                 is_checkmate = self._new_turn()
+            else:
+                self.cur_color_turn = 1 - self.cur_color_turn #moves without new turn keep the turn's color (like in hypothesis)
+                self.zobrist_key ^= _ZOBRIST_BLACK_TURN
+                self.clear_moves_cache()
             return pos
         else:
-            if self.verbose >= 1: print(f"Move of piece {piece} to {pos} isn't allowed")
+            if self.verbose >= 1: logger.info(f"Move of piece {piece} to {pos} isn't allowed")
             return None
     
+    def make_move(self, move:Move) -> None:
+        '''
+        | Plays the move in place, without verifying if it is allowed and without checking for checkmate (use :meth:`move_piece` for it)
+        | It handles castling, en passant and Pawn promotions, then gives the turn to the other color
+        | The move can be reverted with :meth:`unmake_move`, it is much faster than creating a hypothesis board
+        '''
+        piece = move.piece
+        color = piece.color
+        ini_pos = piece.pos
+        pos = move.target
+        bitboards = self.bitboards
+        move_code = ini_pos[1]*8 + ini_pos[0] | (pos[1]*8 + pos[0]) << 6 | move.type << 12 | (move.special_type or 0) << 15
+        flags = HistoryRecord.HAD_MOVED * piece.has_already_moved | HistoryRecord.IN_CHECK * self.cur_color_turn_in_check | HistoryRecord.GAME_ENDED * self.game_ended
+        zobrist_key = self.zobrist_key ^ piece.ZOBRIST_KEYS[color][ini_pos] ^ _ZOBRIST_BLACK_TURN
+        piece_square_scores = self.piece_square_scores
+        piece_square_scores[color] -= piece.PIECE_SQUARE_VALUES[color][ini_pos]
+        killed_piece = None
+        killed_code = killed_index = 0
+        new_piece = None
+
+        killed_pos = (pos[0], ini_pos[1]) if move.special_type == Move.EN_PASSANT_TYPE else pos
+        if killed_pos in self.pieces_by_pos:
+            killed_piece = self.pieces_by_pos.pop(killed_pos)
+            killed_piece_color_list = self.pieces_by_color[killed_piece.color]
+            killed_code = _PIECE_CLASS_TO_CODE[type(killed_piece)] | killed_piece.color << 3
+            killed_index = killed_piece_color_list.index(killed_piece)
+            flags |= HistoryRecord.KILLED_HAD_MOVED * killed_piece.has_already_moved
+            del killed_piece_color_list[killed_index]
+            if bitboards is not None: bitboards.clear_piece(killed_piece, killed_pos)
+            zobrist_key ^= killed_piece.ZOBRIST_KEYS[killed_piece.color][killed_pos]
+            self.material[killed_piece.color] -= killed_piece.SCORE_VALUE
+            piece_square_scores[killed_piece.color] -= killed_piece.PIECE_SQUARE_VALUES[killed_piece.color][killed_pos]
+
+        self.pieces_by_pos.pop(ini_pos)
+        piece.pos = pos
+        piece.has_already_moved = True
+        self.pieces_by_pos[pos] = piece
+        if bitboards is not None:
+            if move.special_type != Move.TO_PROMOTE_TYPE:
+                bitboards.shift_piece(piece, ini_pos, pos)
+            else:
+                bitboards.clear_piece(piece, ini_pos)
+
+        if move.special_type == Move.CASTLING_TYPE:
+            #moving rook
+            little_castling = pos[0] > ini_pos[0]
+            rook_ini_pos = (pos[0]+1, pos[1]) if little_castling else (pos[0]-2, pos[1])
+            rook = self.pieces_by_pos.pop(rook_ini_pos)
+            rook.pos = (pos[0]-1, pos[1]) if little_castling else (pos[0]+1, pos[1])
+            rook.has_already_moved = True
+            self.pieces_by_pos[rook.pos] = rook
+            if bitboards is not None: bitboards.shift_piece(rook, rook_ini_pos, rook.pos)
+            zobrist_key ^= rook.ZOBRIST_KEYS[color][rook_ini_pos] ^ rook.ZOBRIST_KEYS[color][rook.pos]
+            piece_square_scores[color] += rook.PIECE_SQUARE_VALUES[color][rook.pos] - rook.PIECE_SQUARE_VALUES[color][rook_ini_pos]
+        elif move.special_type == Move.TO_PROMOTE_TYPE:
+            new_piece_class = piece.promote_class_wanted if piece.promote_class_wanted is not None else Queen
+            move_code = move_code & ~(7 << 17) | _PROMOTE_CLASS_TO_CODE.get(new_piece_class, 0) << 17
+            new_piece = new_piece_class(color, pos, self)
+            new_piece.has_already_moved = True
+            self.pieces_by_pos[pos] = new_piece
+            #replacing the Pawn
+            color_list = self.pieces_by_color[color]
+            color_list[color_list.index(piece)] = new_piece
+            if bitboards is not None: bitboards.set_piece(new_piece, pos)
+            zobrist_key ^= new_piece.ZOBRIST_KEYS[color][pos]
+            self.material[color] += new_piece.SCORE_VALUE - piece.SCORE_VALUE
+            piece_square_scores[color] += new_piece.PIECE_SQUARE_VALUES[color][pos]
+        if move.special_type != Move.TO_PROMOTE_TYPE:
+            zobrist_key ^= piece.ZOBRIST_KEYS[color][pos]
+            piece_square_scores[color] += piece.PIECE_SQUARE_VALUES[color][pos]
+
+        record = HistoryRecord(move_code, _PIECE_CLASS_TO_CODE[type(piece)] | color << 3, killed_code, killed_index, flags, self.winner, self.end_reason,
+            self.zobrist_key, self.castling_rights, self.en_passant_x, self.halfmove_clock, self.position_version)
+        self.move_history.append(record)
+        if killed_piece is not None or new_piece is not None:
+            self._removed_pieces[record] = (killed_piece, piece if new_piece is not None else None)
+        self.cur_color_turn = 1 - self.cur_color_turn
+        self.halfmove_clock = 0 if killed_piece is not None or type(piece) == Pawn else self.halfmove_clock + 1
+
+        #castling rights can only change when a Check or a Rook moves or when a Rook is killed
+        if self.castling_rights and (piece.invicible or type(piece) == Rook or type(killed_piece) == Rook):
+            zobrist_key ^= _ZOBRIST_CASTLING_RIGHTS[self.castling_rights]
+            self.castling_rights = self._compute_castling_rights()
+            zobrist_key ^= _ZOBRIST_CASTLING_RIGHTS[self.castling_rights]
+        if self.en_passant_x is not None:
+            zobrist_key ^= _ZOBRIST_EN_PASSANT[self.en_passant_x]
+        self.en_passant_x = self._compute_en_passant_x() if type(piece) == Pawn else None
+        if self.en_passant_x is not None:
+            zobrist_key ^= _ZOBRIST_EN_PASSANT[self.en_passant_x]
+        self.zobrist_key = zobrist_key
+        self.position_counts[zobrist_key] = self.position_counts.get(zobrist_key, 0) + 1
+        self._last_position_version += 1
+        self.position_version = self._last_position_version
+    
+    def unmake_move(self) -> Move:
+        '''
+        | Reverts the last move played (with :meth:`make_move` or :meth:`move_piece`) and returns it, the Board is restored exactly as before the move
+        | The pieces put back are the same objs as before the move, except for moves played on another Board and shared through :attr:`move_history` (new pieces are created)
+        '''
+        try:
+            record = self.move_history.pop()
+        except IndexError:
+            raise ValueError("There is no move to unmake") from None
+        move_code = record.move_code
+        ini_pos = (move_code & 7, move_code >> 3 & 7)
+        pos = (move_code >> 6 & 7, move_code >> 9 & 7)
+        special_type = move_code >> 15 & 3
+        flags = record.flags
+        bitboards = self.bitboards
+        material, piece_square_scores = self.material, self.piece_square_scores
+        killed_piece = pawn = None
+        if record.killed_code or special_type == Move.TO_PROMOTE_TYPE:
+            killed_piece, pawn = self._removed_pieces.pop(record, (None, None))
+
+        self.cur_color_turn = 1 - self.cur_color_turn
+        self.cur_color_turn_in_check = bool(flags & HistoryRecord.IN_CHECK)
+        self.game_ended = bool(flags & HistoryRecord.GAME_ENDED)
+        self.winner = record.winner
+        self.end_reason = record.end_reason
+        position_count = self.position_counts[self.zobrist_key] - 1
+        if position_count:
+            self.position_counts[self.zobrist_key] = position_count
+        else:
+            del self.position_counts[self.zobrist_key]
+        self.zobrist_key = record.zobrist_key
+        self.position_version = record.position_version
+        self.castling_rights = record.castling_rights
+        self.en_passant_x = record.en_passant_x
+        self.halfmove_clock = record.halfmove_clock
+
+        piece = self.pieces_by_pos.pop(pos)
+        color = piece.color
+        piece_square_scores[color] -= piece.PIECE_SQUARE_VALUES[color][pos]
+        if special_type == Move.TO_PROMOTE_TYPE:
+            promoted_piece = piece
+            if pawn is None:
+                pawn = Pawn(color, ini_pos, self)
+                pawn.promote_class_wanted = type(promoted_piece)
+            piece = pawn
+            color_list = self.pieces_by_color[color]
+            color_list[color_list.index(promoted_piece)] = piece
+            material[color] += piece.SCORE_VALUE - promoted_piece.SCORE_VALUE
+            if bitboards is not None:
+                bitboards.clear_piece(promoted_piece, pos)
+                bitboards.set_piece(piece, ini_pos)
+        elif bitboards is not None:
+            bitboards.shift_piece(piece, pos, ini_pos)
+        piece.pos = ini_pos
+        piece.has_already_moved = bool(flags & HistoryRecord.HAD_MOVED)
+        self.pieces_by_pos[ini_pos] = piece
+        piece_square_scores[color] += piece.PIECE_SQUARE_VALUES[color][ini_pos]
+        
+        if special_type == Move.CASTLING_TYPE:
+            rook_ini_pos, rook_pos = record.castling_rook_positions
+            rook = self.pieces_by_pos.pop(rook_pos)
+            if bitboards is not None: bitboards.shift_piece(rook, rook_pos, rook_ini_pos)
+            rook.pos = rook_ini_pos
+            rook.has_already_moved = False #a Rook which has already moved can't castle
+            self.pieces_by_pos[rook_ini_pos] = rook
+            piece_square_scores[color] += rook.PIECE_SQUARE_VALUES[color][rook_ini_pos] - rook.PIECE_SQUARE_VALUES[color][rook_pos]
+
+        if record.killed_code:
+            killed_pos = (pos[0], ini_pos[1]) if special_type == Move.EN_PASSANT_TYPE else pos
+            if killed_piece is None:
+                killed_piece = _CODE_TO_PIECE_CLASS[record.killed_code & 7](record.killed_code >> 3, killed_pos, self)
+                killed_piece.has_already_moved = bool(flags & HistoryRecord.KILLED_HAD_MOVED)
+            #a killed piece keeps its pos
+            killed_color = killed_piece.color
+            self.pieces_by_pos[killed_pos] = killed_piece
+            if bitboards is not None: bitboards.set_piece(killed_piece, killed_pos)
+            self.pieces_by_color[killed_color].insert(record.killed_index, killed_piece)
+            material[killed_color] += killed_piece.SCORE_VALUE
+            piece_square_scores[killed_color] += killed_piece.PIECE_SQUARE_VALUES[killed_color][killed_pos]
+        
+        return Move(move_code >> 12 & 7, piece, pos, special_type if special_type else None)
+
+    def undo(self) -> Move:
+        '''Takes back the last move played (see :meth:`unmake_move`), it can be played again with :meth:`redo` until another move is played with :meth:`move_piece`'''
+        if not self.move_history:
+            raise ValueError("There is no move to undo")
+        self._redo_codes.append(self.move_history[-1].move_code)
+        return self.unmake_move()
+
+    def redo(self) -> Move:
+        '''Plays again the last move taken back with :meth:`undo` and starts the new turn (checkmate and draws are checked)'''
+        if not self._redo_codes:
+            raise ValueError("There is no move to redo")
+        move = Move.decode(self._redo_codes.pop(), self)
+        self.make_move(move)
+        self._new_turn()
+        return move
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_codes)
+    
+    def is_leading_to_check(self, move:Move) -> bool:
+        '''Returns True if the move would put its piece's color's Check in check (the move is played and reverted, so the Board is left unchanged)'''
+        color = move.piece.color
+        self.make_move(move)
+        in_check = self.check_pieces[color].in_check_situation()
+        self.unmake_move()
+        return in_check
+
     def create_hypothesis_board(self, pieces_with_pos_to_change={}):
         '''| Allows you to create hypothesis boards, an independent copy of the current Board
+        | Its move_history shares the records of this Board's one (nothing is copied), so it can be created at any point of a long game
         | Returns another Board obj'''
-        if self.hypothesis_board: print("Warning: creating a hypothesis from another hypothesis")
+        if self.hypothesis_board and self.verbose >= 1: logger.warning("Warning: creating a hypothesis from another hypothesis")
 
-        hypo_board = Board(pieces_by_pos={}, cur_color_turn=self.cur_color_turn, verbose=self.verbose)
+        hypo_board = Board(pieces_by_pos={}, move_history=self.move_history, cur_color_turn=self.cur_color_turn, verbose=self.verbose, use_bitboards=self.use_bitboards)
 
         real_piece_to_hypothesis_piece = {}
         #copying pieces_by_pos
@@ -515,22 +1639,8 @@ class Board:
             real_piece_to_hypothesis_piece[piece] = piece_copy
             pieces_by_pos[pos] = piece_copy
         hypo_board.pieces_by_pos = pieces_by_pos
-
-        #copying moves_history
-        move_history = []
-        for cur_history_point in self.move_history:
-            if cur_history_point['piece'] in real_piece_to_hypothesis_piece:
-                cur_hypothesis_piece = real_piece_to_hypothesis_piece[cur_history_point['piece']]
-            else: #meaning that the piece is dead
-                cur_hypothesis_piece = cur_history_point["piece"]
-            
-            move_history.append({
-                "ini_pos": cur_history_point['ini_pos'],
-                "move": cur_history_point['move'].copy(cur_hypothesis_piece),
-                "piece": cur_hypothesis_piece,
-                "has_already_moved": cur_history_point['has_already_moved']
-            })
-        hypo_board.move_history = move_history
+        hypo_board.halfmove_clock = self.halfmove_clock
+        hypo_board.start_ply = self.start_ply
         
         hypo_board._init_vars()
         
@@ -0,0 +1,253 @@
+'''
+Bitboard representation of a position, it can be kept by a :class:`api.Board` (with `use_bitboards=True`) to generate moves from the occupancy and precomputed attack tables
+
+| The Board then finds attacks, checks, pins and the moves of Knights, Bishops, Rooks, Queens and Checks with it (Pawns still use their own rules)
+
+| A bitboard is an int of 64 bits, the bit `y*8 + x` is set if the case (x, y) is concerned (so the bit 0 is the case (0, 0) and the bit 63 is (7, 7))
+| There is one bitboard for each piece kind of each color (twelve) plus one occupancy bitboard by color
+'''
+
+PIECE_KINDS = ("Pawn", "Knight", "Bishop", "Rook", "Queen", "Check")
+'''Piece kinds order in bitboards (a piece's kind is found with its NAME attribute)'''
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, CHECK = range(6)
+KIND_BY_NAME = {name: kind for kind, name in enumerate(PIECE_KINDS)}
+WHITE, BLACK = 0, 1
+
+FULL_BOARD = (1 << 64) - 1
+
+#directions in (x, y), the first four make the case index increase and the last four make it decrease
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (-1, 1), (-1, 0), (0, -1), (-1, -1), (1, -1))
+LINES_DIRECTIONS = (0, 1, 4, 5)
+DIAGONALS_DIRECTIONS = (2, 3, 6, 7)
+
+
+def pos_to_square(pos:tuple) -> int:
+    return pos[1] * 8 + pos[0]
+
+def square_to_pos(square:int) -> tuple:
+    return (square % 8, square // 8)
+
+def iter_squares(bitboard:int):
+    '''Yields the index of every bit set in bitboard (from the lowest to the highest)'''
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+def count_bits(bitboard:int) -> int:
+    return bin(bitboard).count("1")
+
+
+def _mask_at_vectors(square:int, vectors) -> int:
+    x, y = square_to_pos(square)
+    mask = 0
+    for vector in vectors:
+        target_x, target_y = x + vector[0], y + vector[1]
+        if 0 <= target_x <= 7 and 0 <= target_y <= 7:
+            mask |= 1 << (target_y * 8 + target_x)
+    return mask
+
+def _ray_mask(square:int, direction:tuple) -> int:
+    x, y = square_to_pos(square)
+    mask = 0
+    x, y = x + direction[0], y + direction[1]
+    while 0 <= x <= 7 and 0 <= y <= 7:
+        mask |= 1 << (y * 8 + x)
+        x, y = x + direction[0], y + direction[1]
+    return mask
+
+KNIGHT_ATTACKS = tuple(_mask_at_vectors(sq, ((1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2))) for sq in range(64))
+'''KNIGHT_ATTACKS[square] is the bitboard of cases attacked by a Knight at square'''
+CHECK_ATTACKS = tuple(_mask_at_vectors(sq, DIRECTIONS) for sq in range(64))
+'''CHECK_ATTACKS[square] is the bitboard of cases attacked by a Check at square'''
+PAWN_ATTACKS = (
+    tuple(_mask_at_vectors(sq, ((-1, -1), (1, -1))) for sq in range(64)), #White Pawns go up (y decreasing)
+    tuple(_mask_at_vectors(sq, ((-1, 1), (1, 1))) for sq in range(64))
+)
+'''PAWN_ATTACKS[color][square] is the bitboard of cases attacked by a Pawn of color at square'''
+RAYS = tuple(tuple(_ray_mask(sq, direction) for sq in range(64)) for direction in DIRECTIONS)
+'''RAYS[direction_index][square] is the bitboard of cases from square (excluded) to the board's edge'''
+LINES_MASKS = tuple(RAYS[0][sq] | RAYS[1][sq] | RAYS[4][sq] | RAYS[5][sq] for sq in range(64))
+DIAGONALS_MASKS = tuple(RAYS[2][sq] | RAYS[3][sq] | RAYS[6][sq] | RAYS[7][sq] for sq in range(64))
+SQUARE_POS = tuple(square_to_pos(sq) for sq in range(64))
+'''SQUARE_POS[square] is the (x, y) position of square'''
+
+
+def _between_tables() -> tuple:
+    between = [[0] * 64 for sq in range(64)]
+    blocking_cases = [[None] * 64 for sq in range(64)]
+    for square in range(64):
+        for direction in DIRECTIONS:
+            x, y = square_to_pos(square)
+            mask, cases = 0, []
+            x, y = x + direction[0], y + direction[1]
+            while 0 <= x <= 7 and 0 <= y <= 7:
+                cases.append((x, y))
+                between[square][y * 8 + x] = mask
+                blocking_cases[square][y * 8 + x] = tuple(cases)
+                mask |= 1 << (y * 8 + x)
+                x, y = x + direction[0], y + direction[1]
+    return tuple(map(tuple, between)), tuple(map(tuple, blocking_cases))
+
+BETWEEN, BLOCKING_CASES = _between_tables()
+'''
+| BETWEEN[a][b] is the bitboard of the cases strictly between a and b if they are on the same line or diagonal (0 otherwise)
+| BLOCKING_CASES[a][b] is the tuple of positions from a (excluded) to b (included) if they are aligned (None otherwise), where a piece stops an attack of b on a
+'''
+
+
+def sliding_attacks(square:int, occupancy:int, directions) -> int:
+    '''Cases attacked from square following the directions, each ray stops at (and includes) its first blocker'''
+    attacks = 0
+    for d in directions:
+        ray = RAYS[d][square]
+        blockers = ray & occupancy
+        if blockers:
+            if d < 4:
+                first_blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                first_blocker = blockers.bit_length() - 1
+            ray ^= RAYS[d][first_blocker]
+        attacks |= ray
+    return attacks
+
+def bishop_attacks(square:int, occupancy:int) -> int:
+    return sliding_attacks(square, occupancy, DIAGONALS_DIRECTIONS)
+
+def rook_attacks(square:int, occupancy:int) -> int:
+    return sliding_attacks(square, occupancy, LINES_DIRECTIONS)
+
+def queen_attacks(square:int, occupancy:int) -> int:
+    return sliding_attacks(square, occupancy, range(8))
+
+
+class BitboardPosition:
+    '''Pieces' positions stored as bitboards, updated piece by piece (it doesn't know about turns or castling)'''
+    def __init__(self):
+        self.pieces = [0] * 12
+        '''Bitboards by piece, the index is `color*6 + kind`'''
+        self.occupied = [0, 0]
+        '''Occupancy bitboard by color'''
+        self.occupied_all = 0
+        '''Occupancy bitboard of both colors'''
+
+    @classmethod
+    def from_board(cls, board):
+        '''Creates the bitboards of a :class:`api.Board`'''
+        position = cls()
+        for pos, piece in board.pieces_by_pos.items():
+            position.set_piece(piece, pos)
+        return position
+
+    #these are called for every move made and unmade by the Board
+    def set_piece(self, piece, pos:tuple):
+        '''Adds a :class:`api.Piece` at pos'''
+        bit = 1 << (pos[1] * 8 + pos[0])
+        self.pieces[piece.color*6 + KIND_BY_NAME[piece.NAME]] |= bit
+        self.occupied[piece.color] |= bit
+        self.occupied_all |= bit
+
+    def clear_piece(self, piece, pos:tuple):
+        '''Removes a :class:`api.Piece` from pos'''
+        bit = 1 << (pos[1] * 8 + pos[0])
+        self.pieces[piece.color*6 + KIND_BY_NAME[piece.NAME]] ^= bit
+        self.occupied[piece.color] ^= bit
+        self.occupied_all ^= bit
+
+    def shift_piece(self, piece, from_pos:tuple, to_pos:tuple):
+        '''Moves a :class:`api.Piece` from from_pos to the empty case to_pos'''
+        bits = (1 << (from_pos[1] * 8 + from_pos[0])) | (1 << (to_pos[1] * 8 + to_pos[0]))
+        self.pieces[piece.color*6 + KIND_BY_NAME[piece.NAME]] ^= bits
+        self.occupied[piece.color] ^= bits
+        self.occupied_all ^= bits
+
+    def piece_at(self, square:int) -> tuple or None:
+        '''Returns (kind, color) of the piece at square or None'''
+        bit = 1 << square
+        if not self.occupied_all & bit:
+            return None
+        for index in range(12):
+            if self.pieces[index] & bit:
+                return (index % 6, index // 6)
+
+    def piece_attacks(self, kind:int, color:int, square:int) -> int:
+        '''Bitboard of the cases attacked by a piece of this kind and color at square (own pieces included)'''
+        if kind == PAWN:
+            return PAWN_ATTACKS[color][square]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[square]
+        if kind == BISHOP:
+            return bishop_attacks(square, self.occupied_all)
+        if kind == ROOK:
+            return rook_attacks(square, self.occupied_all)
+        if kind == QUEEN:
+            return queen_attacks(square, self.occupied_all)
+        return CHECK_ATTACKS[square]
+
+    def piece_targets(self, kind:int, color:int, square:int):
+        '''Squares a piece of this kind and color at square can go to or kill on (the other color's Check excluded), without considering its own Check'''
+        return iter_squares(self.piece_attacks(kind, color, square) & ~(self.occupied[color] | self.pieces[(1 - color) * 6 + CHECK]))
+
+    def attacked_squares(self, color:int) -> int:
+        '''Bitboard of every case attacked by at least one piece of color'''
+        attacks = 0
+        for kind in range(6):
+            for square in iter_squares(self.pieces[color*6 + kind]):
+                attacks |= self.piece_attacks(kind, color, square)
+        return attacks
+
+    def is_square_attacked(self, square:int, by_color:int, occupied:int or None=None) -> bool:
+        '''Returns True if a piece of by_color attacks square, occupied replaces the occupancy of both colors if given (to see through a piece that would move)'''
+        pieces = self.pieces
+        offset = by_color * 6
+        if KNIGHT_ATTACKS[square] & pieces[offset + KNIGHT]:
+            return True
+        #a Pawn of by_color attacks square if a Pawn of the other color at square would attack it
+        if PAWN_ATTACKS[1 - by_color][square] & pieces[offset + PAWN]:
+            return True
+        if CHECK_ATTACKS[square] & pieces[offset + CHECK]:
+            return True
+        if occupied is None:
+            occupied = self.occupied_all
+        queens = pieces[offset + QUEEN]
+        sliders = ((pieces[offset + BISHOP] | queens) & DIAGONALS_MASKS[square]) | ((pieces[offset + ROOK] | queens) & LINES_MASKS[square])
+        between = BETWEEN[square]
+        while sliders: #a slider aligned with square attacks it if no piece stands between them
+            bit = sliders & -sliders
+            if not between[bit.bit_length() - 1] & occupied:
+                return True
+            sliders ^= bit
+        return False
+
+    def check_targets(self, color:int) -> list:
+        '''Squares where the Check of color can go without being attacked (castlings excluded)'''
+        check = self.pieces[color * 6 + CHECK]
+        square = check.bit_length() - 1
+        occupied = self.occupied_all ^ check #the Check doesn't block the rays going through its case anymore
+        opponent_color = 1 - color
+        return [target for target in iter_squares(CHECK_ATTACKS[square] & ~self.occupied[color]) if not self.is_square_attacked(target, opponent_color, occupied)]
+
+    def checkers_and_pins(self, color:int) -> tuple:
+        '''
+        | Returns (checkers_cases, pins) for the Check of color, like :meth:`api.Board._checkers_and_pins` but pins are keyed by the pinned pieces' positions
+        | checkers_cases has, for each piece giving check, the cases where a move stops this check, pins has the cases each pinned piece can go to
+        '''
+        pieces = self.pieces
+        square = pieces[color * 6 + CHECK].bit_length() - 1
+        offset = (1 - color) * 6
+        checkers_cases = [(SQUARE_POS[attacker],) for attacker in iter_squares(KNIGHT_ATTACKS[square] & pieces[offset + KNIGHT] | PAWN_ATTACKS[color][square] & pieces[offset + PAWN])]
+        pins = {}
+        queens = pieces[offset + QUEEN]
+        sliders = ((pieces[offset + BISHOP] | queens) & DIAGONALS_MASKS[square]) | ((pieces[offset + ROOK] | queens) & LINES_MASKS[square])
+        occupied, own_occupied = self.occupied_all, self.occupied[color]
+        between, blocking_cases = BETWEEN[square], BLOCKING_CASES[square]
+        while sliders:
+            bit = sliders & -sliders
+            attacker = bit.bit_length() - 1
+            blockers = between[attacker] & occupied
+            if not blockers:
+                checkers_cases.append(blocking_cases[attacker])
+            elif not blockers & (blockers - 1) and blockers & own_occupied: #a single piece of color between them is pinned
+                pins[SQUARE_POS[blockers.bit_length() - 1]] = blocking_cases[attacker]
+            sliders ^= bit
+        return checkers_cases, pins
@@ -0,0 +1,152 @@
+'''
+Datasets of positions stored in a file of fixed size records, read through mmap as a NumPy structured array (NumPy is needed)
+
+| A record is a position packed with :meth:`api.Board.to_bytes`, the turn's color, the game result and a best move (:meth:`api.Move.encode`, 0 if unknown)
+| Positions are written with a :class:`DatasetWriter` and read with a :class:`Dataset`, which never loads the whole file
+| and only creates a :class:`api.Board` when it is asked for one
+'''
+import mmap
+import struct
+from random import Random
+from pygame_chess_api.api import Board, Move
+try:
+    import numpy as np
+except ImportError: #the module can be imported, but Dataset needs NumPy
+    np = None
+
+MAGIC = b"PCADSET1"
+HEADER = struct.Struct("<8sI4x")
+'''File header: MAGIC and the record size'''
+RECORD = struct.Struct(f"<{Board.BYTES_SIZE}sBbI")
+'''Record layout: packed position, turn's color, result, best move code'''
+WHITE_WON, DRAW, BLACK_WON, UNKNOWN_RESULT = 1, 0, -1, -128
+'''Values of a record's result'''
+
+
+def record_dtype():
+    '''NumPy dtype of a record (same layout as :attr:`RECORD`)'''
+    if np is None:
+        raise ImportError("NumPy is needed to read datasets, install it with `pip install pygame_chess_api[fast]` (or `pip install numpy`)")
+    return np.dtype([("position", np.uint8, (Board.BYTES_SIZE,)), ("color", np.uint8), ("result", np.int8), ("best_move", "<u4")])
+
+def result_from_winner(winner) -> int:
+    '''Result of a game from :attr:`api.Board.winner` (a color, None for a draw, False if the game isn't ended)'''
+    if winner is False:
+        return UNKNOWN_RESULT
+    if winner is None:
+        return DRAW
+    return WHITE_WON if winner == 0 else BLACK_WON
+
+
+class DatasetWriter:
+    '''Appends records to a dataset file (it is created if it doesn't exist), use it in a with statement or call :meth:`close`'''
+    def __init__(self, path:str):
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, RECORD.size))
+        else:
+            _read_header(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, board:Board, result=UNKNOWN_RESULT, best_move:Move or None=None):
+        '''Appends the current position of board, result being :attr:`WHITE_WON`, :attr:`DRAW`, :attr:`BLACK_WON` or :attr:`UNKNOWN_RESULT`'''
+        self.file.write(RECORD.pack(board.to_bytes(), board.cur_color_turn, result, best_move.encode() if best_move is not None else 0))
+
+    def append_game(self, board:Board, result=None):
+        '''
+        | Appends every position of the game played on board (from the first one of its move_history), with the move played as best move
+        | If result is None, it is given by :attr:`api.Board.winner`. The game is replayed on a hypothesis copy, board is left unchanged
+        '''
+        result = result if result is not None else result_from_winner(board.winner)
+        replay_board = board.create_hypothesis_board() #its move_history shares board's records
+        move_codes = []
+        while replay_board.move_history:
+            move_codes.append(replay_board.move_history[-1].move_code)
+            replay_board.unmake_move()
+        move_codes.reverse()
+        for move_code in move_codes:
+            move = Move.decode(move_code, replay_board) #pieces created by a promotion are new objs at each replay
+            self.append(replay_board, result, move)
+            replay_board.make_move(move)
+        self.append(replay_board, result)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def _read_header(path:str):
+    with open(path, "rb") as file:
+        magic, record_size = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} isn't a dataset file or was written with another record layout")
+
+
+class Dataset:
+    '''
+    | Read-only access to a dataset file, :attr:`records` is a NumPy structured array mapped on the file (nothing is copied)
+    | Records appended after the Dataset is opened are seen once it is opened again
+    '''
+    def __init__(self, path:str):
+        self.path = path
+        _read_header(path)
+        dtype = record_dtype()
+        self.file = open(path, "rb")
+        self._mmap = None
+        self.records = np.zeros(0, dtype=dtype)
+        '''Structured array with the fields position, color, result and best_move'''
+        records_count = (self.file.seek(0, 2) - HEADER.size) // RECORD.size
+        if records_count:
+            self._mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.records = np.frombuffer(self._mmap, dtype=dtype, count=records_count, offset=HEADER.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def board(self, index:int, verbose=0, use_bitboards=False) -> Board:
+        '''Board of the record at index'''
+        return Board.from_bytes(self.records["position"][index].data, verbose=verbose, use_bitboards=use_bitboards)
+
+    def best_move(self, index:int, board:Board) -> Move or None:
+        '''Best move of the record at index for board (made with :meth:`board`)'''
+        code = int(self.records["best_move"][index])
+        return Move.decode(code, board) if code else None
+
+    def iter_boards(self, start=0, stop=None, verbose=0):
+        '''Yields (index, Board) for each record from start to stop, a Board is only created when it is needed'''
+        for index in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield index, self.board(index, verbose)
+
+    def sample_indices(self, count:int, seed=None) -> list:
+        '''count random record indexes (without repetition if possible)'''
+        random = Random(seed)
+        if count <= len(self):
+            return random.sample(range(len(self)), count)
+        return [random.randrange(len(self)) for i in range(count)]
+
+    def sample(self, count:int, seed=None):
+        '''Structured array of count random records (only these records are read and copied), for training batches'''
+        return self.records[np.array(self.sample_indices(count, seed), dtype=np.int64)]
+
+    def close(self):
+        #the mmap is closed when the last array using it (records or a view on it kept by the user) is deleted
+        self.records = self.records[:0].copy()
+        self._mmap = None
+        self.file.close()
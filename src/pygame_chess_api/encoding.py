@@ -0,0 +1,37 @@
+'''
+Lists of positions packed in one buffer, each position taking :attr:`api.Board.BYTES_SIZE` bytes (see :meth:`api.Board.to_bytes`)
+
+| Buffers can be bytes, bytearray, memoryview or any obj supporting the buffer protocol (like an mmap), they aren't copied when reading
+| so a position can be read at any index without decoding the previous ones
+'''
+from pygame_chess_api.api import Board
+
+POSITION_SIZE = Board.BYTES_SIZE
+
+
+def encode_many(boards) -> bytes:
+    '''Packs every Board of the iterable boards, one after the other'''
+    return b"".join(board.to_bytes() for board in boards)
+
+def positions_count(buffer) -> int:
+    view = memoryview(buffer)
+    if view.nbytes % POSITION_SIZE:
+        raise ValueError(f"The buffer size ({view.nbytes} bytes) isn't a multiple of {POSITION_SIZE}")
+    return view.nbytes // POSITION_SIZE
+
+def position_at(buffer, index:int) -> memoryview:
+    '''Packed position at index (a view on the buffer, nothing is copied)'''
+    view = memoryview(buffer).cast("B")
+    if not 0 <= index < positions_count(view):
+        raise IndexError(f"There is no position at index {index}")
+    return view[index * POSITION_SIZE:(index + 1) * POSITION_SIZE]
+
+def iter_decode(buffer, verbose=0, use_bitboards=False):
+    '''Yields a Board for each position of the buffer, Boards are only created when they are needed'''
+    view = memoryview(buffer).cast("B")
+    for index in range(positions_count(view)):
+        yield Board.from_bytes(view[index * POSITION_SIZE:(index + 1) * POSITION_SIZE], verbose=verbose, use_bitboards=use_bitboards)
+
+def decode_many(buffer, verbose=0, use_bitboards=False) -> list:
+    '''List of the Boards of every position of the buffer'''
+    return list(iter_decode(buffer, verbose, use_bitboards))
@@ -0,0 +1,339 @@
+'''
+A search engine to quickly build AIs on top of :class:`api.Board`
+(iterative deepening alpha-beta with a transposition table, quiescence search and move ordering)
+'''
+import logging
+import threading
+from time import perf_counter
+from pygame_chess_api.api import Board, Move, Piece, Queen
+
+logger = logging.getLogger("pygame_chess_api.engine")
+
+
+class TranspositionTable:
+    '''Fixed size table storing search results by :attr:`api.Board.zobrist_key`'''
+    EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+    def __init__(self, size_power_of_two=18):
+        self.size = 1 << size_power_of_two
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        '''Entries are tuples (key, depth, score, flag, best_move_code, generation), moves being packed with :meth:`api.Move.encode`'''
+        self.generation = 0
+        '''Increased at each new search, entries of older searches are always replaced'''
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        self.entries = [None] * self.size
+
+    def get(self, key:int) -> tuple or None:
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key:int, depth:int, score:int, flag:int, best_move_code:int or None):
+        '''Replacement policy: an entry is replaced by a deeper (or as deep) result, or by any result if it comes from a previous search'''
+        index = key & self.mask
+        entry = self.entries[index]
+        if entry is None or entry[5] != self.generation or depth >= entry[1] or entry[0] == key:
+            if best_move_code is None and entry is not None and entry[0] == key:
+                best_move_code = entry[4] #keeping the known best move
+            self.entries[index] = (key, depth, score, flag, best_move_code, self.generation)
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class Engine:
+    '''
+    | Searches the best move for the current playing color of a :class:`api.Board`
+    | An Engine obj can be given directly as `function_for_AIs` to :meth:`render.Gui.run_pygame_loop`, it will play the best move found
+    '''
+    MATE_SCORE = 100000
+    '''Score of a checkmate (minus the number of moves to reach it)'''
+    INFINITE = 1000000
+    SCORE_UNIT = 100 #scores are given in hundredths of a Pawn
+    TIME_CHECK_INTERVAL = 1024 #nodes between two verifications of the time budget
+
+    def __init__(self, max_depth=4, time_budget=None, transposition_table_size_power_of_two=18, quiescence=True, verbose=1, book=None, tablebase=None):
+        self.max_depth = max_depth
+        '''Maximum depth (in half-moves) of the iterative deepening'''
+        self.time_budget = time_budget
+        '''Maximum time in seconds for a search (None for no limit), the best move of the last completed depth is returned'''
+        self.quiescence = quiescence
+        '''If True, leaves are extended with KILL_MOVEs until the position is calm'''
+        self.verbose = verbose
+        self.book = book
+        ''':class:`book.OpeningBook` consulted before each search (None for no book), a book move is returned without searching'''
+        self.tablebase = tablebase
+        ''':class:`tablebase.Tablebase` probed at each node with few pieces (None for no tablebase), its exact result replaces the search of the node'''
+        self.transposition_table = TranspositionTable(transposition_table_size_power_of_two)
+        self.last_search_info = {}
+        '''Stats of the last search: depth, score, nodes, time, nodes_per_second, best_move and book (True if the move comes from the book)'''
+        self.nodes = 0
+        '''Nodes searched by the running or the last search (:meth:`search` or :meth:`search_move_score`)'''
+        self._deadline = None
+        self._stop_event = threading.Event()
+        self._killer_moves = []
+        self._history_scores = {}
+
+    def __call__(self, board:Board) -> Move:
+        '''Searches and plays the best move on board (Pawns promote to a Queen if they have no promote_class_wanted)'''
+        move = self.search(board)
+        if move.special_type == Move.TO_PROMOTE_TYPE and move.piece.promote_class_wanted is None:
+            move.piece.promote_class_wanted = Queen
+        board.move_piece(move.piece, move)
+        return move
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_stop_event"] #an Event can't be pickled (engines are sent to processes by selfplay)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        '''
+        | Can be called from another thread to end the running search as soon as possible, it returns the best move of the last completed depth (the depth 1 is always completed)
+        | The request is cleared when the search ends, if no search is running the next one stops after its depth 1
+        '''
+        self._stop_event.set()
+
+    def search(self, board:Board, max_depth=None, time_budget=None) -> Move or None:
+        '''Returns the best move found for the current playing color (None if there is no move allowed), board is left unchanged'''
+        max_depth = max_depth if max_depth is not None else self.max_depth
+        time_budget = time_budget if time_budget is not None else self.time_budget
+        t_start = perf_counter()
+        book_move = self.book.choose_move(board) if self.book is not None else None
+        if book_move is not None:
+            self._stop_event.clear()
+            elapsed = perf_counter() - t_start
+            self.last_search_info = {"depth": 0, "score": 0, "nodes": 0, "time": elapsed, "nodes_per_second": 0, "best_move": book_move, "book": True}
+            if self.verbose >= 1: logger.info(f"Engine played a book move found in {round(elapsed*1000000)} µs")
+            return book_move
+        self._deadline = t_start + time_budget if time_budget is not None else None
+        self.nodes = 0
+        self._killer_moves = [[None, None] for i in range(max_depth + 64)]
+        self._history_scores = {}
+        self.transposition_table.new_search()
+        root_history_length = len(board.move_history)
+
+        root_moves = self.generate_moves(board)
+        best_move, best_score, completed_depth = (root_moves[0] if root_moves else None), 0, 0
+        for depth in range(1, max_depth + 1):
+            if not root_moves:
+                break
+            try:
+                score, move = self._search_root(board, root_moves, depth, check_time=depth > 1)
+            except _SearchTimeout:
+                while len(board.move_history) > root_history_length:
+                    board.unmake_move()
+                break
+            best_move, best_score, completed_depth = move, score, depth
+            #the best move is searched first at the next depth
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            if self.verbose >= 2: logger.debug(f"depth {depth}: score {score}, {self.nodes} nodes, best move: {move}")
+            if abs(score) >= self.MATE_SCORE - 1000:
+                break #a checkmate has been found
+
+        self._stop_event.clear()
+        elapsed = perf_counter() - t_start
+        self.last_search_info = {"depth": completed_depth, "score": best_score, "nodes": self.nodes, "time": elapsed,
+            "nodes_per_second": self.nodes / elapsed if elapsed > 0 else 0, "best_move": best_move, "book": False}
+        if self.verbose >= 1:
+            logger.info(f"Engine searched depth {completed_depth} in {round(elapsed*1000)} ms ({self.nodes} nodes, {round(self.last_search_info['nodes_per_second'])} nodes/s), score: {best_score}")
+        return best_move
+
+    def search_move_score(self, board:Board, move:Move, depth:int, alpha=None, beta=None, time_budget=None) -> int or None:
+        '''
+        | Searches only move (of the current playing color) at depth within the window (alpha, beta) (None for an infinite bound), returns its score
+        | (fail-soft: a score <= alpha is an upper bound, a score >= beta a lower bound), or None if the time budget is over
+        | It is used to split the root moves of a search between processes (see :mod:`parallel`), board is left unchanged
+        '''
+        alpha = alpha if alpha is not None else -self.INFINITE
+        beta = beta if beta is not None else self.INFINITE
+        self._deadline = perf_counter() + time_budget if time_budget is not None else None
+        self.nodes = 0
+        self._killer_moves = [[None, None] for i in range(depth + 64)]
+        self.transposition_table.new_search()
+        history_length = len(board.move_history)
+        board.make_move(move)
+        try:
+            score = -self._negamax(board, depth - 1, -beta, -alpha, 1, check_time=True)
+        except _SearchTimeout:
+            score = None
+            while len(board.move_history) > history_length + 1:
+                board.unmake_move()
+        board.unmake_move()
+        self._stop_event.clear()
+        return score
+
+    def generate_moves(self, board:Board) -> list:
+        '''Every move allowed for the current playing color'''
+        return board.legal_moves()
+
+    def evaluate(self, board:Board) -> int:
+        '''Static evaluation for the current playing color (material and piece-square tables differences, both kept up to date by the board)'''
+        color = board.cur_color_turn
+        material, piece_square_scores = board.material, board.piece_square_scores
+        return (material[color] - material[1 - color]) * self.SCORE_UNIT + piece_square_scores[color] - piece_square_scores[1 - color]
+
+    def _search_root(self, board:Board, root_moves:list, depth:int, check_time:bool):
+        alpha, beta = -self.INFINITE, self.INFINITE
+        best_move = root_moves[0]
+        for move in root_moves:
+            board.make_move(move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, 1, check_time)
+            board.unmake_move()
+            if score > alpha:
+                alpha, best_move = score, move
+        self.transposition_table.store(board.zobrist_key, depth, alpha, TranspositionTable.EXACT, best_move.encode())
+        return alpha, best_move
+
+    def _count_node(self, check_time:bool):
+        self.nodes += 1
+        if check_time and self.nodes % self.TIME_CHECK_INTERVAL == 0 and (self._stop_event.is_set() or (self._deadline is not None and perf_counter() > self._deadline)):
+            raise _SearchTimeout()
+
+    def _negamax(self, board:Board, depth:int, alpha:int, beta:int, ply:int, check_time:bool) -> int:
+        self._count_node(check_time)
+        key = board.zobrist_key
+        alpha_origin = alpha
+        entry = self.transposition_table.get(key)
+        tt_move_code = None
+        if entry is not None:
+            tt_move_code = entry[4]
+            if entry[1] >= depth:
+                score = self._score_from_table(entry[2], ply)
+                if entry[3] == TranspositionTable.EXACT:
+                    return score
+                if entry[3] == TranspositionTable.LOWER_BOUND and score >= beta:
+                    return score
+                if entry[3] == TranspositionTable.UPPER_BOUND and score <= alpha:
+                    return score
+
+        if self.tablebase is not None:
+            result = self.tablebase.probe(board)
+            if result is not None:
+                return result[0] * (self.MATE_SCORE - ply - result[1]) #0 for a draw
+
+        if depth <= 0:
+            return self._quiescence(board, alpha, beta, ply, check_time) if self.quiescence else self.evaluate(board)
+
+        moves = self.generate_moves(board)
+        if not moves:
+            if board.check_pieces[board.cur_color_turn].in_check_situation():
+                return -self.MATE_SCORE + ply #checkmate
+            return 0 #stalemate
+
+        best_score, best_move = -self.INFINITE, None
+        for move in self._order_moves(moves, ply, tt_move_code):
+            board.make_move(move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1, check_time)
+            board.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if move.type == Move.TO_EMPTY_MOVE:
+                    move_code = move.encode()
+                    self._store_killer_move(move_code, ply)
+                    history_key = move.piece.color << 12 | move_code & 0xFFF #color, piece's case and target case
+                    self._history_scores[history_key] = self._history_scores.get(history_key, 0) + depth * depth
+                break
+
+        if best_score <= alpha_origin:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_score >= beta:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.transposition_table.store(key, depth, self._score_to_table(best_score, ply), flag, best_move.encode())
+        return best_score
+
+    def _quiescence(self, board:Board, alpha:int, beta:int, ply:int, check_time:bool) -> int:
+        '''Only KILL_MOVEs are searched so the evaluation isn't done in the middle of an exchange'''
+        self._count_node(check_time)
+        stand_pat = self.evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        color = board.cur_color_turn
+        kill_moves = []
+        for piece in tuple(board.pieces_by_color[color]):
+            for move in piece.iter_moves_allowed(skip_check_verification=True):
+                if move.type == Move.KILL_MOVE:
+                    kill_moves.append(move)
+                elif move.type == Move.TO_EMPTY_MOVE or move.special_type == Move.CASTLING_TYPE:
+                    break #captures are yielded first, the other moves aren't generated
+        kill_moves.sort(key=self._mvv_lva, reverse=True)
+
+        for move in kill_moves:
+            board.make_move(move)
+            if board.check_pieces[color].in_check_situation(): #the move wasn't allowed
+                board.unmake_move()
+                continue
+            score = -self._quiescence(board, -beta, -alpha, ply + 1, check_time)
+            board.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _mvv_lva(self, move:Move) -> int:
+        '''Most Valuable Victim - Least Valuable Attacker'''
+        victim = move.piece.board.pieces_by_pos.get(move.target)
+        victim_value = victim.SCORE_VALUE if victim is not None else Piece.SCORE_VALUE
+        if move.special_type == Move.EN_PASSANT_TYPE:
+            victim_value = 1
+        return victim_value * 16 - move.piece.SCORE_VALUE
+
+    def _order_moves(self, moves:list, ply:int, tt_move_code:int or None) -> list:
+        killers = self._killer_moves[ply]
+        color_bits = moves[0].piece.color << 12
+        def move_order_score(move):
+            move_code = move.encode()
+            if move_code == tt_move_code:
+                return 1 << 30
+            if move.type == Move.KILL_MOVE or move.special_type == Move.EN_PASSANT_TYPE:
+                return (1 << 28) + self._mvv_lva(move)
+            if move.special_type == Move.TO_PROMOTE_TYPE:
+                return 1 << 27
+            if move_code == killers[0]:
+                return 1 << 26
+            if move_code == killers[1]:
+                return (1 << 26) - 1
+            return self._history_scores.get(color_bits | move_code & 0xFFF, 0)
+        return sorted(moves, key=move_order_score, reverse=True)
+
+    def _store_killer_move(self, move_code:int, ply:int):
+        killers = self._killer_moves[ply]
+        if killers[0] != move_code:
+            killers[1] = killers[0]
+            killers[0] = move_code
+
+    def _score_to_table(self, score:int, ply:int) -> int:
+        #mate scores are stored relatively to the current node
+        if score >= self.MATE_SCORE - 1000:
+            return score + ply
+        if score <= -self.MATE_SCORE + 1000:
+            return score - ply
+        return score
+
+    def _score_from_table(self, score:int, ply:int) -> int:
+        if score >= self.MATE_SCORE - 1000:
+            return score - ply
+        if score <= -self.MATE_SCORE + 1000:
+            return score + ply
+        return score
@@ -0,0 +1,221 @@
+'''
+Position evaluation with NumPy, for one :class:`api.Board` or for thousands of positions at once (NumPy is needed)
+
+| A position is turned into 768 features: 12 planes (one by color and piece class, index `color*6 + class index` with the classes of
+| :attr:`api.Board.SNAPSHOT_CLASSES`) of 64 cases (index `y*8 + x`), a feature is 1 if the piece is at the case
+| The evaluation is the material with piece-square tables (:attr:`api.Piece.PIECE_SQUARE_TABLE`), plus the mobility computed from attack maps
+| and the pawn structure (doubled, isolated and passed Pawns). Scores are in hundredths of a Pawn
+'''
+from pygame_chess_api.api import Board, Piece, Rook, HistoryRecord
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FEATURES_SIZE = 768
+PIECE_CLASSES = Board.SNAPSHOT_CLASSES
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, CHECK = range(6)
+MOBILITY_WEIGHTS = (0, 4, 4, 2, 1, 0)
+'''Bonus by piece class for each case attacked which isn't occupied by a piece of the same color'''
+DOUBLED_PAWN_PENALTY = 15
+ISOLATED_PAWN_PENALTY = 15
+PASSED_PAWN_BONUS = (0, 5, 10, 20, 35, 60, 100, 0)
+'''Bonus of a passed Pawn by the number of lines it went over from its color's back line'''
+
+#bitboards directions: (shift of the case index, mask removing the cases where a shift wrapped around the board)
+_FILE_0, _FILE_7 = 0x0101010101010101, 0x8080808080808080
+_FULL = (1 << 64) - 1
+_DIAGONALS_SHIFTS = ((9, _FULL ^ _FILE_0), (7, _FULL ^ _FILE_7), (-7, _FULL ^ _FILE_0), (-9, _FULL ^ _FILE_7))
+_LINES_SHIFTS = ((1, _FULL ^ _FILE_0), (-1, _FULL ^ _FILE_7), (8, _FULL), (-8, _FULL))
+_KNIGHT_SHIFTS = ((17, _FULL ^ _FILE_0), (15, _FULL ^ _FILE_7), (10, _FULL ^ _FILE_0 ^ _FILE_0 << 1), (6, _FULL ^ _FILE_7 ^ _FILE_7 >> 1),
+    (-6, _FULL ^ _FILE_0 ^ _FILE_0 << 1), (-10, _FULL ^ _FILE_7 ^ _FILE_7 >> 1), (-15, _FULL ^ _FILE_0), (-17, _FULL ^ _FILE_7))
+
+
+def _need_numpy():
+    if np is None:
+        raise ImportError("NumPy is needed for evaluations, install it with `pip install pygame_chess_api[fast]` (or `pip install numpy`)")
+
+def feature_index(piece:Piece, pos:tuple) -> int:
+    return ((piece.color * 6 + PIECE_CLASSES.index(type(piece))) * 64) + pos[1] * 8 + pos[0]
+
+def material_weights():
+    '''Weight of each feature for the material and piece-square tables (positive for White, negative for Black)'''
+    _need_numpy()
+    weights = np.zeros(FEATURES_SIZE, dtype=np.int32)
+    for color, sign in ((Piece.WHITE, 1), (Piece.BLACK, -1)):
+        for kind, piece_class in enumerate(PIECE_CLASSES):
+            table = np.array(piece_class.PIECE_SQUARE_TABLE, dtype=np.int32)
+            if color == Piece.BLACK:
+                table = table.reshape(8, 8)[::-1].reshape(64) #the case (x, y) of a Black piece uses the case (x, 7 - y) of the table
+            start = (color * 6 + kind) * 64
+            weights[start:start + 64] = sign * (piece_class.SCORE_VALUE * 100 + table)
+    return weights
+
+_MATERIAL_WEIGHTS = material_weights() if np is not None else None
+
+
+def features(board:Board):
+    '''Features of board (array of 768 uint8)'''
+    _need_numpy()
+    position_features = np.zeros(FEATURES_SIZE, dtype=np.uint8)
+    for pos, piece in board.pieces_by_pos.items():
+        position_features[feature_index(piece, pos)] = 1
+    return position_features
+
+def features_many(boards):
+    '''Features of each Board of the iterable boards (array of shape (number of boards, 768))'''
+    _need_numpy()
+    return np.array([features(board) for board in boards], dtype=np.uint8).reshape(-1, FEATURES_SIZE)
+
+def features_from_bytes(buffer):
+    '''
+    | Features of positions packed with :meth:`api.Board.to_bytes`, without creating any Board
+    | buffer can be bytes/memoryview (like the buffers of :mod:`encoding`) or a uint8 array of shape (number of positions, 34) like the `position` field of a :class:`dataset.Dataset`
+    '''
+    _need_numpy()
+    data = np.asarray(buffer, dtype=np.uint8) if isinstance(buffer, np.ndarray) else np.frombuffer(buffer, dtype=np.uint8)
+    data = data.reshape(-1, Board.BYTES_SIZE)
+    cases = np.empty((len(data), 64), dtype=np.uint8)
+    cases[:, 0::2] = data[:, :32] & 15
+    cases[:, 1::2] = data[:, :32] >> 4
+    positions, squares = np.nonzero(cases)
+    codes = cases[positions, squares]
+    planes = np.zeros((len(data), 12, 64), dtype=np.uint8)
+    planes[positions, (codes >> 3) * 6 + (codes & 7) - 1, squares] = 1
+    return planes.reshape(-1, FEATURES_SIZE)
+
+def colors_from_bytes(buffer):
+    '''Turn's color of positions packed with :meth:`api.Board.to_bytes` (same buffers as :func:`features_from_bytes`)'''
+    _need_numpy()
+    data = np.asarray(buffer, dtype=np.uint8) if isinstance(buffer, np.ndarray) else np.frombuffer(buffer, dtype=np.uint8)
+    return data.reshape(-1, Board.BYTES_SIZE)[:, 32] & 1
+
+
+def _popcount(bitboards):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitboards).astype(np.int32)
+    return np.unpackbits(bitboards.view(np.uint8).reshape(bitboards.shape + (8,)), axis=-1).sum(axis=-1, dtype=np.int32)
+
+def _shift(bitboards, shift:int, mask:int):
+    if shift > 0:
+        return (bitboards << np.uint64(shift)) & np.uint64(mask)
+    return (bitboards >> np.uint64(-shift)) & np.uint64(mask)
+
+def _sliding_attacks(pieces, empty, shifts):
+    '''Cases attacked by sliding pieces (an array of bitboards) in the directions of shifts, rays stop at the first occupied case (Kogge-Stone fill)'''
+    attacks = np.zeros_like(pieces)
+    for shift, mask in shifts:
+        generator, propagator = pieces, empty & np.uint64(mask)
+        for step in (shift, shift * 2, shift * 4):
+            generator = generator | (propagator & _shift(generator, step, _FULL))
+            propagator = propagator & _shift(propagator, step, _FULL)
+        attacks |= _shift(generator, shift, mask)
+    return attacks
+
+def _mobility(bitboards):
+    '''Mobility score (White - Black) of bitboards of shape (number of positions, 12)'''
+    occupied = [np.bitwise_or.reduce(bitboards[:, color * 6:color * 6 + 6], axis=1) for color in range(2)]
+    empty = ~(occupied[0] | occupied[1])
+    score = np.zeros(len(bitboards), dtype=np.int32)
+    for color, sign in ((Piece.WHITE, 1), (Piece.BLACK, -1)):
+        not_own_pieces = ~occupied[color]
+        knights = bitboards[:, color * 6 + KNIGHT]
+        knights_attacks = np.zeros_like(knights)
+        for shift, mask in _KNIGHT_SHIFTS:
+            knights_attacks |= _shift(knights, shift, mask)
+        queens = bitboards[:, color * 6 + QUEEN]
+        attacks_by_kind = ((KNIGHT, knights_attacks), (BISHOP, _sliding_attacks(bitboards[:, color * 6 + BISHOP], empty, _DIAGONALS_SHIFTS)),
+            (ROOK, _sliding_attacks(bitboards[:, color * 6 + ROOK], empty, _LINES_SHIFTS)),
+            (QUEEN, _sliding_attacks(queens, empty, _DIAGONALS_SHIFTS) | _sliding_attacks(queens, empty, _LINES_SHIFTS)))
+        for kind, attacks in attacks_by_kind:
+            score += sign * MOBILITY_WEIGHTS[kind] * _popcount(attacks & not_own_pieces)
+    return score
+
+def _pawn_structure(planes):
+    '''Pawn structure score (White - Black) of planes of shape (number of positions, 12, 64)'''
+    lines = np.arange(8).reshape(1, 8, 1)
+    pawns = [planes[:, color * 6 + PAWN].reshape(-1, 8, 8).astype(bool) for color in range(2)] #[position, y, x]
+    score = np.zeros(len(planes), dtype=np.int32)
+    #for each column, the smallest y of Black Pawns (8 if there is none) and the biggest y of White Pawns (-1 if there is none)
+    black_front = np.where(pawns[Piece.BLACK], lines, 8).min(axis=1)
+    white_front = np.where(pawns[Piece.WHITE], lines, -1).max(axis=1)
+    neighbours_black_front = np.minimum(black_front, np.minimum(np.pad(black_front, ((0, 0), (1, 0)), constant_values=8)[:, :8],
+        np.pad(black_front, ((0, 0), (0, 1)), constant_values=8)[:, 1:]))
+    neighbours_white_front = np.maximum(white_front, np.maximum(np.pad(white_front, ((0, 0), (1, 0)), constant_values=-1)[:, :8],
+        np.pad(white_front, ((0, 0), (0, 1)), constant_values=-1)[:, 1:]))
+    passed_pawns = (pawns[Piece.WHITE] & (lines <= neighbours_black_front[:, None, :]), pawns[Piece.BLACK] & (lines >= neighbours_white_front[:, None, :]))
+    passed_bonus = np.array(PASSED_PAWN_BONUS, dtype=np.int32)
+    lines_went_over = (passed_bonus[::-1].reshape(1, 8, 1), passed_bonus.reshape(1, 8, 1)) #White Pawns start at y=6 and Black ones at y=1
+
+    for color, sign in ((Piece.WHITE, 1), (Piece.BLACK, -1)):
+        pawns_by_column = pawns[color].sum(axis=1, dtype=np.int32)
+        has_pawns = pawns_by_column > 0
+        has_neighbours = np.pad(has_pawns, ((0, 0), (1, 0)))[:, :8] | np.pad(has_pawns, ((0, 0), (0, 1)))[:, 1:]
+        score -= sign * DOUBLED_PAWN_PENALTY * np.maximum(pawns_by_column - 1, 0).sum(axis=1)
+        score -= sign * ISOLATED_PAWN_PENALTY * (pawns_by_column * ~has_neighbours).sum(axis=1)
+        score += sign * (passed_pawns[color] * lines_went_over[color]).sum(axis=(1, 2), dtype=np.int32)
+    return score
+
+def evaluate_features(positions_features):
+    '''Scores (White - Black) of positions from their features, an array of shape (number of positions, 768), returns an int32 array'''
+    _need_numpy()
+    positions_features = np.asarray(positions_features).reshape(-1, FEATURES_SIZE)
+    planes = positions_features.reshape(-1, 12, 64).astype(bool)
+    bitboards = np.packbits(planes, axis=2, bitorder="little").view("<u8").reshape(-1, 12) #the bit y*8 + x of a plane's bitboard is the case (x, y)
+    scores = positions_features.astype(np.int32) @ _MATERIAL_WEIGHTS
+    return scores + _mobility(bitboards) + _pawn_structure(planes)
+
+def evaluate_many(boards):
+    '''Scores (White - Black) of each Board of the iterable boards'''
+    return evaluate_features(features_many(boards))
+
+def evaluate(board:Board) -> int:
+    '''Score of board for its current playing color (like :meth:`engine.Engine.evaluate`)'''
+    score = int(evaluate_features(features(board))[0])
+    return score if board.cur_color_turn == Piece.WHITE else -score
+
+
+class FeatureAccumulator:
+    '''
+    | Features of a Board and their material score (material and piece-square tables, White - Black) updated move by move, to be used inside a search:
+    | call :meth:`update` after each :meth:`api.Board.make_move` and :meth:`revert` before each :meth:`api.Board.unmake_move`
+    '''
+    def __init__(self, board:Board):
+        self.board = board
+        self.refresh()
+
+    def refresh(self):
+        '''Computes the features and score from scratch'''
+        self.features = features(self.board).astype(np.int16)
+        '''Features of the board (array of 768 int16)'''
+        self.material_score = int(self.features.astype(np.int32) @ _MATERIAL_WEIGHTS)
+        '''Material and piece-square tables score (White - Black)'''
+
+    def update(self, record:HistoryRecord=None):
+        '''Applies the last move played (record is by default the last one of board.move_history)'''
+        self._apply(record if record is not None else self.board.move_history[-1], 1)
+
+    def revert(self, record:HistoryRecord=None):
+        '''Reverts the last move played, to call before unmaking it'''
+        self._apply(record if record is not None else self.board.move_history[-1], -1)
+
+    def evaluate(self) -> int:
+        '''Full evaluation (White - Black) of the current features'''
+        return int(evaluate_features(self.features)[0])
+
+    def _toggle(self, piece_class, color:int, pos:tuple, sign:int):
+        index = (color * 6 + PIECE_CLASSES.index(piece_class)) * 64 + pos[1] * 8 + pos[0]
+        self.features[index] += sign
+        self.material_score += sign * int(_MATERIAL_WEIGHTS[index])
+
+    def _apply(self, record:HistoryRecord, sign:int):
+        piece_class, color, ini_pos, target = record.piece_class, record.color, record.ini_pos, record.target
+        self._toggle(piece_class, color, ini_pos, -sign)
+        promoted_class = record.promoted_class
+        self._toggle(promoted_class if promoted_class is not None else piece_class, color, target, sign)
+        if record.killed_code:
+            self._toggle(record.killed_class, 1 - color, record.killed_pos, -sign)
+        castling_rook_positions = record.castling_rook_positions
+        if castling_rook_positions is not None:
+            self._toggle(Rook, color, castling_rook_positions[0], -sign)
+            self._toggle(Rook, color, castling_rook_positions[1], sign)
@@ -0,0 +1,161 @@
+'''
+Opt-in counters and timings of the hot paths of :mod:`api`, to see where the time of a move goes
+
+| Nothing is measured until :meth:`Metrics.enable` is called: it replaces the measured methods of the classes by measuring wrappers,
+| and :meth:`Metrics.disable` puts the original methods back, so there is no cost at all while metrics are disabled
+| Times include the measured calls made inside (the moves generation of a Check includes its `case_allowed` probes and check tests)
+| Generators (like :meth:`api.Board.iter_legal_moves`) are counted when they are created and timed only while they run, not while their caller uses the moves
+
+Use from a shell: `python -m pygame_chess_api.metrics [depth]` to print the metrics of a perft from the initial position as JSON
+'''
+import json
+from sys import argv
+from time import perf_counter
+from functools import wraps
+from inspect import isgeneratorfunction
+from pygame_chess_api.api import Board, Piece, Pawn, Knight, Bishop, Rook, Queen, Check
+
+MEASURED_METHODS = (
+    (Pawn, "get_moves_allowed", "moves_generation.Pawn", None),
+    (Knight, "get_moves_allowed", "moves_generation.Knight", None),
+    (Bishop, "get_moves_allowed", "moves_generation.Bishop", None),
+    (Rook, "get_moves_allowed", "moves_generation.Rook", None),
+    (Queen, "get_moves_allowed", "moves_generation.Queen", None),
+    (Check, "get_moves_allowed", "moves_generation.Check", None),
+    (Piece, "case_allowed", "case_allowed", None),
+    (Check, "in_check_situation", "check_tests", "check_tests.in_check"),
+    (Board, "is_leading_to_check", "leading_to_check_tests", "leading_to_check_tests.leading"),
+    (Board, "create_hypothesis_board", "hypothesis_boards", None),
+    (Piece, "iter_moves_allowed", "moves_iteration.Piece", "moves_iteration.Piece.moves"),
+    (Pawn, "iter_moves_allowed", "moves_iteration.Pawn", "moves_iteration.Pawn.moves"),
+    (Check, "iter_moves_allowed", "moves_iteration.Check", "moves_iteration.Check.moves"),
+    (Board, "is_square_attacked", "attack_tests", "attack_tests.attacked"),
+    (Board, "legal_moves", "legal_moves", None),
+    (Board, "iter_legal_moves", "legal_moves_iteration", "legal_moves_iteration.moves"),
+    (Board, "_iter_piece_legal_moves", "piece_legal_moves_iteration", "piece_legal_moves_iteration.moves"),
+    (Board, "has_legal_move", "has_legal_move_tests", "has_legal_move_tests.found"),
+    (Board, "_new_turn", "new_turn", "new_turn.game_ended"),
+)
+'''
+| (class, method name, metric name, name of the metric counting the calls returning True or None) of each measured method
+| For generators, the last metric counts the items yielded (the moves of a Knight, Bishop, Rook or Queen are in the Piece metrics)
+| A base method called by a measured override (Check.iter_moves_allowed calls Piece's one) is only measured by the override, so calls are counted once
+'''
+
+
+class Metrics:
+    '''
+    | Counts and times (in seconds) of the :attr:`MEASURED_METHODS` calls while enabled, use it in a with statement or call :meth:`enable` and :meth:`disable`
+    | Only one Metrics obj can be enabled at a time, calls of every thread are measured
+    '''
+    _enabled_metrics = None
+
+    def __init__(self):
+        self.counts = {}
+        '''Calls count by metric name'''
+        self.times = {}
+        '''Total time in seconds by metric name (only for the methods' metrics, not for the counts of True results)'''
+        self._original_methods = []
+
+    @property
+    def enabled(self) -> bool:
+        return Metrics._enabled_metrics is self
+
+    def enable(self):
+        if Metrics._enabled_metrics is not None:
+            raise ValueError("Another Metrics obj is already enabled, disable it first")
+        Metrics._enabled_metrics = self
+        for cls, method_name, metric, true_metric in MEASURED_METHODS:
+            original_method = cls.__dict__[method_name]
+            self._original_methods.append((cls, method_name, original_method))
+            measured_subclasses = tuple(other_cls for other_cls, other_method_name, other_metric, other_true_metric in MEASURED_METHODS
+                if other_method_name == method_name and other_cls is not cls and issubclass(other_cls, cls))
+            setattr(cls, method_name, self._measured(original_method, metric, true_metric, measured_subclasses))
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for cls, method_name, original_method in reversed(self._original_methods):
+            setattr(cls, method_name, original_method)
+        self._original_methods = []
+        Metrics._enabled_metrics = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *args):
+        self.disable()
+
+    def _measured(self, method, metric:str, true_metric:str or None, measured_subclasses=()):
+        counts, times = self.counts, self.times
+        if isgeneratorfunction(method):
+            return self._measured_generator(method, metric, true_metric, measured_subclasses)
+
+        @wraps(method)
+        def measured_method(*args, **kwargs):
+            if measured_subclasses and isinstance(args[0], measured_subclasses):
+                return method(*args, **kwargs) #called by the override, which measures it
+            t_start = perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                times[metric] = times.get(metric, 0.0) + perf_counter() - t_start
+                counts[metric] = counts.get(metric, 0) + 1
+            if true_metric is not None and result:
+                counts[true_metric] = counts.get(true_metric, 0) + 1
+            return result
+        return measured_method
+
+    def _measured_generator(self, method, metric:str, items_metric:str or None, measured_subclasses=()):
+        counts, times = self.counts, self.times
+
+        @wraps(method)
+        def measured_generator(*args, **kwargs):
+            if measured_subclasses and isinstance(args[0], measured_subclasses):
+                yield from method(*args, **kwargs) #called by the override, which measures it
+                return
+            counts[metric] = counts.get(metric, 0) + 1
+            generator = method(*args, **kwargs)
+            try:
+                while True:
+                    t_start = perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        times[metric] = times.get(metric, 0.0) + perf_counter() - t_start
+                    if items_metric is not None:
+                        counts[items_metric] = counts.get(items_metric, 0) + 1
+                    yield item
+            finally:
+                generator.close() #the caller stopped early (the original generator's cleanup runs now)
+        return measured_generator
+
+    def reset(self):
+        '''Sets every counter back to 0'''
+        self.counts.clear()
+        self.times.clear()
+
+    def snapshot(self) -> dict:
+        '''Copy of the metrics: {metric name: {"count", "time" (seconds), "mean_us" (microseconds by call)}}, counts of True results only have a count'''
+        metrics = {}
+        for metric, count in sorted(self.counts.items()):
+            metrics[metric] = {"count": count}
+            if metric in self.times:
+                metrics[metric]["time"] = self.times[metric]
+                metrics[metric]["mean_us"] = self.times[metric] / count * 1000000 if count else 0
+        return metrics
+
+    def to_json(self, indent=None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+
+if __name__ == "__main__":
+    from pygame_chess_api.perft import perft
+    depth = int(argv[1]) if len(argv) > 1 else 3
+    with Metrics() as metrics:
+        nodes = perft(Board(verbose=0), depth)
+    print(f"perft {depth}: {nodes} nodes")
+    print(metrics.to_json(indent=2))
@@ -0,0 +1,142 @@
+'''
+Parallel search: the root moves of a :class:`api.Board` are split between processes, each one searching its moves with an :class:`engine.Engine`
+
+| Boards are sent to the processes as snapshots (:meth:`api.Board.to_snapshot`) and moves as ints (:meth:`api.Move.encode`),
+| so the pieces, their board references and the move history are never pickled
+'''
+import logging
+from time import time, perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from pygame_chess_api.api import Board, Move, Queen
+from pygame_chess_api.engine import Engine
+
+logger = logging.getLogger("pygame_chess_api.parallel")
+
+_worker_engine = None #each process keeps its Engine (and its transposition table) between searches
+
+
+def _init_worker(max_depth:int, transposition_table_size_power_of_two:int, quiescence:bool, tablebase):
+    global _worker_engine
+    _worker_engine = Engine(max_depth=max_depth, transposition_table_size_power_of_two=transposition_table_size_power_of_two,
+        quiescence=quiescence, verbose=0, tablebase=tablebase)
+
+def _search_root_move(snapshot:tuple, move_code:int, depth:int, alpha:int or None, beta:int or None, deadline:float or None) -> tuple:
+    '''Runs in a process, returns (score or None if the time budget is over, nodes searched) for the move searched at depth within (alpha, beta)'''
+    board = Board.from_snapshot(snapshot, verbose=0)
+    move = Move.decode(move_code, board)
+    time_budget = max(deadline - time(), 0) if deadline is not None else None
+    score = _worker_engine.search_move_score(board, move, depth, alpha, beta, time_budget)
+    return score, _worker_engine.nodes
+
+
+class ParallelEngine:
+    '''
+    | Same use as :class:`engine.Engine` (it can be given as `function_for_AIs` to :meth:`render.Gui.run_pygame_loop`), but the root moves are searched by a pool of processes
+    | At each depth of the iterative deepening, the best move of the previous depth is searched first with a full window, then the other root moves are searched
+    | in parallel with a null window on its score (they only have to prove that they aren't better), the ones which are better are searched again with a window from this score
+    | The processes are started at the first search, call :meth:`close` (or use a with statement) to stop them
+    '''
+    def __init__(self, max_depth=4, time_budget=None, processes=None, transposition_table_size_power_of_two=18, quiescence=True, verbose=1, book=None, tablebase=None):
+        self.max_depth = max_depth
+        '''Maximum depth (in half-moves) of the iterative deepening'''
+        self.time_budget = time_budget
+        '''Maximum time in seconds for a search (None for no limit)'''
+        self.processes = processes
+        '''Number of processes (None for the number of CPUs)'''
+        self.transposition_table_size_power_of_two = transposition_table_size_power_of_two
+        self.quiescence = quiescence
+        self.verbose = verbose
+        self.book = book
+        ''':class:`book.OpeningBook` consulted before each search (None for no book)'''
+        self.tablebase = tablebase
+        ''':class:`tablebase.Tablebase` probed by the Engine of each process (None for no tablebase)'''
+        self.last_search_info = {}
+        '''Stats of the last search: depth, score, nodes, time, nodes_per_second, best_move and book (True if the move comes from the book)'''
+        self._executor = None
+
+    def __call__(self, board:Board) -> Move:
+        '''Searches and plays the best move on board (Pawns promote to a Queen if they have no promote_class_wanted)'''
+        move = self.search(board)
+        if move.special_type == Move.TO_PROMOTE_TYPE and move.piece.promote_class_wanted is None:
+            move.piece.promote_class_wanted = Queen
+        board.move_piece(move.piece, move)
+        return move
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''Stops the processes'''
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                initargs=(self.max_depth, self.transposition_table_size_power_of_two, self.quiescence, self.tablebase))
+        return self._executor
+
+    def _search_moves(self, snapshot:tuple, moves:list, depth:int, alpha:int or None, beta:int or None, deadline:float or None) -> tuple:
+        '''Searches moves in parallel, returns (their scores or None if the time budget is over, nodes searched)'''
+        futures = [self.executor.submit(_search_root_move, snapshot, move.encode(), depth, alpha, beta, deadline) for move in moves]
+        results = [future.result() for future in futures]
+        nodes = sum(move_nodes for score, move_nodes in results)
+        if any(score is None for score, move_nodes in results):
+            return None, nodes
+        return [score for score, move_nodes in results], nodes
+
+    def search(self, board:Board, max_depth=None, time_budget=None) -> Move or None:
+        '''Returns the best move found for the current playing color (a Move of board's pieces, None if there is no move allowed), board is left unchanged'''
+        max_depth = max_depth if max_depth is not None else self.max_depth
+        time_budget = time_budget if time_budget is not None else self.time_budget
+        t_start = perf_counter()
+        book_move = self.book.choose_move(board) if self.book is not None else None
+        if book_move is not None:
+            elapsed = perf_counter() - t_start
+            self.last_search_info = {"depth": 0, "score": 0, "nodes": 0, "time": elapsed, "nodes_per_second": 0, "best_move": book_move, "book": True}
+            if self.verbose >= 1: logger.info(f"ParallelEngine played a book move found in {round(elapsed*1000000)} µs")
+            return book_move
+        root_moves = board.legal_moves()
+        if not root_moves:
+            return None
+
+        snapshot = board.to_snapshot()
+        deadline = time() + time_budget if time_budget is not None else None
+        best_move, best_score, completed_depth, nodes = root_moves[0], 0, 0, 0
+        for depth in range(1, max_depth + 1):
+            scores, moves_nodes = self._search_moves(snapshot, root_moves[:1], depth, None, None, deadline)
+            nodes += moves_nodes
+            if scores is None:
+                break
+            depth_best_move, alpha = root_moves[0], scores[0]
+            scores, moves_nodes = self._search_moves(snapshot, root_moves[1:], depth, alpha, alpha + 1, deadline)
+            nodes += moves_nodes
+            if scores is None:
+                break
+            better_moves = [move for move, score in zip(root_moves[1:], scores) if score > alpha] #they failed high, their exact score is needed
+            scores, moves_nodes = self._search_moves(snapshot, better_moves, depth, alpha, None, deadline)
+            nodes += moves_nodes
+            if scores is None:
+                break
+            for move, score in zip(better_moves, scores):
+                if score > alpha:
+                    depth_best_move, alpha = move, score
+            best_move, best_score, completed_depth = depth_best_move, alpha, depth
+            #the best move is searched first at the next depth
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+            if self.verbose >= 2: logger.debug(f"depth {depth}: score {best_score}, {nodes} nodes, best move: {best_move}")
+            if abs(best_score) >= Engine.MATE_SCORE - 1000:
+                break #a checkmate has been found
+
+        elapsed = perf_counter() - t_start
+        self.last_search_info = {"depth": completed_depth, "score": best_score, "nodes": nodes, "time": elapsed,
+            "nodes_per_second": nodes / elapsed if elapsed > 0 else 0, "best_move": best_move, "book": False}
+        if self.verbose >= 1:
+            logger.info(f"ParallelEngine searched depth {completed_depth} in {round(elapsed*1000)} ms ({nodes} nodes, {round(self.last_search_info['nodes_per_second'])} nodes/s), score: {best_score}")
+        return best_move
@@ -0,0 +1,105 @@
+'''
+Perft (performance test): counts the leaf nodes of the moves tree at a given depth, to verify and measure the moves generation
+The counts of :data:`REFERENCE_POSITIONS` are known, so a wrong count means that some moves are missing or shouldn't be allowed
+'''
+import logging
+from time import perf_counter
+from pygame_chess_api.api import Board, Move, Queen, Rook, Bishop, Knight, PROMOTE_LETTERS
+
+logger = logging.getLogger("pygame_chess_api.perft")
+
+PROMOTE_CLASSES = (Queen, Rook, Bishop, Knight)
+
+REFERENCE_POSITIONS = {
+    "start position": (Board.START_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281}),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", {1: 48, 2: 2039, 3: 97862}),
+    "position 3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", {1: 14, 2: 191, 3: 2812, 4: 43238}),
+    "position 4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", {1: 6, 2: 264, 3: 9467}),
+    "position 5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", {1: 44, 2: 1486, 3: 62379}),
+    "position 6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", {1: 46, 2: 2079, 3: 89890}),
+}
+'''Name: (FEN, {depth: expected nodes count}), they are the usual perft positions (with castling, en passant and promotions)'''
+
+
+def _each_promotion(move:Move):
+    '''Yields once for a normal move, and once by promote class for a Pawn promotion (promote_class_wanted is set meanwhile)'''
+    if move.special_type != Move.TO_PROMOTE_TYPE:
+        yield
+        return
+    pawn = move.piece
+    promote_class_wanted = pawn.promote_class_wanted
+    for promote_class in PROMOTE_CLASSES:
+        pawn.promote_class_wanted = promote_class
+        yield
+    pawn.promote_class_wanted = promote_class_wanted
+
+def perft(board:Board, depth:int) -> int:
+    '''Number of leaf nodes of the moves tree at depth, using :meth:`api.Board.legal_moves` (promotions count once by promote class)'''
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in board.legal_moves():
+        for _ in _each_promotion(move):
+            if depth == 1:
+                nodes += 1
+                continue
+            board.make_move(move)
+            nodes += perft(board, depth - 1)
+            board.unmake_move()
+    return nodes
+
+def move_to_text(move:Move) -> str:
+    '''Coordinate notation of a move, like e2e4 (e7e8q for a promotion)'''
+    text = "".join("abcdefgh"[pos[0]] + str(8 - pos[1]) for pos in (move.piece.pos, move.target))
+    if move.special_type == Move.TO_PROMOTE_TYPE:
+        text += PROMOTE_LETTERS.get(move.piece.promote_class_wanted, "q")
+    return text
+
+def move_from_text(board:Board, text:str) -> Move:
+    '''Legal move of board given in coordinate notation (see :func:`move_to_text`), only its Pawn gets the promote class of a promotion'''
+    for move in board.legal_moves():
+        if move_to_text(move)[:4] != text[:4]:
+            continue
+        if move.special_type == Move.TO_PROMOTE_TYPE and len(text) == 5 and text[4] in PROMOTE_LETTERS.values():
+            move.piece.promote_class_wanted = next(piece_class for piece_class, letter in PROMOTE_LETTERS.items() if letter == text[4])
+            return move
+        if move.special_type != Move.TO_PROMOTE_TYPE and len(text) == 4:
+            return move
+    raise ValueError(f"The move {text} isn't allowed in the position {board.to_fen()}")
+
+def divide(board:Board, depth:int) -> dict:
+    '''perft of each root move, useful to find which move leads to a wrong count'''
+    counts = {}
+    for move in board.legal_moves():
+        for _ in _each_promotion(move):
+            move_text = move_to_text(move)
+            board.make_move(move)
+            counts[move_text] = perft(board, depth - 1)
+            board.unmake_move()
+    return counts
+
+def run_benchmark(max_depth=3, max_nodes=100000, positions=None, verbose=1) -> bool:
+    '''
+    | Runs perft on the reference positions (up to max_depth and to the depths with at most max_nodes nodes)
+    | Prints the nodes/sec of each one and returns False if a count isn't the expected one
+    '''
+    positions = positions if positions is not None else REFERENCE_POSITIONS
+    all_correct = True
+    total_nodes, total_time = 0, 0
+    for name, (fen, expected_counts) in positions.items():
+        board = Board.from_fen(fen, verbose=0)
+        for depth, expected in sorted(expected_counts.items()):
+            if depth > max_depth or expected > max_nodes:
+                break
+            t_start = perf_counter()
+            nodes = perft(board, depth)
+            elapsed = perf_counter() - t_start
+            total_nodes += nodes
+            total_time += elapsed
+            correct = nodes == expected
+            all_correct = all_correct and correct
+            if verbose >= 1:
+                logger.info(f"{name:<16} depth {depth}: {nodes:>7} nodes {'OK' if correct else f'WRONG (expected {expected})'} in {elapsed:7.2f} s ({round(nodes / elapsed) if elapsed > 0 else 0} nodes/s)")
+    if verbose >= 1:
+        logger.info(f"total: {total_nodes} nodes in {total_time:.2f} s ({round(total_nodes / total_time) if total_time > 0 else 0} nodes/s)")
+    return all_correct
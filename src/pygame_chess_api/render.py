@@ -1,4 +1,5 @@
 import os
+import logging
 import sys
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(__location__))
@@ -6,18 +7,196 @@ sys.path.append(os.path.dirname(__location__))
 from pygame_chess_api.api import *
 import pygame
 from pygame import image
-from time import time
+from time import perf_counter
+from inspect import isawaitable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import queue
+import threading
+from math import ceil, sqrt
+
+logger = logging.getLogger("pygame_chess_api.render")
+
+
+class BackgroundAI:
+    '''
+    | Plays a `function_for_AIs` in a thread, on a hypothesis copy of the board (see :meth:`api.Board.create_hypothesis_board`), so the Gui keeps rendering and handling events during its search
+    | The move played on the copy is played on the real board by :meth:`poll`, in the Gui's thread
+    | function_for_AIs can also return an awaitable (an `async def` function), it is run in an asyncio event loop of the thread
+    '''
+    def __init__(self, function_for_AIs, time_budget=None):
+        self.function_for_AIs = function_for_AIs
+        self.time_budget = time_budget
+        '''
+        | Maximum time in seconds before asking the AI to play (None for no limit): its `stop` method is called if it has one (like :meth:`engine.Engine.stop`),
+        | an awaitable is cancelled (it can catch asyncio.CancelledError to play its best move found)'''
+        self.future = None
+        '''Future of the running search (None when no search is running)'''
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BackgroundAI")
+        self._board_version = None
+        self._t_start = None
+        self._stop_requested = False
+        self._loop = None
+        self._task = None
+
+    def start(self, board:Board):
+        '''Starts the search of a move for board's current playing color'''
+        self._board_version = board.position_version
+        self._t_start = perf_counter()
+        self._stop_requested = False
+        self.future = self._executor.submit(self._play, board.create_hypothesis_board())
+
+    def _play(self, board:Board) -> HistoryRecord or None:
+        '''Runs in the thread, returns the record of the move played on board (None if the AI didn't play)'''
+        cur_turn = board.cur_color_turn
+        output = self.function_for_AIs(board)
+        if isawaitable(output):
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._task = self._loop.create_task(_await(output))
+                if self._stop_requested:
+                    self._task.cancel()
+                self._loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+                self._loop = self._task = None
+        if board.cur_color_turn == cur_turn:
+            return None
+        return board.move_history[-1]
+
+    def stop(self):
+        '''Asks the running search to end as soon as possible'''
+        self._stop_requested = True
+        if hasattr(self.function_for_AIs, "stop"):
+            self.function_for_AIs.stop()
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass #the loop has just been closed
+
+    def poll(self, board:Board) -> bool:
+        '''
+        | To call at each frame: stops the search if its time budget is exceeded, and plays its move on board when it ends
+        | Returns True if a move has been played (a move found for a position which changed meanwhile is ignored)
+        '''
+        if self.future is None:
+            return False
+        if not self.future.done():
+            if self.time_budget is not None and not self._stop_requested and perf_counter() - self._t_start > self.time_budget:
+                self.stop()
+            return False
+        future, self.future = self.future, None
+        record = future.result() #raises the AI's exception in the Gui's thread
+        if record is None:
+            raise BaseException("function_for_AIs didn't changed the turn's color/ended turn, please verify that you're moving a piece with your AI")
+        if board.position_version != self._board_version:
+            return False
+        piece = board.pieces_by_pos[record.ini_pos]
+        if record.promoted_class is not None:
+            piece.promote_class_wanted = record.promoted_class
+        return board.move_piece(piece, record.target) is not None
+
+    def close(self):
+        '''Stops the running search and the thread, without waiting for an AI which can't be stopped (the thread ends with its search)'''
+        if self.future is not None:
+            if not self.future.cancel() and not self.future.done(): #a search which hasn't started yet is cancelled, a running one is stopped
+                self.stop()
+            self.future = None
+        self._executor.shutdown(wait=False)
+
+async def _await(awaitable):
+    return await awaitable
+
+
+class AssetCache:
+    '''
+    | Loads each PNG of an assets folder once and keeps its variants scaled to the sizes asked, so they are never loaded or scaled again
+    | The pieces of a size are packed into one atlas surface (a row by color), their textures are subsurfaces of it
+    | Surfaces are converted with `convert_alpha()` once a display mode is set (those made before are converted when asked again)
+    '''
+    PIECES_NAMES = ("check", "queen", "rook", "bishop", "knight", "pawn")
+    '''Order of the pieces in the atlases (file names are color_piece.png, like white_queen.png)'''
+
+    def __init__(self, folder:str, verbose=1):
+        self.folder = folder
+        self.verbose = verbose
+        self._images = {} #file name: Surface as loaded
+        self._textures = {} #(file name, size): scaled Surface
+        self._atlases = {} #size: (atlas Surface, {(piece name, color): subsurface})
+        self._unconverted = set() #keys of _textures and _atlases made before a display mode was set
+
+    def image(self, file_name:str) -> pygame.Surface:
+        '''Image of the folder as loaded (not scaled nor converted)'''
+        if file_name not in self._images:
+            self._images[file_name] = image.load(os.path.join(self.folder, file_name))
+            if self.verbose >= 2: logger.debug(f"loaded {file_name}")
+        return self._images[file_name]
+
+    def texture(self, file_name:str, size:tuple) -> pygame.Surface:
+        '''Image of the folder scaled to size'''
+        key = (file_name, size)
+        if key not in self._textures:
+            texture = self.image(file_name)
+            if texture.get_size() != size:
+                texture = pygame.transform.smoothscale(texture, size)
+            self._textures[key] = self._convert(texture, key)
+        elif key in self._unconverted:
+            self._textures[key] = self._convert(self._textures[key], key)
+        return self._textures[key]
+
+    def piece_texture(self, piece_name:str, color:int, size:tuple) -> pygame.Surface:
+        '''Texture of a piece (a name of :attr:`PIECES_NAMES`) scaled to size, as a subsurface of the atlas of this size'''
+        if size not in self._atlases or (size in self._unconverted and pygame.display.get_surface() is not None):
+            self._make_atlas(size)
+        return self._atlases[size][1][(piece_name, color)]
+
+    def _make_atlas(self, size:tuple):
+        if size in self._atlases:
+            atlas = self._convert(self._atlases[size][0], size)
+        else:
+            atlas = pygame.Surface((size[0] * len(self.PIECES_NAMES), size[1] * 2), pygame.SRCALPHA)
+            for x, piece_name in enumerate(self.PIECES_NAMES):
+                for color in (Piece.WHITE, Piece.BLACK):
+                    f_name = Piece.INT_COLOR_TO_TEXT[color].lower() + "_" + piece_name + ".png"
+                    atlas.blit(pygame.transform.smoothscale(self.image(f_name), size), (x * size[0], color * size[1]))
+            atlas = self._convert(atlas, size)
+        self._atlases[size] = (atlas, {(piece_name, color): atlas.subsurface((x * size[0], color * size[1], size[0], size[1]))
+            for x, piece_name in enumerate(self.PIECES_NAMES) for color in (Piece.WHITE, Piece.BLACK)})
+
+    def _convert(self, surface:pygame.Surface, key) -> pygame.Surface:
+        if pygame.display.get_surface() is None:
+            self._unconverted.add(key)
+            return surface
+        self._unconverted.discard(key)
+        return surface.convert_alpha()
+
+    def clear(self):
+        '''Forgets every image and texture'''
+        self._images.clear()
+        self._textures.clear()
+        self._atlases.clear()
+        self._unconverted.clear()
+
 
 class Gui:
     '''Class for the pygame's gui, it will enable you to display the game and human players to move pieces'''
     PIECE_TYPE_NAME_TO_OBJ = {"check": Check, "queen": Queen, "rook": Rook, "bishop": Bishop, "knight": Knight, "pawn": Pawn}
     ASSETS_FOLDER = os.path.join(__location__, 'assets')
+    ASSET_CACHE = AssetCache(ASSETS_FOLDER)
+    ''':class:`AssetCache` shared by every Gui obj (textures are loaded once for all of them)'''
 
-    def __init__(self, board:Board, colors_managed_by_gui=(Piece.WHITE, Piece.BLACK), window_title="Chess Game", SCREEN_SIZE=(800, 800), FPS=60, verbose=1):
+    def __init__(self, board:Board, colors_managed_by_gui=(Piece.WHITE, Piece.BLACK), window_title="Chess Game", SCREEN_SIZE=(800, 800), FPS=60, verbose=1, resizable=False):
         self.FPS = FPS
         self.SCREEN_SIZE = SCREEN_SIZE
         self.SQUARE_SIZE = tuple([SCREEN_SIZE[i] // 8 for i in range(2)])
         self.window_title = window_title
+        self.resizable = resizable
+        '''If True the window can be resized by the user (see :meth:`resize`)'''
+        self.screen = None
 
         self.board = board
         self.mouse_piece_holding = None #Piece
@@ -31,137 +210,191 @@ class Gui:
         | Tuple containing the colors managed by human moves with the gui.
         | The color(s) not in this tuple/list must be managed by AI with the parameter function `function_for_AIs` in method :meth:`run_pygame_loop`'''
         self.verbose = verbose #0, 1, or 2
+        self._background = None #the 64 cases pre-rendered, made when the window is opened
+        self._drawn_layers = None #textures drawn over the background by case at the last frame, None to draw the whole window
+        self._drag_rect = None #where the holded piece has been drawn at the last frame
 
         self.generate_textures()
     
-    def run_pygame_loop(self, function_for_AIs=None):
+    def run_pygame_loop(self, function_for_AIs=None, AI_in_background=False, AI_time_budget=None):
         '''
         Run the Pygame gui loop to show and interact with the pygame window.
         The function_for_AIs must have one input: the board object
         We'll call it when this is turn for a color that should not be managed by gui (an AI)
 
         Obviously the move method called by your AI must be part of the given Board (Board.move_piece or a Piece.move)
+
+        | If AI_in_background, function_for_AIs is played by a :class:`BackgroundAI` while the window keeps rendering at FPS
+        | (it gets a copy of the board, its move is played on the board when it ends), it is stopped when the window is closed
+        | AI_time_budget is then the maximum time in seconds given to the AI before asking it to play (see :attr:`BackgroundAI.time_budget`)
         '''
-        self.screen = pygame.display.set_mode(self.SCREEN_SIZE)
+        self.screen = pygame.display.set_mode(self.SCREEN_SIZE, pygame.RESIZABLE if self.resizable else 0)
         pygame.display.set_caption(self.window_title)
         self.clock = pygame.time.Clock()
+        self.generate_textures() #converted for the display now that it is set
+        self._background = self.render_background()
+        self._drawn_layers = None
+        background_AI = BackgroundAI(function_for_AIs, AI_time_budget) if AI_in_background else None
 
         stop_loop = False
-        while not stop_loop:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    stop_loop = True
-                    break
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_presses = pygame.mouse.get_pressed()
-                    if mouse_presses[0] == True: #left click
-                        self.mouse_left_clicked()
-                if event.type == pygame.MOUSEBUTTONUP:
-                    self.mouse_released()
-
-            self.draw_board()
-            if self.board.cur_color_turn not in self.colors_managed and not self.board.game_ended:
-                cur_turn = self.board.cur_color_turn
-                if function_for_AIs is None:
-                    raise ValueError("You must specify a function_for_AIs when calling Gui.run_pygame_loop because you configured that the Gui object shouln't manage every color")
-                external_AI_output = function_for_AIs(self.board)
-                if self.board.cur_color_turn == cur_turn:
-                    raise BaseException("function_for_AIs didn't changed the turn's color/ended turn, please verify that you're moving a piece with your AI")
-                self.need_screen_update = True
-            
-            self.clock.tick(self.FPS)
+        try:
+            while not stop_loop:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        stop_loop = True
+                        break
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        mouse_presses = pygame.mouse.get_pressed()
+                        if mouse_presses[0] == True: #left click
+                            self.mouse_left_clicked()
+                    if event.type == pygame.MOUSEBUTTONUP:
+                        self.mouse_released()
+                    if event.type == pygame.VIDEORESIZE:
+                        self.resize(event.size)
+
+                self.draw_board()
+                if background_AI is not None and background_AI.poll(self.board):
+                    self.need_screen_update = True
+                if self.board.cur_color_turn not in self.colors_managed and not self.board.game_ended:
+                    if function_for_AIs is None:
+                        raise ValueError("You must specify a function_for_AIs when calling Gui.run_pygame_loop because you configured that the Gui object shouln't manage every color")
+                    if background_AI is not None:
+                        if background_AI.future is None:
+                            background_AI.start(self.board)
+                    else:
+                        cur_turn = self.board.cur_color_turn
+                        external_AI_output = function_for_AIs(self.board)
+                        if self.board.cur_color_turn == cur_turn:
+                            raise BaseException("function_for_AIs didn't changed the turn's color/ended turn, please verify that you're moving a piece with your AI")
+                        self.need_screen_update = True
+
+                self.clock.tick(self.FPS)
+        finally:
+            if background_AI is not None:
+                background_AI.close()
     
     def get_mouse_pos(self):
         mouse_pos = pygame.mouse.get_pos()
         mouse_pos = tuple([mouse_pos[i]//self.SQUARE_SIZE[i] for i in range(2)])
         return mouse_pos
 
-    def draw_board(self):
-        if not self.need_screen_update:
-            return
-        #drawing cases
-        for x in range(0, self.SQUARE_SIZE[0]*8, self.SQUARE_SIZE[0]):
-            for y in range(0, self.SQUARE_SIZE[1]*8, self.SQUARE_SIZE[1]):
-                texture = None
-                if x / self.SQUARE_SIZE[0] % 2 == 0:
-                    if y / self.SQUARE_SIZE[1] % 2 == 0:
-                        texture = Case.WHITE_TEXTURE
-                    else:
-                        texture = Case.BLACK_TEXTURE
-                else:
-                    if y / self.SQUARE_SIZE[1] % 2 == 1:
-                        texture = Case.WHITE_TEXTURE
-                    else:
-                        texture = Case.BLACK_TEXTURE
-                self.screen.blit(texture, (x, y))
-        #drawing pieces
-        for piece in self.board.pieces_by_pos.values():
+    def render_background(self) -> pygame.Surface:
+        '''Surface of the empty board, the cases are drawn once on it and copied to the screen where something changed'''
+        background = pygame.Surface(self.SCREEN_SIZE)
+        for x in range(8):
+            for y in range(8):
+                texture = Case.WHITE_TEXTURE if (x + y) % 2 == 0 else Case.BLACK_TEXTURE
+                background.blit(texture, (x*self.SQUARE_SIZE[0], y*self.SQUARE_SIZE[1]))
+        return background
+
+    def case_rect(self, pos:tuple) -> pygame.Rect:
+        return pygame.Rect(pos[0]*self.SQUARE_SIZE[0], pos[1]*self.SQUARE_SIZE[1], self.SQUARE_SIZE[0], self.SQUARE_SIZE[1])
+
+    def cases_under(self, rect:pygame.Rect) -> set:
+        '''Positions of the cases overlapped by rect'''
+        xs = range(max(rect.left // self.SQUARE_SIZE[0], 0), min((rect.right - 1) // self.SQUARE_SIZE[0], 7) + 1)
+        ys = range(max(rect.top // self.SQUARE_SIZE[1], 0), min((rect.bottom - 1) // self.SQUARE_SIZE[1], 7) + 1)
+        return {(x, y) for x in xs for y in ys}
+
+    def get_case_layers(self) -> dict:
+        '''Textures to draw over the background by case position: the piece (unless it is holded), the highlighted moves, then the in check square'''
+        layers = {}
+        for pos, piece in self.board.pieces_by_pos.items():
             if piece is not self.mouse_piece_holding:
                 #if it's holded we won't draw it on its static coords
-                self.screen.blit(piece.texture, tuple([piece.pos[i]*self.SQUARE_SIZE[i] for i in range(len(piece.pos))]))
-        
-        #drawing highlighted cases
+                layers[pos] = (piece.texture,)
         for move in self.highlighted_moves:
-            self.screen.blit(move.texture, tuple([move.target[i]*self.SQUARE_SIZE[i] for i in range(2)]))
+            layers[move.target] = layers.get(move.target, ()) + (move.texture,)
         if self.board.cur_color_turn_in_check:
-            check_piece = self.board.check_pieces[self.board.cur_color_turn]
-            self.screen.blit(check_piece.IN_CHECK_TEXTURE, tuple([check_piece.pos[i]*self.SQUARE_SIZE[i] for i in range(2)]))
+            check_pos = self.board.check_pieces[self.board.cur_color_turn].pos
+            layers[check_pos] = layers.get(check_pos, ()) + (Check.IN_CHECK_TEXTURE,)
+        return layers
 
-        #drawing holded piece
+    def draw_board(self):
+        '''
+        | Draws only the cases which changed since the last frame (their textures, or the holded piece was or is over them) from the background,
+        | then updates only these areas of the window
+        '''
+        if not self.need_screen_update:
+            return
+        layers = self.get_case_layers()
+        if self._drawn_layers is None:
+            dirty_cases = {(x, y) for x in range(8) for y in range(8)}
+        else:
+            dirty_cases = {pos for pos in layers.keys() | self._drawn_layers.keys() if layers.get(pos) != self._drawn_layers.get(pos)}
+
+        drag_rect, cases_under_drag = None, set()
         if self.mouse_piece_holding:
             mouse_pos = pygame.mouse.get_pos()
-            self.screen.blit(self.mouse_piece_holding.texture, tuple([mouse_pos[i] - self.SQUARE_SIZE[i]/2 for i in range(2)]))
+            drag_rect = pygame.Rect(mouse_pos[0] - self.SQUARE_SIZE[0]//2, mouse_pos[1] - self.SQUARE_SIZE[1]//2, self.SQUARE_SIZE[0], self.SQUARE_SIZE[1])
+            cases_under_drag = self.cases_under(drag_rect)
+        if drag_rect != self._drag_rect:
+            dirty_cases |= cases_under_drag
+            if self._drag_rect is not None:
+                dirty_cases |= self.cases_under(self._drag_rect)
+        elif dirty_cases & cases_under_drag:
+            dirty_cases |= cases_under_drag #the holded piece will be drawn again over them
+
+        for pos in dirty_cases:
+            rect = self.case_rect(pos)
+            self.screen.blit(self._background, rect, rect)
+            for texture in layers.get(pos, ()):
+                self.screen.blit(texture, rect)
+        #drawing holded piece
+        if drag_rect is not None:
+            if dirty_cases & cases_under_drag:
+                self.screen.blit(self.mouse_piece_holding.texture, drag_rect)
         else:
             self.need_screen_update = False #if we are holding something we will update next tick
-        
-        
-        pygame.display.update()
+
+        if self._drawn_layers is None:
+            pygame.display.update()
+        elif dirty_cases:
+            pygame.display.update([self.case_rect(pos) for pos in dirty_cases])
+        self._drawn_layers, self._drag_rect = layers, drag_rect
 
     def generate_textures(self):
+        cache = self.ASSET_CACHE
         #moves textures
         Move.TEXTURES = {
-            Move.TO_EMPTY_MOVE: image.load(os.path.join(self.ASSETS_FOLDER, "square_of_highlight.png")),
-            Move.KILL_MOVE: image.load(os.path.join(self.ASSETS_FOLDER, "square_of_kill.png")),
-            Move.SPECIAL_MOVE: image.load(os.path.join(self.ASSETS_FOLDER, "square_of_special.png"))
+            Move.TO_EMPTY_MOVE: cache.texture("square_of_highlight.png", self.SQUARE_SIZE),
+            Move.KILL_MOVE: cache.texture("square_of_kill.png", self.SQUARE_SIZE),
+            Move.SPECIAL_MOVE: cache.texture("square_of_special.png", self.SQUARE_SIZE)
         }
         #check
-        Check.IN_CHECK_TEXTURE = image.load(os.path.join(self.ASSETS_FOLDER, "square_of_in_check.png"))
+        Check.IN_CHECK_TEXTURE = cache.texture("square_of_in_check.png", self.SQUARE_SIZE)
 
         #cases textures
-        Case.BLACK_TEXTURE = image.load(os.path.join(self.ASSETS_FOLDER, "black_square.png"))
-        Case.WHITE_TEXTURE = image.load(os.path.join(self.ASSETS_FOLDER, "white_square.png"))
+        Case.BLACK_TEXTURE = cache.texture("black_square.png", self.SQUARE_SIZE)
+        Case.WHITE_TEXTURE = cache.texture("white_square.png", self.SQUARE_SIZE)
 
         #pieces textures
-        pieces_dir_path = self.ASSETS_FOLDER
         for cur_class_name, cur_class in self.PIECE_TYPE_NAME_TO_OBJ.items():
-            for color in (Piece.WHITE, Piece.BLACK):
-                f_name = Piece.INT_COLOR_TO_TEXT[color].lower() + "_" + cur_class_name + ".png"
-                texture = image.load(os.path.join(pieces_dir_path, f_name))
-                texture = pygame.transform.smoothscale(texture, self.SQUARE_SIZE)
-                if self.verbose >= 2: print("adding", f_name, "texture")
-                if color == Piece.WHITE:
-                    cur_class.WHITE_TEXTURE = texture
-                else:
-                    cur_class.BLACK_TEXTURE = texture
+            cur_class.WHITE_TEXTURE = cache.piece_texture(cur_class_name, Piece.WHITE, self.SQUARE_SIZE)
+            cur_class.BLACK_TEXTURE = cache.piece_texture(cur_class_name, Piece.BLACK, self.SQUARE_SIZE)
         self.need_screen_update = True
-        if self.verbose >= 1: print("loaded gui textures")
+        if self.verbose >= 1: logger.info("loaded gui textures")
+
+    def resize(self, SCREEN_SIZE:tuple):
+        '''Changes the window size, textures are taken from :attr:`ASSET_CACHE` (they are only scaled the first time a size is used)'''
+        self.SCREEN_SIZE = tuple(SCREEN_SIZE)
+        self.SQUARE_SIZE = tuple([SCREEN_SIZE[i] // 8 for i in range(2)])
+        self.generate_textures()
+        if self.screen is not None:
+            self.screen = pygame.display.set_mode(self.SCREEN_SIZE, pygame.RESIZABLE if self.resizable else 0)
+            self._background = self.render_background()
+            self._drawn_layers = None
     
     def choose_a_pawn_promote(self, color:int):
-        print("Please choose the Piece to promote the Pawn")
+        if self.verbose >= 1: logger.info("Please choose the Piece to promote the Pawn")
         #drawing promote pieces
         classes_name = ("queen", "rook", "bishop", "knight")
         classes = (Queen, Rook, Bishop, Knight)
-        textures = []
-        for c in classes_name:
-            if color == Piece.WHITE:
-                cur_texture = image.load(os.path.join(self.ASSETS_FOLDER, f"white_{c}.png"))
-            else:
-                cur_texture = image.load(os.path.join(self.ASSETS_FOLDER, f"white_{c}.png"))
-            cur_texture = pygame.transform.smoothscale(cur_texture, tuple([s*2 for s in self.SQUARE_SIZE]))
-            textures.append(cur_texture)
+        textures = [self.ASSET_CACHE.piece_texture(c, color, tuple([s*2 for s in self.SQUARE_SIZE])) for c in classes_name]
 
         for i in range(len(textures)):
             self.screen.blit(textures[i], (0 + i*2*self.SQUARE_SIZE[0], self.SQUARE_SIZE[1]*3))
+        self._drawn_layers = None #the window will be drawn again entirely after the choice
         
         while True:
             for event in pygame.event.get():
@@ -179,7 +412,7 @@ class Gui:
 
     def mouse_left_clicked(self):
         if self.board.game_ended:
-            print("Game ended, you can close the window")
+            if self.verbose >= 1: logger.info("Game ended, you can close the window")
             return
 
         mouse_pos = self.get_mouse_pos()
@@ -190,9 +423,9 @@ class Gui:
         self.mouse_piece_holding = piece_to_hold
         self.need_screen_update = True
         if self.mouse_piece_holding:
-            t_start = time()
-            moves_allowed = self.mouse_piece_holding.get_moves_allowed()
-            if self.verbose >= 1: print("loaded moves allowed in", round((time() - t_start)*1000, 2), "ms")
+            t_start = perf_counter()
+            moves_allowed = self.board.get_piece_moves_allowed(self.mouse_piece_holding)
+            if self.verbose >= 2: logger.debug(f"loaded moves allowed in {round((perf_counter() - t_start)*1000, 2)} ms")
             for move in moves_allowed:
                 self.highlighted_moves.append(move)
 
@@ -210,4 +443,195 @@ class Gui:
             self.board.move_piece(self.mouse_piece_holding, mouse_pos) #will perform movement only if allowed
             self.mouse_piece_holding = None
 
-            self.need_screen_update = True
\ No newline at end of file
+            self.need_screen_update = True
+
+
+class SpectatorGui:
+    '''
+    | Window showing many games in a grid of boards, to watch games played by other threads or processes (like :func:`selfplay.run_selfplay` with a move_queue)
+    | Games are fed by :attr:`move_queue` with tuples (game index, move in coordinate notation like e2e4) and (game index, None, fen or None) to start a new game,
+    | the players never wait for the window: messages are read at each frame, and a board is drawn again only when its position changed
+    | Each game gets its own tile (board) when it starts: a tile never used, else the tile of a game ended or silent for :attr:`idle_seconds`,
+    | messages of a game without a tile (every tile showing a game in progress) or whose move can't be played are dropped
+    '''
+    QUEUE_SIZE = 10000
+    '''Size of the default :attr:`move_queue`, messages are dropped while it is full'''
+    _PROMOTE_CLASSES = {letter: piece_class for piece_class, letter in PROMOTE_LETTERS.items()}
+    def __init__(self, games:int, window_title="Chess Games", SCREEN_SIZE=(1200, 800), FPS=30, move_queue=None, max_messages_per_frame=1000, idle_seconds=10, verbose=1):
+        self.FPS = FPS
+        self.SCREEN_SIZE = SCREEN_SIZE
+        self.window_title = window_title
+        self.games = games
+        self.boards = [Board(verbose=0) for i in range(games)]
+        self.move_queue = move_queue if move_queue is not None else queue.Queue(self.QUEUE_SIZE)
+        '''
+        | Thread-safe bounded queue of the messages, a queue.Queue by default
+        | Give a `multiprocessing.Manager().Queue(size)` to feed it from processes (it can be sent to them as an argument)'''
+        self.max_messages_per_frame = max_messages_per_frame
+        '''Maximum messages read between two frames, so the window keeps responding if the games play faster than it reads'''
+        self.idle_seconds = idle_seconds
+        '''Time without message after which the tile of a game can be given to a new game (for games stopped without ending, like at a plies limit)'''
+        self.dropped_messages = 0
+        '''Count of the messages dropped (by :meth:`apply_message`, or by :meth:`send_move` and :meth:`send_new_game` because the queue was full)'''
+        self._dropped_messages_lock = threading.Lock() #senders run in other threads
+        self.verbose = verbose
+        self.columns = ceil(sqrt(games))
+        self.rows = ceil(games / self.columns)
+        square_size = min(SCREEN_SIZE[0] // self.columns, SCREEN_SIZE[1] // self.rows) // 8
+        self.SQUARE_SIZE = (square_size, square_size)
+        self.TILE_SIZE = square_size * 8
+        self.screen = None
+        self._textures = {} #(piece class, color): texture at the tile size
+        self._tile_background = None
+        self._drawn_versions = [None] * games #position_version of each board at its last drawing, None to draw it
+        self._tile_of_game = {}
+        self._game_of_tile = [None] * games
+        self._last_message_times = [0] * games
+
+    def send_move(self, game_index:int, move_text:str) -> bool:
+        '''Puts a move in :attr:`move_queue` without waiting (can be called from any thread), returns False if it was dropped because the queue is full'''
+        return self._send((game_index, move_text))
+
+    def send_new_game(self, game_index:int, fen=None) -> bool:
+        '''Puts a new game (from fen, the initial position if None) in :attr:`move_queue` like :meth:`send_move`'''
+        return self._send((game_index, None, fen))
+
+    def _send(self, message:tuple) -> bool:
+        try:
+            self.move_queue.put_nowait(message)
+        except queue.Full:
+            self._count_dropped_message()
+            return False
+        return True
+
+    def _count_dropped_message(self):
+        with self._dropped_messages_lock:
+            self.dropped_messages += 1
+
+    def apply_message(self, message:tuple) -> bool:
+        '''Plays a message of :attr:`move_queue` on its game's board, returns False if it is dropped (no tile for its game, or a move that can't be played)'''
+        game_index, move_text, *fen = message
+        if move_text is None:
+            applied = self._start_game(game_index, fen[0] if fen else None)
+        else:
+            index = self._tile_of_game.get(game_index)
+            applied = index is not None and self._play_move(self.boards[index], move_text)
+            if applied:
+                self._last_message_times[index] = perf_counter()
+        if not applied:
+            self._count_dropped_message()
+            if self.verbose >= 2: logger.debug(f"dropped the message {message}")
+        return applied
+
+    def _start_game(self, game_index:int, fen:str or None) -> bool:
+        index = self._tile_of_game.get(game_index)
+        if index is None:
+            index = self._free_tile()
+            if index is None:
+                return False
+        try:
+            board = Board(verbose=0) if fen is None else Board.from_fen(fen, verbose=0)
+        except ValueError:
+            return False
+        self._tile_of_game.pop(self._game_of_tile[index], None)
+        self._tile_of_game[game_index] = index
+        self._game_of_tile[index] = game_index
+        self._last_message_times[index] = perf_counter()
+        self.boards[index] = board
+        self._drawn_versions[index] = None
+        return True
+
+    def _free_tile(self) -> int or None:
+        '''Tile for a new game: a tile never used, else the tile whose game ended or is idle and got its last message the longest time ago'''
+        for index, game_index in enumerate(self._game_of_tile):
+            if game_index is None:
+                return index
+        now = perf_counter()
+        free_tiles = [index for index, board in enumerate(self.boards) if board.game_ended or now - self._last_message_times[index] > self.idle_seconds]
+        return min(free_tiles, key=self._last_message_times.__getitem__, default=None)
+
+    def _play_move(self, board:Board, move_text:str) -> bool:
+        try:
+            ini_pos, target = [("abcdefgh".index(move_text[i]), 8 - int(move_text[i + 1])) for i in (0, 2)]
+        except (ValueError, IndexError):
+            return False
+        piece = board.pieces_by_pos.get(ini_pos)
+        if piece is None or piece.color != board.cur_color_turn:
+            return False
+        if len(move_text) == 5:
+            if not isinstance(piece, Pawn) or move_text[4] not in self._PROMOTE_CLASSES:
+                return False
+            piece.promote_class_wanted = self._PROMOTE_CLASSES[move_text[4]]
+        return board.move_piece(piece, target) is not None
+
+    def read_messages(self) -> int:
+        '''Applies the messages waiting in :attr:`move_queue` (at most :attr:`max_messages_per_frame`), returns how many were applied'''
+        count = 0
+        while count < self.max_messages_per_frame:
+            try:
+                message = self.move_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.apply_message(message)
+            count += 1
+        return count
+
+    def generate_textures(self):
+        '''Takes the textures at the tile size from :attr:`Gui.ASSET_CACHE`, and draws the empty board of a tile'''
+        cache = Gui.ASSET_CACHE
+        for cur_class_name, cur_class in Gui.PIECE_TYPE_NAME_TO_OBJ.items():
+            for color in (Piece.WHITE, Piece.BLACK):
+                self._textures[(cur_class, color)] = cache.piece_texture(cur_class_name, color, self.SQUARE_SIZE)
+        self._last_move_texture = cache.texture("square_of_highlight.png", self.SQUARE_SIZE)
+        self._in_check_texture = cache.texture("square_of_in_check.png", self.SQUARE_SIZE)
+        self._tile_background = pygame.Surface((self.TILE_SIZE, self.TILE_SIZE))
+        case_textures = (cache.texture("white_square.png", self.SQUARE_SIZE), cache.texture("black_square.png", self.SQUARE_SIZE))
+        for x in range(8):
+            for y in range(8):
+                self._tile_background.blit(case_textures[(x + y) % 2], (x*self.SQUARE_SIZE[0], y*self.SQUARE_SIZE[1]))
+        if self.verbose >= 1: logger.info("loaded spectator textures")
+
+    def tile_rect(self, index:int) -> pygame.Rect:
+        return pygame.Rect(index % self.columns * self.TILE_SIZE, index // self.columns * self.TILE_SIZE, self.TILE_SIZE, self.TILE_SIZE)
+
+    def draw_tile(self, index:int) -> pygame.Rect:
+        '''Draws a board (with its last move and its Check in check highlighted) on its tile, returns the tile's rect'''
+        board, rect = self.boards[index], self.tile_rect(index)
+        square_size = self.SQUARE_SIZE[0]
+        self.screen.blit(self._tile_background, rect)
+        if len(board.move_history):
+            record = board.move_history[-1]
+            for pos in (record.ini_pos, record.target):
+                self.screen.blit(self._last_move_texture, (rect.x + pos[0]*square_size, rect.y + pos[1]*square_size))
+        if board.cur_color_turn_in_check:
+            pos = board.check_pieces[board.cur_color_turn].pos
+            self.screen.blit(self._in_check_texture, (rect.x + pos[0]*square_size, rect.y + pos[1]*square_size))
+        for pos, piece in board.pieces_by_pos.items():
+            self.screen.blit(self._textures[(type(piece), piece.color)], (rect.x + pos[0]*square_size, rect.y + pos[1]*square_size))
+        self._drawn_versions[index] = board.position_version
+        return rect
+
+    def draw(self):
+        '''Draws the boards whose position changed since their last drawing, then updates only their tiles in the window'''
+        rects = [self.draw_tile(index) for index, board in enumerate(self.boards) if board.position_version != self._drawn_versions[index]]
+        if rects:
+            pygame.display.update(rects)
+
+    def run_pygame_loop(self):
+        '''Run the Pygame loop showing the games until the window is closed (the queue can be fed before and during it)'''
+        self.screen = pygame.display.set_mode(self.SCREEN_SIZE)
+        pygame.display.set_caption(self.window_title)
+        self.clock = pygame.time.Clock()
+        self.generate_textures()
+        self._drawn_versions = [None] * self.games
+        pygame.display.update()
+
+        stop_loop = False
+        while not stop_loop:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    stop_loop = True
+                    break
+            self.read_messages()
+            self.draw()
+            self.clock.tick(self.FPS)
@@ -0,0 +1,121 @@
+'''
+Headless AI vs AI games, to play many games without the :mod:`render` Gui (pygame isn't imported)
+
+| AIs are `function_for_AIs`-like callables (see :meth:`render.Gui.run_pygame_loop`): they get the board and must move a piece of the current playing color
+| Games are played by a pool of processes, so AIs must be picklable (functions defined at a module's top level, :class:`engine.Engine` objs, etc.)
+| Results are written to a file as soon as each game ends, one JSON line per game
+
+Use from a shell: `python -m pygame_chess_api.selfplay games output_path [processes]` (random AIs)
+'''
+import json
+import queue
+import logging
+from os import cpu_count
+from sys import argv
+from random import choice
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pygame_chess_api.api import Board, Move, Queen, HistoryRecord, PROMOTE_LETTERS
+
+logger = logging.getLogger("pygame_chess_api.selfplay")
+
+
+def random_ai(board:Board):
+    '''Plays a random move allowed (Pawns promote to a Queen)'''
+    move = choice(board.legal_moves())
+    if move.special_type == Move.TO_PROMOTE_TYPE:
+        move.piece.promote_class_wanted = Queen
+    board.move_piece(move.piece, move)
+
+def _record_to_text(record:HistoryRecord) -> str:
+    '''Coordinate notation of a played move, like e2e4 (e7e8q for a promotion)'''
+    text = "".join("abcdefgh"[pos[0]] + str(8 - pos[1]) for pos in (record.ini_pos, record.target))
+    if record.promoted_class is not None:
+        text += PROMOTE_LETTERS[record.promoted_class]
+    return text
+
+def _send_message(move_queue, message:tuple) -> bool:
+    '''Puts message in move_queue without waiting, returns False if it is dropped because the queue is full'''
+    try:
+        move_queue.put_nowait(message)
+    except queue.Full:
+        return False
+    return True
+
+def play_game(white_ai, black_ai, max_plies=400, fen=None, move_queue=None, game_index=0) -> dict:
+    '''
+    | Plays a game between 2 AIs on a new Board (from fen if it is given), without printing anything
+    | Returns a dict with moves (coordinate notation), winner (a color, None for a draw), plies, ending (:attr:`api.Board.end_reason` or "max plies") and time (seconds)
+    | If a move_queue is given, the game is sent to it as messages of :class:`render.SpectatorGui` (game_index is the game's index in them),
+    | the game never waits for it: messages are dropped while it is full, and the position is sent again as a new game after a dropped message
+    '''
+    t_start = perf_counter()
+    board = Board(verbose=0) if fen is None else Board.from_fen(fen, verbose=0)
+    if move_queue is not None:
+        synced = _send_message(move_queue, (game_index, None, fen))
+    ais = (white_ai, black_ai)
+    history_start = len(board.move_history)
+    plies = 0
+    while not board.game_ended and plies < max_plies:
+        cur_turn = board.cur_color_turn
+        ais[cur_turn](board)
+        if board.cur_color_turn == cur_turn:
+            raise ValueError("An AI didn't change the turn's color/end its turn, please verify that it moves a piece of the board")
+        plies += 1
+        if move_queue is not None:
+            #after a dropped message the spectator can't follow the moves, so it gets the whole position
+            message = (game_index, _record_to_text(board.move_history[-1])) if synced else (game_index, None, board.to_fen())
+            synced = _send_message(move_queue, message)
+
+    ending, winner = (board.end_reason, board.winner) if board.game_ended else ("max plies", None)
+    return {"moves": [_record_to_text(record) for record in board.move_history[history_start:]], "winner": winner,
+        "plies": plies, "ending": ending, "time": perf_counter() - t_start}
+
+def _play_numbered_game(game_index:int, white_ai, black_ai, max_plies:int, fen:str or None, move_queue) -> dict:
+    result = play_game(white_ai, black_ai, max_plies, fen, move_queue, game_index)
+    result["game"] = game_index
+    return result
+
+def run_selfplay(white_ai, black_ai, games:int, output_path:str, processes=None, max_plies=400, fen=None, verbose=1, move_queue=None) -> dict:
+    '''
+    | Plays games between white_ai and black_ai in a pool of processes (None for the number of CPUs), each result of :func:`play_game` is appended
+    | as a JSON line to output_path when its game ends (with its game index, so lines may not be in order)
+    | The moves can be watched with a :class:`render.SpectatorGui` in another thread: give its move_queue (a bounded `multiprocessing.Manager().Queue(size)`)
+    | Returns stats: games, white_wins, black_wins, draws, plies, time and games_per_second
+    '''
+    stats = {"games": 0, "white_wins": 0, "black_wins": 0, "draws": 0, "plies": 0}
+    t_start = perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor, open(output_path, "a") as output_file:
+        max_pending = (processes or cpu_count() or 1) * 4 #games are submitted progressively to keep memory usage low
+        next_game, pending = 0, set()
+        while next_game < games or pending:
+            while next_game < games and len(pending) < max_pending:
+                pending.add(executor.submit(_play_numbered_game, next_game, white_ai, black_ai, max_plies, fen, move_queue))
+                next_game += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                output_file.write(json.dumps(result) + "\n")
+                stats["games"] += 1
+                stats["plies"] += result["plies"]
+                if result["winner"] is None:
+                    stats["draws"] += 1
+                else:
+                    stats["white_wins" if result["winner"] == 0 else "black_wins"] += 1
+            output_file.flush()
+            if verbose >= 2: logger.debug(f"{stats['games']}/{games} games played")
+
+    stats["time"] = perf_counter() - t_start
+    stats["games_per_second"] = stats["games"] / stats["time"] if stats["time"] > 0 else 0
+    if verbose >= 1:
+        logger.info(f"{stats['games']} games in {round(stats['time'], 2)} s ({round(stats['games_per_second'], 2)} games/s), "
+            f"white wins: {stats['white_wins']}, black wins: {stats['black_wins']}, draws: {stats['draws']}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if len(argv) < 3:
+        print("usage: python -m pygame_chess_api.selfplay games output_path [processes]")
+    else:
+        run_selfplay(random_ai, random_ai, int(argv[1]), argv[2], int(argv[3]) if len(argv) > 3 else None)
@@ -0,0 +1,610 @@
+'''
+Endgame tablebases: the exact result of every position with few pieces, generated locally by retrograde analysis (NumPy is needed to generate them)
+
+| A table holds the positions of a material signature like KQvKR (White pieces v Black pieces), positions where the colors are swapped are read
+| upside down. Each position gets a value for the playing color: 0 for a draw, `TB_MATE - plies` if it checkmates in plies half-moves
+| and `-(TB_MATE - plies)` if it is checkmated in plies half-moves (with the best defense)
+| Positions with castling or en passant possible aren't in tables (:meth:`Tablebase.probe` returns None for them), and en passant kills aren't played by the generator
+| A table file is made of zlib compressed blocks of :attr:`BLOCK_SIZE` values, read through mmap when they are needed,
+| and a :class:`Tablebase` keeps the last decompressed blocks in a bounded LRU cache shared by its tables
+| Probing only needs the standard library, so a Tablebase can be used during a search (see :class:`engine.Engine`) or by a Board (see :attr:`api.Board.tablebase`)
+
+Use from a shell: `python -m pygame_chess_api.tablebase directory KQvK KRvK KPvK KQvKR` to generate tables (and the tables they depend on)
+'''
+import mmap
+import logging
+import os
+import struct
+import zlib
+from sys import argv, byteorder
+from array import array
+from time import perf_counter
+from collections import OrderedDict
+from pygame_chess_api.api import Board, Move, Piece, Check, Queen, Rook, Bishop, Knight, Pawn
+
+logger = logging.getLogger("pygame_chess_api.tablebase")
+try:
+    import numpy as np
+except ImportError: #tables can be probed without NumPy, it is only needed to generate them
+    np = None
+
+MAGIC = b"PCATB001"
+HEADER = struct.Struct("<8s16sBII")
+'''File header: MAGIC, signature, pieces count, values per block, blocks count (followed by blocks count + 1 offsets then the blocks)'''
+OFFSET = struct.Struct("<Q")
+FILE_EXTENSION = ".pctb"
+BLOCK_SIZE = 8192
+'''Values per block'''
+TB_MATE = 30000
+'''Value of a checkmate, minus the number of half-moves to reach it'''
+ILLEGAL = -32768
+'''Value stored for positions which can't happen (pieces on the same case, the color not playing in check, Pawns on the first or last line)'''
+KINDS = "KQRBNP"
+'''Pieces letters, in their order inside a signature'''
+KIND_CLASSES = {"K": Check, "Q": Queen, "R": Rook, "B": Bishop, "N": Knight, "P": Pawn}
+CLASS_KINDS = {piece_class: kind for kind, piece_class in KIND_CLASSES.items()}
+_CLASS_INDEXES = {piece_class: KINDS.index(kind) for kind, piece_class in KIND_CLASSES.items()}
+
+
+def _need_numpy():
+    if np is None:
+        raise ImportError("NumPy is needed to generate tablebases, install it with `pip install pygame_chess_api[fast]` (or `pip install numpy`)")
+
+def _sorted_side(side:str) -> str:
+    return "".join(sorted(side, key=KINDS.index))
+
+def _side_strength(side:str) -> tuple:
+    return (sum(KIND_CLASSES[kind].SCORE_VALUE for kind in side), len(side), tuple(-KINDS.index(kind) for kind in side))
+
+def parse_signature(signature:str) -> tuple:
+    '''(White pieces, Black pieces) of a signature like KQvKR, each side being sorted in :attr:`KINDS` order'''
+    sides = signature.upper().split("V")
+    if len(sides) != 2 or any(side.count("K") != 1 or not set(side) <= set(KINDS) for side in sides):
+        raise ValueError(f"Invalid tablebase signature {signature}: it must be like KQvKR (each color having one K)")
+    return _sorted_side(sides[0]), _sorted_side(sides[1])
+
+def canonical_signature(signature:str) -> tuple:
+    '''(signature of the table holding the positions of signature, True if the colors must be swapped to read it), the stronger side being White'''
+    white, black = parse_signature(signature)
+    if _side_strength(white) >= _side_strength(black):
+        return f"{white}v{black}", False
+    return f"{black}v{white}", True
+
+def _piece_order(piece:Piece) -> int:
+    '''Order of a piece inside a signature (the kind's index in :attr:`KINDS`, + 8 for Black pieces)'''
+    return piece.color << 3 | _CLASS_INDEXES[type(piece)]
+
+def board_signature(board:Board) -> str:
+    sides = ["", ""]
+    for piece in board.pieces_by_pos.values():
+        sides[piece.color] += CLASS_KINDS[type(piece)]
+    return f"{_sorted_side(sides[0])}v{_sorted_side(sides[1])}"
+
+
+class Tablebase:
+    '''
+    | Tables of a directory, opened when they are first probed
+    | Decompressed blocks are kept in an LRU cache of cache_blocks blocks (BLOCK_SIZE * 2 bytes each), shared by every table
+    '''
+    def __init__(self, directory:str, cache_blocks=1024):
+        self.directory = directory
+        self.cache_blocks = cache_blocks
+        self.tables = {}
+        '''Path of each table file by signature'''
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith(FILE_EXTENSION):
+                self.tables[file_name[:-len(FILE_EXTENSION)]] = os.path.join(directory, file_name)
+        self.max_pieces = max((len(signature) - 1 for signature in self.tables), default=0)
+        '''Most pieces of a table, positions with more pieces are never probed'''
+        self.probes = 0
+        self.cache_hits = 0
+        self._files = {}
+        self._cache = OrderedDict()
+        self._material_tables = {} #(signature of the table or None, swap_colors, White pieces count) by pieces orders
+
+    def __getstate__(self):
+        return {"directory": self.directory, "cache_blocks": self.cache_blocks}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"], state["cache_blocks"])
+
+    def _file(self, signature:str):
+        table_file = self._files.get(signature)
+        if table_file is None:
+            table_file = self._files[signature] = _TableFile(self.tables[signature])
+        return table_file
+
+    def _value(self, signature:str, index:int) -> int:
+        self.probes += 1
+        block_key = (signature, index // BLOCK_SIZE)
+        block = self._cache.get(block_key)
+        if block is not None:
+            self.cache_hits += 1
+            self._cache.move_to_end(block_key)
+        else:
+            block = self._file(signature).block(block_key[1])
+            self._cache[block_key] = block
+            if len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return block[index % BLOCK_SIZE]
+
+    def can_probe(self, board:Board) -> bool:
+        return len(board.pieces_by_pos) <= self.max_pieces and not board.castling_rights and board.en_passant_x is None
+
+    def probe_value(self, board:Board) -> int or None:
+        '''Value of board's position for its playing color (see the module's doc), None if it isn't in a table'''
+        if not self.can_probe(board):
+            return None
+        pieces = sorted(board.pieces_by_pos.values(), key=_piece_order)
+        material = tuple(map(_piece_order, pieces))
+        table = self._material_tables.get(material)
+        if table is None:
+            signature, swap_colors = canonical_signature(f"{''.join(KINDS[order & 7] for order in material if order < 8)}v{''.join(KINDS[order & 7] for order in material if order >= 8)}")
+            table = self._material_tables[material] = (signature if signature in self.tables else None, swap_colors, sum(order < 8 for order in material))
+        signature, swap_colors, white_count = table
+        if signature is None:
+            return None
+        if swap_colors:
+            index = 1 - board.cur_color_turn
+            for piece in pieces[white_count:] + pieces[:white_count]:
+                index = index << 6 | (piece.pos[1] * 8 + piece.pos[0]) ^ 56
+        else:
+            index = board.cur_color_turn
+            for piece in pieces:
+                index = index << 6 | piece.pos[1] * 8 + piece.pos[0]
+        value = self._value(signature, index)
+        return value if value != ILLEGAL else None
+
+    def probe(self, board:Board) -> tuple or None:
+        '''(result for the playing color: 1 win, 0 draw, -1 loss, half-moves to the checkmate (0 for a draw)), None if the position isn't in a table'''
+        value = self.probe_value(board)
+        if value is None:
+            return None
+        if value > 0:
+            return 1, TB_MATE - value
+        if value < 0:
+            return -1, TB_MATE + value
+        return 0, 0
+
+    def probe_wdl(self, board:Board) -> int or None:
+        '''1 if the playing color wins, 0 for a draw and -1 if it loses (None if the position isn't in a table)'''
+        value = self.probe_value(board)
+        return None if value is None else (value > 0) - (value < 0)
+
+    def best_move(self, board:Board, search_depth=2) -> Move or None:
+        '''
+        | The move allowed leading to the best value for the playing color (fastest checkmate, or longest defense), None if the position isn't in a table
+        | Promotions are tried with each class, only the Pawn of the returned move keeps the best one as promote_class_wanted
+        | Positions reached that aren't in a table (en passant is possible) are searched search_depth half-moves, moves whose value stays unknown are skipped
+        '''
+        if self.probe_value(board) is None:
+            return None
+        best_move, best_class, best_value = None, None, None
+        for move, promote_class, value in self._moves_values(board, search_depth):
+            if value is not None and (best_value is None or value > best_value):
+                best_move, best_class, best_value = move, promote_class, value
+        if best_class is not None:
+            best_move.piece.promote_class_wanted = best_class
+        return best_move
+
+    def _moves_values(self, board:Board, search_depth:int):
+        '''Yields (move, promote class or None, value for the playing color or None if it is unknown) for each move allowed'''
+        for move in board.legal_moves():
+            pawn = move.piece if move.special_type == Move.TO_PROMOTE_TYPE else None
+            promote_class_wanted = pawn.promote_class_wanted if pawn is not None else None
+            for promote_class in (Queen, Rook, Bishop, Knight) if pawn is not None else (None,):
+                if pawn is not None:
+                    pawn.promote_class_wanted = promote_class
+                board.make_move(move)
+                value = self._searched_value(board, search_depth)
+                board.unmake_move()
+                if pawn is not None:
+                    pawn.promote_class_wanted = promote_class_wanted
+                yield move, promote_class, None if value is None else (-value - 1 if value < 0 else (-value + 1 if value > 0 else 0))
+
+    def _searched_value(self, board:Board, depth:int) -> int or None:
+        '''Value of board's position from the tables, searched depth half-moves if it isn't in them (None if a move's value stays unknown)'''
+        value = self.probe_value(board)
+        if value is not None or depth == 0:
+            return value
+        values = [value for move, promote_class, value in self._moves_values(board, depth - 1)]
+        if None in values:
+            return None
+        if not values:
+            return -TB_MATE if board.check_pieces[board.cur_color_turn].in_check_situation() else 0
+        return max(values)
+
+    def close(self):
+        for table_file in self._files.values():
+            table_file.close()
+        self._files = {}
+        self._cache.clear()
+
+
+class _TableFile:
+    def __init__(self, path:str):
+        self.file = open(path, "rb")
+        self._mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, signature, self.pieces_count, self.block_size, self.blocks_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or self.block_size != BLOCK_SIZE:
+            raise ValueError(f"{path} isn't a tablebase file or was written with another block size")
+        self.signature = signature.rstrip(b"\0").decode()
+        self.offsets = array("Q", self._mmap[HEADER.size:HEADER.size + OFFSET.size * (self.blocks_count + 1)])
+        if byteorder != "little":
+            self.offsets.byteswap()
+
+    def block(self, block_index:int) -> array:
+        values = array("h", zlib.decompress(self._mmap[self.offsets[block_index]:self.offsets[block_index + 1]]))
+        if byteorder != "little":
+            values.byteswap()
+        return values
+
+    def read_all(self):
+        '''Every value as a NumPy array'''
+        return np.concatenate([np.frombuffer(zlib.decompress(self._mmap[self.offsets[block_index]:self.offsets[block_index + 1]]), dtype="<i2")
+            for block_index in range(self.blocks_count)])
+
+    def close(self):
+        self._mmap = None
+        self.file.close()
+
+
+def write_table(path:str, signature:str, values):
+    '''Writes the values (NumPy int16 array) of a table'''
+    pieces_count = len(signature) - 1
+    values = np.ascontiguousarray(values, dtype="<i2")
+    blocks = [zlib.compress(values[start:start + BLOCK_SIZE].tobytes(), 6) for start in range(0, len(values), BLOCK_SIZE)]
+    offset = HEADER.size + OFFSET.size * (len(blocks) + 1)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, signature.encode(), pieces_count, BLOCK_SIZE, len(blocks)))
+        for block in blocks:
+            file.write(OFFSET.pack(offset))
+            offset += len(block)
+        file.write(OFFSET.pack(offset))
+        for block in blocks:
+            file.write(block)
+
+
+#Generation
+_tables = None
+
+def _move_tables() -> dict:
+    '''Targets of each piece kind by case (-1 outside the board) and cases between 2 cases (as bitboards), built once'''
+    global _tables
+    if _tables is None:
+        def targets(vectors, distances):
+            result = np.full((64, len(vectors), distances), -1, dtype=np.int64)
+            for square in range(64):
+                x, y = square % 8, square // 8
+                for v, (dx, dy) in enumerate(vectors):
+                    for distance in range(distances):
+                        tx, ty = x + dx * (distance + 1), y + dy * (distance + 1)
+                        if not (0 <= tx <= 7 and 0 <= ty <= 7):
+                            break
+                        result[square, v, distance] = ty * 8 + tx
+            return result
+        between = np.zeros(64 * 64, dtype=np.uint64)
+        rays = targets(Piece.LINES_VECTORS + Piece.DIAGONALS_VECTORS, 7)
+        for square in range(64):
+            for v in range(8):
+                bits = 0
+                for target in rays[square, v]:
+                    if target < 0:
+                        break
+                    between[square * 64 + target] = bits
+                    bits |= 1 << int(target)
+        _tables = {"K": targets(Piece.LINES_VECTORS + Piece.DIAGONALS_VECTORS, 1), "N": targets(Piece.KNIGHT_VECTOR, 1),
+            "R": rays[:, :4], "B": rays[:, 4:], "Q": rays, "between": between}
+    return _tables
+
+def _piece_moves(kind:str, color:int, squares, occupancy, backward=False) -> list:
+    '''
+    | (targets, valid, mode) for each move pattern of pieces on squares (arrays for many positions), occupancy being the bitboards of the cases taken
+    | mode is 0 if the move can go to an empty case or kill, 1 if it must go to an empty case (Pawn push) and 2 if it must kill (Pawn kill)
+    | If backward, the patterns lead to the cases from which the pieces could have come (to an empty case, without killing)
+    '''
+    tables = _move_tables()
+    moves = []
+    if kind == "P":
+        forward = -8 if color == Piece.WHITE else 8
+        step = -forward if backward else forward
+        start_y, double_y = (6, 4) if color == Piece.WHITE else (1, 3)
+        target = squares + step
+        valid = (target >= 0) & (target < 64)
+        target = np.where(valid, target, 0)
+        valid &= ((occupancy >> target.astype(np.uint64)) & np.uint64(1)) == 0
+        if backward:
+            valid &= target // 8 != (7 if color == Piece.WHITE else 0) #a Pawn is never on its first line
+        moves.append((target, valid, 1))
+        double_target = squares + 2 * step
+        double_valid = valid & ((squares // 8) == (double_y if backward else start_y))
+        double_target = np.where(double_valid, double_target, 0)
+        double_valid &= ((occupancy >> double_target.astype(np.uint64)) & np.uint64(1)) == 0
+        moves.append((double_target, double_valid, 1))
+        if not backward:
+            for dx in (-1, 1):
+                target = squares + forward + dx
+                valid = ((squares % 8) + dx >= 0) & ((squares % 8) + dx <= 7) & (target >= 0) & (target < 64)
+                moves.append((np.where(valid, target, 0), valid, 2))
+        return moves
+
+    pattern_targets = tables[kind]
+    sliding = kind in ("Q", "R", "B")
+    for v in range(pattern_targets.shape[1]):
+        for distance in range(pattern_targets.shape[2]):
+            target = pattern_targets[squares, v, distance]
+            valid = target >= 0
+            if not valid.any():
+                break
+            target = np.where(valid, target, 0)
+            if sliding:
+                valid &= (tables["between"][squares * 64 + target] & occupancy) == 0
+            if backward:
+                valid &= ((occupancy >> target.astype(np.uint64)) & np.uint64(1)) == 0
+            moves.append((target, valid, 1 if backward else 0))
+    return moves
+
+
+class _Generator:
+    '''Retrograde analysis of one table, the tables reached by kills and promotions being already generated'''
+    PROMOTE_KINDS = "QRBN"
+    NO_EXIT = -32767
+    FRONTIER_CHUNK_SIZE = 1 << 18
+
+    def __init__(self, signature:str, sub_tables:dict, verbose=1):
+        self.signature = signature
+        self.sub_tables = sub_tables
+        self.verbose = verbose
+        white, black = parse_signature(signature)
+        self.pieces = [(kind, Piece.WHITE) for kind in white] + [(kind, Piece.BLACK) for kind in black]
+        self.n = len(self.pieces)
+        self.size = 64 ** self.n
+        '''Positions by playing color'''
+        self.weights = [64 ** (self.n - 1 - k) for k in range(self.n)]
+        self.kings = [self.pieces.index(("K", color)) for color in (Piece.WHITE, Piece.BLACK)]
+
+    def _squares(self, indexes) -> list:
+        return [(indexes >> (6 * (self.n - 1 - k))) & 63 for k in range(self.n)]
+
+    def _chunks(self):
+        chunk_size = min(self.size, 1 << 20)
+        for stm in (Piece.WHITE, Piece.BLACK):
+            for start in range(0, self.size, chunk_size):
+                yield stm, np.arange(start, start + chunk_size, dtype=np.int64)
+
+    def _sub_values(self, stm:int, pieces:list):
+        '''Values in a sub table for the playing color stm, pieces being (kind, color, squares array)'''
+        sub_signature, swap_colors = canonical_signature("".join(kind for kind, color, squares in pieces if color == Piece.WHITE) + "v" +
+            "".join(kind for kind, color, squares in pieces if color == Piece.BLACK))
+        pieces = sorted(pieces, key=lambda piece: (piece[1] ^ swap_colors, KINDS.index(piece[0])))
+        index = np.int64(stm ^ swap_colors)
+        for kind, color, squares in pieces:
+            index = (index << 6) | (squares ^ 56 if swap_colors else squares)
+        return self.sub_tables[sub_signature][index]
+
+    def generate(self):
+        t_start = perf_counter()
+        n = self.n
+        illegal = np.zeros(2 * self.size, dtype=bool)
+        #positions which can't happen: pieces on the same case, Pawns on their first or last line, or the playing color can kill the other Check
+        for stm, indexes in self._chunks():
+            squares = self._squares(indexes)
+            bad = np.zeros(len(indexes), dtype=bool)
+            occupancy = np.zeros(len(indexes), dtype=np.uint64)
+            for k, (kind, color) in enumerate(self.pieces):
+                bad |= ((occupancy >> squares[k].astype(np.uint64)) & np.uint64(1)) != 0
+                occupancy |= np.uint64(1) << squares[k].astype(np.uint64)
+                if kind == "P":
+                    bad |= (squares[k] < 8) | (squares[k] >= 56)
+            opponent_check = squares[self.kings[1 - stm]]
+            for k, (kind, color) in enumerate(self.pieces):
+                if color != stm:
+                    continue
+                for target, valid, mode in _piece_moves(kind, color, squares[k], occupancy):
+                    if mode != 1:
+                        bad |= valid & (target == opponent_check)
+            illegal[stm * self.size + indexes] = bad
+        if self.verbose >= 2: logger.debug(f"{self.signature}: illegal positions found in {round(perf_counter() - t_start, 1)} s")
+
+        #moves of each position: count of moves staying in the table, best value of the moves leaving it (kills and promotions)
+        degree = np.zeros(2 * self.size, dtype=np.int16)
+        exit_value = np.full(2 * self.size, self.NO_EXIT, dtype=np.int16)
+        for stm, indexes in self._chunks():
+            offset = stm * self.size
+            legal = ~illegal[offset + indexes]
+            if not legal.any():
+                continue
+            indexes = indexes[legal]
+            squares = self._squares(indexes)
+            occupancy = np.zeros(len(indexes), dtype=np.uint64)
+            for k in range(n):
+                occupancy |= np.uint64(1) << squares[k].astype(np.uint64)
+            chunk_degree = np.zeros(len(indexes), dtype=np.int16)
+            chunk_exit = np.full(len(indexes), self.NO_EXIT, dtype=np.int16)
+            for i, (kind, color) in enumerate(self.pieces):
+                if color != stm:
+                    continue
+                promotion_y = 0 if color == Piece.WHITE else 7
+                for target, valid, mode in _piece_moves(kind, color, squares[i], occupancy):
+                    occupied = ((occupancy >> target.astype(np.uint64)) & np.uint64(1)) != 0
+                    promotion = (target // 8 == promotion_y) if kind == "P" else None
+                    if mode != 2:
+                        quiet = valid & ~occupied
+                        if promotion is not None:
+                            self._add_exits(chunk_exit, stm, squares, i, target, quiet & promotion, None, self.PROMOTE_KINDS)
+                            quiet &= ~promotion
+                        successors = indexes[quiet] + (target[quiet] - squares[i][quiet]) * self.weights[i] + (1 - 2 * stm) * self.size + offset
+                        chunk_degree[quiet] += ~illegal[successors]
+                    if mode != 1:
+                        for j, (killed_kind, killed_color) in enumerate(self.pieces):
+                            if killed_color == stm or killed_kind == "K":
+                                continue
+                            kill = valid & (target == squares[j])
+                            if promotion is not None:
+                                self._add_exits(chunk_exit, stm, squares, i, target, kill & promotion, j, self.PROMOTE_KINDS)
+                                kill &= ~promotion
+                            self._add_exits(chunk_exit, stm, squares, i, target, kill, j, (kind,))
+            degree[offset + indexes] = chunk_degree
+            exit_value[offset + indexes] = chunk_exit
+        if self.verbose >= 2: logger.debug(f"{self.signature}: moves counted in {round(perf_counter() - t_start, 1)} s")
+        return self._retrograde(illegal, degree, exit_value, t_start)
+
+    def _add_exits(self, chunk_exit, stm:int, squares:list, i:int, target, mask, killed:int or None, kinds):
+        '''Updates the best exit value of the positions in mask, where the piece i goes to target (killing the piece killed) and becomes one of kinds'''
+        if not mask.any():
+            return
+        for new_kind in kinds:
+            pieces = []
+            for k, (kind, color) in enumerate(self.pieces):
+                if k == killed:
+                    continue
+                pieces.append((new_kind, color, target[mask]) if k == i else (kind, color, squares[k][mask]))
+            values = self._sub_values(1 - stm, pieces).astype(np.int32)
+            values = np.where(values == ILLEGAL, self.NO_EXIT, np.where(values < 0, -values - 1, np.where(values > 0, -values + 1, 0)))
+            chunk_exit[mask] = np.maximum(chunk_exit[mask], values)
+
+    def _predecessors(self, positions, illegal, resolved):
+        '''Unresolved legal positions from which a move leads to one of positions (once per move, so a position can be there several times)'''
+        predecessors = []
+        for stm in (Piece.WHITE, Piece.BLACK):
+            indexes = positions[positions // self.size == stm] - stm * self.size
+            if not len(indexes):
+                continue
+            squares = self._squares(indexes)
+            occupancy = np.zeros(len(indexes), dtype=np.uint64)
+            for k in range(self.n):
+                occupancy |= np.uint64(1) << squares[k].astype(np.uint64)
+            for i, (kind, color) in enumerate(self.pieces):
+                if color == stm:
+                    continue
+                for origin, valid, mode in _piece_moves(kind, color, squares[i], occupancy, backward=True):
+                    found = indexes[valid] + (origin[valid] - squares[i][valid]) * self.weights[i] + (1 - stm) * self.size
+                    predecessors.append(found[~illegal[found] & ~resolved[found]])
+        return np.concatenate(predecessors) if predecessors else np.zeros(0, dtype=np.int64)
+
+    def _retrograde(self, illegal, degree, exit_value, t_start):
+        values = np.zeros(2 * self.size, dtype=np.int16)
+        resolved = illegal.copy()
+        schedule = {}
+        def add(ply, positions):
+            if len(positions):
+                schedule.setdefault(ply, []).append(positions)
+        def add_by_ply(plies, positions):
+            for ply in np.unique(plies):
+                add(int(ply), positions[plies == ply])
+
+        legal = np.flatnonzero(~illegal)
+        exits = exit_value[legal].astype(np.int32)
+        winning = exits > 0
+        add_by_ply(TB_MATE - exits[winning], legal[winning])
+        stuck = legal[degree[legal] == 0]
+        stuck_exits = exit_value[stuck].astype(np.int32)
+        no_exit = stuck[stuck_exits == self.NO_EXIT]
+        #the position with the colors swapped is illegal if the playing color is in check
+        in_check = illegal[(no_exit + self.size) % (2 * self.size)]
+        add(0, no_exit[in_check]) #checkmates
+        resolved[no_exit[~in_check]] = True #stalemates
+        resolved[stuck[stuck_exits == 0]] = True
+        losing = (stuck_exits < 0) & (stuck_exits != self.NO_EXIT)
+        add_by_ply(TB_MATE + stuck_exits[losing], stuck[losing])
+
+        ply = 0
+        while schedule:
+            positions = schedule.pop(ply, None)
+            if positions is not None:
+                positions = np.unique(np.concatenate(positions))
+                positions = positions[~resolved[positions]]
+                resolved[positions] = True
+                values[positions] = TB_MATE - ply if ply % 2 else -(TB_MATE - ply)
+                found = [np.zeros(0, dtype=np.int64)]
+                #the frontier is split so the predecessors (one per move) never take too much memory
+                for start in range(0, len(positions), self.FRONTIER_CHUNK_SIZE):
+                    predecessors = self._predecessors(positions[start:start + self.FRONTIER_CHUNK_SIZE], illegal, resolved)
+                    if ply % 2:
+                        np.subtract.at(degree, predecessors, 1)
+                    found.append(np.unique(predecessors))
+                found = np.unique(np.concatenate(found))
+                if ply % 2 == 0:
+                    add(ply + 1, found) #a move to a lost position wins
+                else:
+                    #every move leads to a won position
+                    lost = found[degree[found] == 0]
+                    lost_exits = exit_value[lost].astype(np.int32)
+                    resolved[lost[lost_exits == 0]] = True
+                    losing = lost_exits < 0
+                    add_by_ply(np.where(lost_exits[losing] == self.NO_EXIT, ply + 1, np.maximum(ply + 1, TB_MATE + lost_exits[losing])), lost[losing])
+            ply += 1
+
+        values[illegal] = ILLEGAL
+        if self.verbose >= 1:
+            decisive = np.abs(values[(values != 0) & ~illegal].astype(np.int32))
+            logger.info(f"{self.signature}: {len(legal)} positions, {np.count_nonzero(values > 0)} wins, {np.count_nonzero((values < 0) & ~illegal)} losses, "
+                f"longest checkmate in {TB_MATE - decisive.min() if len(decisive) else 0} half-moves, generated in {round(perf_counter() - t_start, 1)} s")
+        return values
+
+
+def _sub_signatures(signature:str) -> set:
+    '''Signatures of the tables reached by a kill or a promotion'''
+    white, black = parse_signature(signature)
+    sub_signatures = set()
+    for side_index, side in enumerate((white, black)):
+        other = (white, black)[1 - side_index]
+        for k, kind in enumerate(side):
+            if kind == "K":
+                continue
+            sides = [white, black]
+            sides[side_index] = side[:k] + side[k+1:] #killed
+            sub_signatures.add(canonical_signature("v".join(sides))[0])
+            if kind == "P":
+                for promote_kind in _Generator.PROMOTE_KINDS:
+                    sides[side_index] = side[:k] + promote_kind + side[k+1:]
+                    sub_signatures.add(canonical_signature("v".join(sides))[0])
+                    #a Pawn can kill while promoting
+                    for j, killed_kind in enumerate(other):
+                        if killed_kind != "K":
+                            sides_killing = list(sides)
+                            sides_killing[1 - side_index] = other[:j] + other[j+1:]
+                            sub_signatures.add(canonical_signature("v".join(sides_killing))[0])
+    return sub_signatures
+
+def generate_table(signature:str, directory:str, verbose=1) -> str:
+    '''
+    | Generates the table of signature in directory (with the tables it depends on, if they aren't already there), returns its path
+    | A table of 3 pieces takes about a second, a table of 4 pieces a few minutes and about 1 GB of memory
+    '''
+    _need_numpy()
+    signature = canonical_signature(signature)[0]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, signature + FILE_EXTENSION)
+    if os.path.exists(path):
+        return path
+    sub_tables = {}
+    for sub_signature in sorted(_sub_signatures(signature)):
+        table_file = _TableFile(generate_table(sub_signature, directory, verbose))
+        sub_tables[sub_signature] = table_file.read_all()
+        table_file.close()
+    write_table(path, signature, _Generator(signature, sub_tables, verbose).generate())
+    return path
+
+def all_signatures(pieces_count:int) -> list:
+    '''Signatures of every table with pieces_count pieces (Checks included)'''
+    signatures = set()
+    def sides(count):
+        if count == 0:
+            return [""]
+        return [kind + rest for kind in KINDS[1:] for rest in sides(count - 1) if not rest or KINDS.index(kind) <= KINDS.index(rest[0])]
+    for white_count in range(pieces_count - 1):
+        for white in sides(white_count):
+            for black in sides(pieces_count - 2 - white_count):
+                signatures.add(canonical_signature(f"K{white}vK{black}")[0])
+    return sorted(signatures, key=lambda signature: (len(signature), signature))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if len(argv) < 3:
+        print("usage: python -m pygame_chess_api.tablebase directory signatures... (like KQvK, or 3 / 4 for every table of 3 / 4 pieces)")
+    else:
+        for argument in argv[2:]:
+            for signature in (all_signatures(int(argument)) if argument.isdigit() else [argument]):
+                generate_table(signature, argv[1])
@@ -0,0 +1,201 @@
+import random
+import pytest
+from pygame_chess_api.api import Board, Move, Queen
+from pygame_chess_api.perft import REFERENCE_POSITIONS, move_from_text
+
+
+def full_state(board:Board, with_version=True) -> tuple:
+    '''Everything a move changes, position_version excepted if with_version is False (a new version is given at each move played)'''
+    pieces = sorted((pos, type(piece).__name__, piece.color, piece.has_already_moved) for pos, piece in board.pieces_by_pos.items())
+    return (pieces, board.cur_color_turn, board.cur_color_turn_in_check, board.game_ended, board.winner, board.end_reason, board.zobrist_key, board.castling_rights, board.en_passant_x, board.halfmove_clock,
+        tuple(board.material), tuple(board.piece_square_scores), dict(board.position_counts), len(board.move_history), board.position_version if with_version else None,
+        tuple(board.bitboards.pieces) if board.bitboards is not None else None)
+
+def incremental_state(board:Board) -> tuple:
+    '''State kept up to date at each move, compared with the same state computed from scratch'''
+    return (board.zobrist_key, board.castling_rights, board.en_passant_x, tuple(board.material), tuple(board.piece_square_scores),
+        (tuple(board.bitboards.pieces), tuple(board.bitboards.occupied), board.bitboards.occupied_all) if board.bitboards is not None else None)
+
+def play(board:Board, *moves):
+    for text in moves:
+        move = move_from_text(board, text)
+        assert board.move_piece(move.piece, move) is not None
+
+def random_game_boards(seed:int, plies=80) -> list:
+    '''FENs of the positions of a random game (Pawns promote to a Queen)'''
+    rng = random.Random(seed)
+    board = Board(verbose=0)
+    fens = [board.to_fen()]
+    for ply in range(plies):
+        moves = board.legal_moves()
+        if not moves or board.game_ended:
+            break
+        move = rng.choice(moves)
+        if move.special_type == Move.TO_PROMOTE_TYPE:
+            move.piece.promote_class_wanted = Queen
+        board.move_piece(move.piece, move)
+        fens.append(board.to_fen())
+    return fens
+
+
+
+@pytest.mark.parametrize("use_bitboards", (False, True), ids=("dict", "bitboards"))
+@pytest.mark.parametrize("name", REFERENCE_POSITIONS)
+def test_make_unmake_restores_the_full_state(name, use_bitboards):
+    board = Board.from_fen(REFERENCE_POSITIONS[name][0], verbose=0, use_bitboards=use_bitboards)
+    root_state = full_state(board)
+    for move in board.legal_moves():
+        if move.special_type == Move.TO_PROMOTE_TYPE:
+            move.piece.promote_class_wanted = Queen
+        board.make_move(move)
+        assert incremental_state(board) == incremental_state(Board.from_fen(board.to_fen(), verbose=0, use_bitboards=use_bitboards))
+        assert board.zobrist_key == board.compute_zobrist_key()
+        state = full_state(board)
+        for reply in board.legal_moves():
+            if reply.special_type == Move.TO_PROMOTE_TYPE:
+                reply.piece.promote_class_wanted = Queen
+            board.make_move(reply)
+            assert board.zobrist_key == board.compute_zobrist_key()
+            board.unmake_move()
+            assert full_state(board) == state
+        board.unmake_move()
+        assert full_state(board) == root_state
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fen_round_trip(seed):
+    for fen in random_game_boards(seed):
+        assert Board.from_fen(fen, verbose=0).to_fen() == fen
+
+
+@pytest.mark.parametrize("name", REFERENCE_POSITIONS)
+def test_fen_round_trip_of_reference_positions(name):
+    fen = REFERENCE_POSITIONS[name][0]
+    assert Board.from_fen(fen, verbose=0).to_fen() == fen
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bytes_round_trip(seed):
+    for fen in random_game_boards(seed):
+        data = Board.from_fen(fen, verbose=0).to_bytes()
+        assert len(data) == Board.BYTES_SIZE == 34
+        #the clocks aren't packed
+        assert Board.from_bytes(data, verbose=0).to_fen().split()[:4] == fen.split()[:4]
+
+
+@pytest.mark.parametrize("fen", (
+    "rnbqkbnr/pppppppp/44/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/0p7/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/7/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KX - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3 0 1",
+))
+def test_invalid_fen(fen):
+    with pytest.raises(ValueError):
+        Board.from_fen(fen, verbose=0)
+
+
+def test_unmake_restores_the_repetition_counts():
+    board = Board(verbose=0)
+    play(board, "g1f3", "g8f6", "f3g1", "f6g8")
+    assert board.position_counts[board.zobrist_key] == 2
+    board.unmake_move()
+    board.unmake_move()
+    board.unmake_move()
+    board.unmake_move()
+    assert board.position_counts == {board.zobrist_key: 1}
+
+
+
+def test_threefold_repetition():
+    board = Board(verbose=0)
+    play(board, "g1f3", "g8f6", "f3g1", "f6g8", "g1f3", "g8f6", "f3g1")
+    assert not board.game_ended
+    play(board, "f6g8")
+    assert board.is_threefold_repetition()
+    assert board.game_ended and board.end_reason == Board.THREEFOLD_REPETITION and board.winner is None
+
+
+def test_fifty_moves_rule():
+    board = Board.from_fen("8/8/8/4k3/8/8/4K3/R7 w - - 98 80", verbose=0)
+    play(board, "a1a2")
+    assert not board.game_ended
+    play(board, "e5e6")
+    assert board.is_fifty_moves_rule()
+    assert board.game_ended and board.end_reason == Board.FIFTY_MOVES_RULE and board.winner is None
+
+
+def test_a_kill_resets_the_fifty_moves_clock():
+    board = Board.from_fen("8/8/8/4k3/8/8/4K3/r6R w - - 99 80", verbose=0)
+    play(board, "h1a1")
+    assert board.halfmove_clock == 0 and not board.game_ended
+
+
+@pytest.mark.parametrize("fen, insufficient", (
+    ("8/8/8/4k3/8/8/4K3/8 w - - 0 1", True),
+    ("8/8/8/4k3/8/8/4K3/4B3 w - - 0 1", True),
+    ("8/8/8/4k3/8/8/4K3/4N3 w - - 0 1", True),
+    ("8/8/8/4k3/8/8/4K3/2B1B3 w - - 0 1", True), #Bishops on cases of the same color
+    ("8/8/8/4k3/8/8/4K3/3BB3 w - - 0 1", False),
+    ("8/8/8/4k3/8/8/4K3/3NN3 w - - 0 1", False),
+    ("8/8/8/4k3/8/8/4K3/4R3 w - - 0 1", False),
+    ("8/8/8/4k3/8/8/4KP2/8 w - - 0 1", False),
+))
+def test_insufficient_material(fen, insufficient):
+    assert Board.from_fen(fen, verbose=0).is_insufficient_material() == insufficient
+
+
+def test_a_kill_leaving_insufficient_material_ends_the_game():
+    board = Board.from_fen("8/8/8/4k3/8/4r3/4K3/8 w - - 0 1", verbose=0)
+    play(board, "e2e3")
+    assert board.game_ended and board.end_reason == Board.INSUFFICIENT_MATERIAL and board.winner is None
+
+
+def test_undo_redo():
+    board = Board(verbose=0)
+    states = [full_state(board, with_version=False)]
+    for text in ("f2f3", "e7e5", "g2g4", "d8h4"):
+        play(board, text)
+        states.append(full_state(board, with_version=False))
+    assert board.end_reason == Board.CHECKMATE
+    for state in reversed(states[:-1]):
+        board.undo()
+        assert full_state(board, with_version=False) == state
+    with pytest.raises(ValueError):
+        board.undo()
+    for state in states[1:]:
+        assert board.can_redo()
+        board.redo()
+        assert full_state(board, with_version=False) == state
+    with pytest.raises(ValueError):
+        board.redo()
+
+
+def test_playing_a_move_drops_the_redo_moves():
+    board = Board(verbose=0)
+    play(board, "e2e4", "e7e5")
+    board.undo()
+    assert board.can_redo()
+    play(board, "c7c5")
+    assert not board.can_redo()
+    assert board.to_fen() == "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"
+
+
+def test_hypothesis_boards_share_the_move_history():
+    board = Board(verbose=0)
+    play(board, "e2e4", "e7e5", "g1f3")
+    state = full_state(board)
+    hypo_board = board.create_hypothesis_board()
+    assert list(hypo_board.move_history) == list(board.move_history)
+    play(hypo_board, "b8c6", "f1b5")
+    hypo_board.unmake_move()
+    hypo_board.unmake_move()
+    hypo_board.unmake_move() #a move played on board, its pieces are created again
+    assert len(hypo_board.move_history) == 2 and len(board.move_history) == 3
+    assert full_state(board) == state
+    hypo_board.unmake_move()
+    hypo_board.unmake_move()
+    assert hypo_board.to_fen() == Board.START_FEN
@@ -0,0 +1,83 @@
+import pytest
+from pygame_chess_api.api import Board, Move, Knight
+from pygame_chess_api.book import BookBuilder, OpeningBook, polyglot_key, encode_move, decode_move, write_book
+from pygame_chess_api.perft import move_from_text
+
+#positions of the Polyglot format specification, the last ones checking the en passant and castling rules
+POLYGLOT_KEYS = (
+    ((), 0x463b96181691fc9c),
+    (("e2e4",), 0x823c9b50fd114196),
+    (("e2e4", "d7d5"), 0x0756b94461c50fb0),
+    (("e2e4", "d7d5", "e4e5"), 0x662fafb965db29d4),
+    (("e2e4", "d7d5", "e4e5", "f7f5"), 0x22a48b5a8e47ff78),
+    (("e2e4", "d7d5", "e4e5", "f7f5", "e1e2"), 0x652a607ca3f242c1),
+    (("e2e4", "d7d5", "e4e5", "f7f5", "e1e2", "e8f7"), 0x00fdd303c946bdd9),
+    (("a2a4", "b7b5", "h2h4", "b5b4", "c2c4"), 0x3c8123ea7b067637),
+    (("a2a4", "b7b5", "h2h4", "b5b4", "c2c4", "b4c3", "a1a3"), 0x5c3f9b829b279560),
+)
+
+
+def board_after(moves) -> Board:
+    board = Board(verbose=0)
+    for text in moves:
+        board.make_move(move_from_text(board, text))
+    return board
+
+
+@pytest.mark.parametrize("moves, expected_key", POLYGLOT_KEYS)
+def test_polyglot_key(moves, expected_key):
+    assert polyglot_key(board_after(moves)) == expected_key
+
+
+def test_polyglot_key_from_fen():
+    #"e3" is given but no Black Pawn can kill en passant, so the column isn't part of the key
+    board = Board.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1", verbose=0)
+    assert polyglot_key(board) == 0x823c9b50fd114196
+
+
+def test_lookup_of_a_polyglot_book(tmp_path):
+    path = tmp_path / "book.bin"
+    #entries written with the Polyglot keys, like a book made by another program: e2e4 (code 0x031c) and d2d4 (0x02db) from the start position
+    write_book(path, [(0x463b96181691fc9c, 0x031c, 30, 0), (0x463b96181691fc9c, 0x02db, 10, 0), (0x823c9b50fd114196, 0x0ce4, 5, 0)])
+    with OpeningBook(str(path), random_seed=0) as book:
+        board = Board(verbose=0)
+        assert board in book
+        moves = book.moves(board)
+        assert [(move.piece.pos, move.target, weight) for move, weight in moves] == [((4, 6), (4, 4), 30), ((3, 6), (3, 4), 10)]
+        assert book.choose_move(board, best=True).target == (4, 4)
+        assert book.play(board).target in ((4, 4), (3, 4))
+        assert board_after(("d2d4", "d7d5")) not in book
+
+
+def test_book_builder(tmp_path):
+    builder = BookBuilder()
+    builder.add_game(["e2e4", "e7e5", "g1f3"])
+    builder.add_game(["e2e4", "c7c5"])
+    path = tmp_path / "book.bin"
+    builder.write(str(path))
+    with OpeningBook(str(path)) as book:
+        assert len(book) == 4
+        assert [(move.target, weight) for move, weight in book.moves(Board(verbose=0))] == [((4, 4), 2)]
+        assert {move.target for move, weight in book.moves(board_after(("e2e4",)))} == {(4, 3), (2, 3)}
+
+
+def test_move_encoding_round_trip():
+    board = Board.from_fen("r3k2r/1P6/8/8/8/8/8/R3K2R w KQkq - 0 1", verbose=0)
+    moves = board.legal_moves()
+    assert {move.special_type for move in moves} == {None, Move.CASTLING_TYPE, Move.TO_PROMOTE_TYPE}
+    for move in moves:
+        decoded = decode_move(encode_move(move), board)
+        assert (decoded.piece, decoded.target, decoded.special_type) == (move.piece, move.target, move.special_type)
+
+
+def test_move_from_text_sets_only_the_promotion_played():
+    board = Board.from_fen("4k3/PP6/8/8/8/8/8/4K3 w - - 0 1", verbose=0)
+    a_pawn, b_pawn = board.pieces_by_pos[(0, 1)], board.pieces_by_pos[(1, 1)]
+    promote_class_wanted = b_pawn.promote_class_wanted
+    move = move_from_text(board, "a7a8n")
+    assert move.piece is a_pawn and a_pawn.promote_class_wanted is Knight
+    assert b_pawn.promote_class_wanted is promote_class_wanted
+    with pytest.raises(ValueError):
+        move_from_text(board, "a7a8")
+    with pytest.raises(ValueError):
+        move_from_text(board, "e1e3")
@@ -0,0 +1,67 @@
+import pytest
+from pygame_chess_api.api import Board
+from pygame_chess_api.perft import REFERENCE_POSITIONS, move_to_text
+from test_board import full_state, play
+
+pytest.importorskip("numpy")
+from pygame_chess_api.dataset import Dataset, DatasetWriter, DRAW, BLACK_WON, UNKNOWN_RESULT
+
+
+def test_dataset_round_trip(tmp_path):
+    moves = ("g1f3", "g8f6", "f3g1", "f6g8", "g1f3", "g8f6", "f3g1", "f6g8")
+    board = Board(verbose=0)
+    play(board, *moves)
+    path = str(tmp_path / "positions.dat")
+    with DatasetWriter(path) as writer:
+        writer.append_game(board)
+        writer.append(Board.from_fen(REFERENCE_POSITIONS["kiwipete"][0], verbose=0))
+    with Dataset(path) as dataset:
+        assert len(dataset) == len(moves) + 2
+        replay = Board(verbose=0)
+        for index, text in enumerate(moves):
+            record_board = dataset.board(index)
+            assert record_board.to_fen().split()[:4] == replay.to_fen().split()[:4]
+            assert dataset[index]["result"] == DRAW and dataset[index]["color"] == replay.cur_color_turn
+            assert move_to_text(dataset.best_move(index, record_board)) == text
+            play(replay, text)
+        assert dataset.best_move(len(moves), dataset.board(len(moves))) is None
+        assert dataset.board(len(moves) + 1).to_fen().split()[:4] == REFERENCE_POSITIONS["kiwipete"][0].split()[:4]
+        assert dataset[len(moves) + 1]["result"] == UNKNOWN_RESULT
+        assert len(dataset.sample(3, seed=0)) == 3
+
+
+def test_dataset_rejects_other_files(tmp_path):
+    path = tmp_path / "other.dat"
+    path.write_bytes(b"not a dataset file")
+    with pytest.raises(ValueError):
+        Dataset(str(path))
+
+
+def test_append_game_leaves_the_board_unchanged(tmp_path):
+    board = Board(verbose=0)
+    play(board, "f2f3", "e7e5", "g2g4", "d8h4")
+    assert board.game_ended and board.winner == 1 and board.end_reason == Board.CHECKMATE
+    state = full_state(board)
+    pieces = dict(board.pieces_by_pos)
+    with DatasetWriter(str(tmp_path / "positions.dat")) as writer:
+        writer.append_game(board)
+    assert full_state(board) == state
+    assert board.pieces_by_pos == pieces
+    with Dataset(str(tmp_path / "positions.dat")) as dataset:
+        assert len(dataset) == 5 and set(dataset.records["result"]) == {BLACK_WON}
+        assert dataset.board(4).to_fen().split()[:4] == board.to_fen().split()[:4]
+
+
+def test_append_game_replays_promotions(tmp_path):
+    board = Board.from_fen("4k3/P7/8/8/8/8/8/4K3 w - - 0 1", verbose=0)
+    play(board, "a7a8n", "e8e7", "a8b6", "e7e6", "b6d7")
+    state = full_state(board)
+    with DatasetWriter(str(tmp_path / "positions.dat")) as writer:
+        writer.append_game(board)
+    assert full_state(board) == state
+    with Dataset(str(tmp_path / "positions.dat")) as dataset:
+        replay = dataset.board(0)
+        for index in range(len(dataset) - 1):
+            assert replay.to_fen().split()[:4] == dataset.board(index).to_fen().split()[:4]
+            replay.make_move(dataset.best_move(index, replay))
+        assert replay.to_fen().split()[:4] == board.to_fen().split()[:4]
@@ -0,0 +1,26 @@
+import pytest
+from pygame_chess_api.api import Board
+from pygame_chess_api.encoding import encode_many, decode_many, iter_decode, position_at, positions_count, POSITION_SIZE
+from pygame_chess_api.perft import REFERENCE_POSITIONS
+
+FENS = [fen for fen, expected_nodes in REFERENCE_POSITIONS.values()]
+
+
+def test_encoding_round_trip():
+    buffer = encode_many(Board.from_fen(fen, verbose=0) for fen in FENS)
+    assert len(buffer) == len(FENS) * POSITION_SIZE
+    assert positions_count(buffer) == len(FENS)
+    #the clocks aren't packed
+    assert [board.to_fen().split()[:4] for board in decode_many(buffer)] == [fen.split()[:4] for fen in FENS]
+    assert [board.to_fen() for board in iter_decode(bytearray(buffer))] == [board.to_fen() for board in decode_many(buffer)]
+    for index, fen in enumerate(FENS):
+        assert Board.from_bytes(position_at(buffer, index), verbose=0).to_fen().split()[:4] == fen.split()[:4]
+
+
+def test_encoding_errors():
+    buffer = encode_many([Board(verbose=0)])
+    with pytest.raises(ValueError):
+        positions_count(buffer + b"\0")
+    with pytest.raises(IndexError):
+        position_at(buffer, 1)
+
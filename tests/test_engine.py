@@ -0,0 +1,55 @@
+import pytest
+from pygame_chess_api.api import Board, Piece
+from pygame_chess_api.engine import Engine, TranspositionTable
+from pygame_chess_api.perft import REFERENCE_POSITIONS, move_to_text
+
+
+class CountingTable(TranspositionTable):
+    def __init__(self, size_power_of_two=16):
+        super().__init__(size_power_of_two)
+        self.hits = 0
+
+    def get(self, key:int) -> tuple or None:
+        entry = super().get(key)
+        self.hits += entry is not None
+        return entry
+
+
+@pytest.mark.parametrize("fen, expected", (
+    ("k7/8/1K6/8/8/8/8/7R w - - 0 1", "h1h8"),
+    ("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", "d1d8"),
+    ("3r2k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1", "d8d1"),
+))
+def test_finds_the_mate_in_one(fen, expected):
+    engine = Engine(max_depth=3, verbose=0)
+    board = Board.from_fen(fen, verbose=0)
+    assert move_to_text(engine.search(board)) == expected
+    assert engine.last_search_info["score"] == Engine.MATE_SCORE - 1
+    assert board.to_fen() == fen
+
+
+def test_plays_the_move_found():
+    engine = Engine(max_depth=2, verbose=0)
+    board = Board.from_fen("k7/8/1K6/8/8/8/8/7R w - - 0 1", verbose=0)
+    engine(board)
+    assert board.game_ended and board.end_reason == Board.CHECKMATE and board.winner == Piece.WHITE
+
+
+def test_no_move_allowed():
+    board = Board.from_fen("k7/2Q5/1K6/8/8/8/8/8 b - - 0 1", verbose=0)
+    assert Engine(max_depth=2, verbose=0).search(board) is None
+
+
+def test_transposition_table_hits():
+    engine = Engine(max_depth=3, verbose=0)
+    engine.transposition_table = CountingTable()
+    board = Board.from_fen(REFERENCE_POSITIONS["kiwipete"][0], verbose=0)
+    move = engine.search(board)
+    first_nodes = engine.nodes
+    assert first_nodes == engine.last_search_info["nodes"] > 0
+    assert engine.transposition_table.hits > 0
+    root_entry = engine.transposition_table.get(board.zobrist_key)
+    assert root_entry is not None and root_entry[4] == move.encode()
+    #the entries of the first search cut the second one
+    assert move_to_text(engine.search(board)) == move_to_text(move)
+    assert engine.nodes < first_nodes
@@ -0,0 +1,54 @@
+import pytest
+from pygame_chess_api.api import Board, Move, Queen, Knight
+from pygame_chess_api.encoding import encode_many
+from pygame_chess_api.perft import REFERENCE_POSITIONS
+from test_board import random_game_boards
+
+np = pytest.importorskip("numpy")
+from pygame_chess_api.evaluation import FeatureAccumulator, colors_from_bytes, evaluate, evaluate_many, features, features_from_bytes, features_many
+
+FENS = [fen for fen, expected_nodes in REFERENCE_POSITIONS.values()] + random_game_boards(0) + random_game_boards(1)
+
+
+def test_features_from_bytes_match_the_boards_features():
+    boards = [Board.from_fen(fen, verbose=0) for fen in FENS]
+    buffer = encode_many(boards)
+    positions_features = features_many(boards)
+    assert positions_features.shape == (len(boards), 768)
+    assert np.array_equal(features_from_bytes(buffer), positions_features)
+    assert np.array_equal(features_from_bytes(np.frombuffer(buffer, dtype=np.uint8).reshape(-1, Board.BYTES_SIZE)), positions_features)
+    assert list(colors_from_bytes(buffer)) == [board.cur_color_turn for board in boards]
+
+
+def test_evaluate_many_matches_evaluate():
+    boards = [Board.from_fen(fen, verbose=0) for fen in FENS]
+    scores = evaluate_many(boards)
+    assert [int(score) if board.cur_color_turn == 0 else -int(score) for board, score in zip(boards, scores)] == [evaluate(board) for board in boards]
+    assert evaluate(Board(verbose=0)) == 0
+
+
+def test_material_score_matches_the_board_totals():
+    for fen in FENS:
+        board = Board.from_fen(fen, verbose=0)
+        material, piece_square_scores = board.material, board.piece_square_scores
+        expected = (material[0] - material[1]) * 100 + piece_square_scores[0] - piece_square_scores[1]
+        assert FeatureAccumulator(board).material_score == expected
+
+
+@pytest.mark.parametrize("name", REFERENCE_POSITIONS)
+def test_feature_accumulator_update_revert_round_trip(name):
+    board = Board.from_fen(REFERENCE_POSITIONS[name][0], verbose=0)
+    accumulator = FeatureAccumulator(board)
+    root_features, root_score = accumulator.features.copy(), accumulator.material_score
+    for move in board.legal_moves():
+        for promote_class in (Queen, Knight) if move.special_type == Move.TO_PROMOTE_TYPE else (None,):
+            if promote_class is not None:
+                move.piece.promote_class_wanted = promote_class
+            board.make_move(move)
+            accumulator.update()
+            assert np.array_equal(accumulator.features, features(board))
+            assert accumulator.material_score == FeatureAccumulator(board).material_score
+            assert accumulator.evaluate() == int(evaluate_many([board])[0])
+            accumulator.revert()
+            board.unmake_move()
+            assert np.array_equal(accumulator.features, root_features) and accumulator.material_score == root_score
@@ -0,0 +1,48 @@
+import pytest
+from pygame_chess_api.api import Board, Check
+from pygame_chess_api.metrics import Metrics, MEASURED_METHODS
+from pygame_chess_api.perft import perft
+
+
+def test_counts_only_while_enabled():
+    original_methods = {(cls, method_name): cls.__dict__[method_name] for cls, method_name, metric, true_metric in MEASURED_METHODS}
+    metrics = Metrics()
+    perft(Board(verbose=0), 2)
+    assert metrics.counts == {} and not metrics.enabled
+    with metrics:
+        assert metrics.enabled
+        assert all(cls.__dict__[method_name] is not original_methods[(cls, method_name)] for cls, method_name in original_methods)
+        board = Board(verbose=0)
+        perft(board, 2)
+    counts = dict(metrics.counts)
+    assert counts["legal_moves"] == 21 and counts["moves_generation.Pawn"] > 0 and metrics.times["legal_moves"] > 0
+    assert all(cls.__dict__[method_name] is original_methods[(cls, method_name)] for cls, method_name in original_methods)
+    perft(board, 2)
+    assert metrics.counts == counts
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_only_one_metrics_enabled():
+    with Metrics():
+        with pytest.raises(ValueError):
+            Metrics().enable()
+
+
+def test_a_base_method_called_by_an_override_is_counted_once():
+    board = Board.from_fen("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1", verbose=0)
+    check, rook = board.pieces_by_pos[(4, 7)], board.pieces_by_pos[(0, 7)]
+    assert isinstance(check, Check)
+    with Metrics() as metrics:
+        check_moves = list(check.iter_moves_allowed())
+        rook_moves = list(rook.iter_moves_allowed())
+    assert metrics.counts["moves_iteration.Check"] == 1 and metrics.counts["moves_iteration.Check.moves"] == len(check_moves)
+    assert metrics.counts["moves_iteration.Piece"] == 1 and metrics.counts["moves_iteration.Piece.moves"] == len(rook_moves)
+
+
+def test_generators_closed_early():
+    with Metrics() as metrics:
+        board = Board(verbose=0)
+        next(board.iter_legal_moves())
+    assert metrics.counts["legal_moves_iteration"] == 1 and metrics.counts["legal_moves_iteration.moves"] == 1
+    assert "new_turn" not in metrics.counts
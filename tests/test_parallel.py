@@ -0,0 +1,29 @@
+import pytest
+from pygame_chess_api.api import Board
+from pygame_chess_api.engine import Engine
+from pygame_chess_api.parallel import ParallelEngine
+from pygame_chess_api.perft import REFERENCE_POSITIONS, move_to_text
+
+
+@pytest.fixture(scope="module")
+def parallel_engine():
+    with ParallelEngine(max_depth=2, processes=2, verbose=0) as parallel_engine:
+        yield parallel_engine
+
+
+@pytest.mark.parametrize("name", ("start position", "kiwipete", "position 3", "position 4"))
+def test_same_move_and_score_as_the_engine(parallel_engine, name):
+    fen = REFERENCE_POSITIONS[name][0]
+    engine = Engine(max_depth=2, verbose=0)
+    move = engine.search(Board.from_fen(fen, verbose=0))
+    parallel_move = parallel_engine.search(Board.from_fen(fen, verbose=0))
+    assert move_to_text(parallel_move) == move_to_text(move)
+    assert parallel_engine.last_search_info["score"] == engine.last_search_info["score"]
+    assert parallel_engine.last_search_info["depth"] == 2 and parallel_engine.last_search_info["nodes"] > 0
+
+
+def test_search_leaves_the_board_unchanged(parallel_engine):
+    board = Board.from_fen(REFERENCE_POSITIONS["kiwipete"][0], verbose=0)
+    fen = board.to_fen()
+    move = parallel_engine.search(board)
+    assert board.to_fen() == fen and board.pieces_by_pos[move.piece.pos] is move.piece
@@ -0,0 +1,35 @@
+import pytest
+from pygame_chess_api.api import Board
+from pygame_chess_api.perft import perft, divide, REFERENCE_POSITIONS
+
+
+@pytest.mark.parametrize("use_bitboards", (False, True), ids=("dict", "bitboards"))
+@pytest.mark.parametrize("name", REFERENCE_POSITIONS)
+def test_perft(name, use_bitboards):
+    fen, expected_nodes = REFERENCE_POSITIONS[name]
+    board = Board.from_fen(fen, verbose=0, use_bitboards=use_bitboards)
+    for depth in (1, 2, 3):
+        assert perft(board, depth) == expected_nodes[depth]
+    assert board.to_fen() == fen
+
+
+
+def test_divide_sums_to_perft():
+    board = Board.from_fen(REFERENCE_POSITIONS["position 4"][0], verbose=0)
+    counts = divide(board, 2)
+    assert len(counts) == REFERENCE_POSITIONS["position 4"][1][1]
+    assert sum(counts.values()) == REFERENCE_POSITIONS["position 4"][1][2]
+
+
+@pytest.mark.parametrize("use_bitboards", (False, True), ids=("dict", "bitboards"))
+@pytest.mark.parametrize("name", REFERENCE_POSITIONS)
+def test_lazy_generators_match_legal_moves(name, use_bitboards):
+    board = Board.from_fen(REFERENCE_POSITIONS[name][0], verbose=0, use_bitboards=use_bitboards)
+    for move in board.legal_moves():
+        board.make_move(move)
+        expected = sorted((move.piece.pos, move.target, move.type, move.special_type) for move in board.legal_moves())
+        board.clear_moves_cache()
+        assert sorted((move.piece.pos, move.target, move.type, move.special_type) for move in board.iter_legal_moves()) == expected
+        board.clear_moves_cache()
+        assert board.has_legal_move() == bool(expected)
+        board.unmake_move()
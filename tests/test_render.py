@@ -0,0 +1,204 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import time
+import queue
+import asyncio
+import threading
+import pytest
+import pygame
+from pygame_chess_api.api import Board, Knight, Queen
+from pygame_chess_api.engine import Engine
+from pygame_chess_api.perft import move_from_text
+from pygame_chess_api.render import AssetCache, BackgroundAI, Gui, SpectatorGui
+from pygame_chess_api.selfplay import random_ai
+
+MATE_IN_ONE = "k7/8/1K6/8/8/8/8/7R w - - 0 1"
+
+
+def poll_until_played(background_ai:BackgroundAI, board:Board, timeout=10) -> bool:
+    t_end = time.perf_counter() + timeout
+    while time.perf_counter() < t_end:
+        if background_ai.poll(board):
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_background_ai_plays_its_move():
+    background_ai = BackgroundAI(Engine(max_depth=2, verbose=0))
+    board = Board.from_fen(MATE_IN_ONE, verbose=0)
+    background_ai.start(board)
+    assert poll_until_played(background_ai, board)
+    assert board.game_ended and board.end_reason == Board.CHECKMATE
+    assert background_ai.future is None and not background_ai.poll(board)
+    background_ai.close()
+
+
+def test_background_ai_stop_ends_the_search():
+    engine = Engine(max_depth=30, verbose=0)
+    background_ai = BackgroundAI(engine)
+    board = Board(verbose=0)
+    background_ai.start(board)
+    time.sleep(0.05)
+    background_ai.stop()
+    assert background_ai.future.result(timeout=10) is not None
+    assert engine.last_search_info["depth"] < 30
+    assert background_ai.poll(board) and len(board.move_history) == 1
+    background_ai.close()
+
+
+def test_background_ai_close_stops_the_running_search():
+    background_ai = BackgroundAI(Engine(max_depth=30, verbose=0))
+    background_ai.start(Board(verbose=0))
+    future = background_ai.future
+    time.sleep(0.05)
+    background_ai.close()
+    assert background_ai.future is None and future.result(timeout=10) is not None
+
+
+def test_background_ai_time_budget_cancels_an_awaitable():
+    async def async_ai(board:Board):
+        try:
+            await asyncio.sleep(100)
+        except asyncio.CancelledError:
+            random_ai(board) #plays its best move found
+            raise
+    background_ai = BackgroundAI(async_ai, time_budget=0.05)
+    board = Board(verbose=0)
+    background_ai.start(board)
+    assert poll_until_played(background_ai, board)
+    assert len(board.move_history) == 1
+    background_ai.close()
+
+
+def test_background_ai_ignores_a_move_for_an_old_position():
+    background_ai = BackgroundAI(random_ai)
+    board = Board(verbose=0)
+    background_ai.start(board)
+    background_ai.future.result(timeout=10)
+    random_ai(board) #the position changed during the search
+    assert not background_ai.poll(board) and len(board.move_history) == 1
+    background_ai.close()
+
+
+def test_spectator_plays_the_messages():
+    spectator = SpectatorGui(2, verbose=0)
+    assert spectator.send_new_game(7)
+    for text in ("e2e4", "e7e5", "g1f3"):
+        assert spectator.send_move(7, text)
+    spectator.send_new_game(8, "4k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+    spectator.send_move(8, "a7a8n")
+    assert spectator.read_messages() == 6 and spectator.dropped_messages == 0
+    assert spectator.boards[0].to_fen() == "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"
+    assert isinstance(spectator.boards[1].pieces_by_pos[(0, 0)], Knight)
+
+
+def test_spectator_drops_the_messages_it_cant_play():
+    spectator = SpectatorGui(1, idle_seconds=60, verbose=0)
+    assert not spectator.apply_message((0, "e2e4")) #no game started
+    assert spectator.apply_message((0, None, None))
+    assert not spectator.apply_message((0, "e2e5"))
+    assert not spectator.apply_message((0, "e7e5")) #not the turn of Black
+    assert not spectator.apply_message((1, None, None)) #the only tile shows a game in progress
+    assert not spectator.apply_message((0, None, "not a fen"))
+    assert spectator.dropped_messages == 5
+    assert spectator.apply_message((0, "e2e4"))
+
+
+def test_spectator_gives_the_tile_of_an_ended_game():
+    spectator = SpectatorGui(1, idle_seconds=60, verbose=0)
+    spectator.apply_message((0, None, None))
+    for text in ("f2f3", "e7e5", "g2g4", "d8h4"):
+        assert spectator.apply_message((0, text))
+    assert spectator.boards[0].game_ended
+    assert spectator.apply_message((1, None, None))
+    assert not spectator.apply_message((0, "e2e4")) #game 0 lost its tile
+    assert spectator.apply_message((1, "e2e4"))
+
+
+def test_spectator_counts_the_messages_dropped_by_every_thread():
+    spectator = SpectatorGui(1, move_queue=queue.Queue(10), verbose=0)
+    threads = [threading.Thread(target=lambda: [spectator.send_move(0, "e2e4") for i in range(2000)]) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert spectator.dropped_messages == 4 * 2000 - 10
+
+
+@pytest.fixture
+def gui():
+    pygame.display.init()
+    gui = Gui(Board(verbose=0), verbose=0, SCREEN_SIZE=(400, 400))
+    gui.screen = pygame.display.set_mode(gui.SCREEN_SIZE)
+    gui.generate_textures()
+    gui._background = gui.render_background()
+    yield gui
+    pygame.display.quit()
+
+
+def full_drawing(gui:Gui) -> bytes:
+    gui._drawn_layers, gui.need_screen_update = None, True
+    gui.draw_board()
+    return pygame.image.tostring(gui.screen, "RGB")
+
+
+def test_gui_draws_only_the_cases_changed(gui, monkeypatch):
+    gui.draw_board()
+    updated_rects = []
+    monkeypatch.setattr(pygame.display, "update", lambda rects=None: updated_rects.append(rects))
+    gui.draw_board()
+    assert updated_rects == [] #nothing to draw
+    for text in ("e2e4", "f7f6", "d1h5"):
+        move = move_from_text(gui.board, text)
+        gui.board.move_piece(move.piece, move)
+    gui.need_screen_update = True
+    gui.draw_board()
+    #the moved pieces' cases and the Check in check
+    assert sorted(map(tuple, updated_rects[-1])) == sorted(tuple(gui.case_rect(pos)) for pos in ((4, 6), (4, 4), (5, 1), (5, 2), (3, 7), (7, 3), (4, 0)))
+    drawing = pygame.image.tostring(gui.screen, "RGB")
+    assert full_drawing(gui) == drawing
+
+
+def test_asset_cache_loads_and_scales_each_image_once(monkeypatch):
+    loads = []
+    load = pygame.image.load
+    monkeypatch.setattr(pygame.image, "load", lambda path: loads.append(os.path.basename(path)) or load(path))
+    cache = AssetCache(Gui.ASSETS_FOLDER, verbose=0)
+    texture = cache.texture("white_square.png", (40, 40))
+    assert texture.get_size() == (40, 40) and cache.texture("white_square.png", (40, 40)) is texture
+    cache.texture("white_square.png", (50, 50))
+    assert loads == ["white_square.png"]
+
+
+def test_asset_cache_packs_the_pieces_in_an_atlas():
+    cache = AssetCache(Gui.ASSETS_FOLDER, verbose=0)
+    textures = [cache.piece_texture(piece_name, color, (30, 30)) for piece_name in AssetCache.PIECES_NAMES for color in (0, 1)]
+    atlas = textures[0].get_parent()
+    assert atlas.get_size() == (30 * len(AssetCache.PIECES_NAMES), 60)
+    assert all(texture.get_parent() is atlas and texture.get_size() == (30, 30) for texture in textures)
+    assert cache.piece_texture("queen", 1, (30, 30)) is textures[3]
+
+
+def test_asset_cache_converts_the_textures_once_the_display_is_set():
+    pygame.display.init()
+    cache = AssetCache(Gui.ASSETS_FOLDER, verbose=0)
+    texture = cache.texture("black_square.png", (20, 20))
+    queen = cache.piece_texture("queen", 0, (20, 20))
+    pygame.display.set_mode((100, 100))
+    converted_texture = cache.texture("black_square.png", (20, 20))
+    converted_queen = cache.piece_texture("queen", 0, (20, 20))
+    assert converted_texture is not texture and cache.texture("black_square.png", (20, 20)) is converted_texture
+    assert converted_queen is not queen and cache.piece_texture("queen", 0, (20, 20)) is converted_queen
+    pygame.display.quit()
+
+
+def test_guis_share_their_textures():
+    first_gui = Gui(Board(verbose=0), verbose=0, SCREEN_SIZE=(320, 320))
+    queen_texture = Queen.WHITE_TEXTURE
+    Gui(Board(verbose=0), verbose=0, SCREEN_SIZE=(320, 320))
+    assert Queen.WHITE_TEXTURE is queen_texture
+    first_gui.resize((400, 400))
+    assert Queen.WHITE_TEXTURE.get_size() == (50, 50)
+    first_gui.resize((320, 320))
+    assert Queen.WHITE_TEXTURE is queen_texture
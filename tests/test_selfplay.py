@@ -0,0 +1,57 @@
+import json
+import queue
+from pygame_chess_api.api import Board
+from pygame_chess_api.engine import Engine
+from pygame_chess_api.perft import move_from_text
+from pygame_chess_api.selfplay import play_game, random_ai, run_selfplay
+
+MATE_IN_ONE = "k7/8/1K6/8/8/8/8/7R w - - 0 1"
+
+
+def replay(result:dict, fen=None) -> Board:
+    board = Board(verbose=0) if fen is None else Board.from_fen(fen, verbose=0)
+    for text in result["moves"]:
+        move = move_from_text(board, text)
+        assert board.move_piece(move.piece, move) is not None
+    return board
+
+
+def test_run_selfplay_writes_a_json_line_by_game(tmp_path):
+    path = tmp_path / "games.jsonl"
+    stats = run_selfplay(random_ai, random_ai, 6, str(path), processes=2, max_plies=40, verbose=0)
+    results = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(result["game"] for result in results) == list(range(6))
+    assert stats["games"] == 6 and stats["white_wins"] + stats["black_wins"] + stats["draws"] == 6
+    assert stats["plies"] == sum(result["plies"] for result in results)
+    for result in results:
+        assert set(result) == {"game", "moves", "winner", "plies", "ending", "time"}
+        assert len(result["moves"]) == result["plies"] <= 40
+        board = replay(result)
+        assert (board.end_reason if board.game_ended else "max plies") == result["ending"]
+        assert result["winner"] == (board.winner if board.game_ended else None)
+
+
+def test_play_game_from_a_fen():
+    result = play_game(Engine(max_depth=2, verbose=0), random_ai, fen=MATE_IN_ONE)
+    assert result["moves"] == ["h1h8"] and result["winner"] == 0 and result["ending"] == Board.CHECKMATE
+
+
+def test_play_game_sends_its_moves():
+    move_queue = queue.Queue()
+    result = play_game(random_ai, random_ai, max_plies=10, move_queue=move_queue, game_index=3)
+    messages = [move_queue.get_nowait() for i in range(move_queue.qsize())]
+    assert messages == [(3, None, None)] + [(3, text) for text in result["moves"]]
+
+
+def test_play_game_sends_the_position_after_a_dropped_message():
+    move_queue = queue.Queue(2)
+    received = []
+    def late_spectator_ai(board:Board):
+        if len(board.move_history) == 2: #the message of the 2nd move has been dropped
+            while not move_queue.empty():
+                received.append(move_queue.get_nowait())
+        random_ai(board)
+    result = play_game(late_spectator_ai, late_spectator_ai, max_plies=4, move_queue=move_queue)
+    received += [move_queue.get_nowait() for i in range(move_queue.qsize())]
+    fen_after_3_moves = replay({"moves": result["moves"][:3]}).to_fen()
+    assert received == [(0, None, None), (0, result["moves"][0]), (0, None, fen_after_3_moves), (0, result["moves"][3])]
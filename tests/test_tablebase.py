@@ -0,0 +1,78 @@
+import os
+import shutil
+import pytest
+from pygame_chess_api.api import Board, Rook
+
+pytest.importorskip("numpy")
+from pygame_chess_api.tablebase import Tablebase, generate_table
+from pygame_chess_api.perft import move_to_text
+
+
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tables"))
+    generate_table("KPvK", directory, verbose=0) #with KQvK, KRvK, KBvK, KNvK and KvK
+    tablebase = Tablebase(directory)
+    yield tablebase
+    tablebase.close()
+
+
+@pytest.mark.parametrize("fen, expected", (
+    ("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1", (1, 1)), #Qg8 checkmates
+    ("k7/8/1K6/8/8/8/8/7Q w - - 0 1", None), #illegal, the side not to play is in check
+    ("k6Q/8/1K6/8/8/8/8/8 b - - 0 1", (-1, 0)), #checkmated
+    ("k7/2Q5/1K6/8/8/8/8/8 b - - 0 1", (0, 0)), #stalemate
+    ("k7/1Q6/8/8/8/8/8/7K b - - 0 1", (0, 0)), #the Queen is killed
+    ("k7/8/1K6/8/8/8/8/7R w - - 0 1", (1, 1)), #Rh8 checkmates
+    ("R1k5/8/2K5/8/8/8/8/8 b - - 0 1", (-1, 0)), #checkmated
+    ("k7/R7/8/8/8/8/8/7K b - - 0 1", (0, 0)), #the Rook is killed
+    ("7r/8/8/8/8/1k6/8/K7 b - - 0 1", (1, 1)), #KRvK with the colors swapped, Rh1 checkmates
+))
+def test_known_positions(tablebase, fen, expected):
+    assert tablebase.probe(Board.from_fen(fen, verbose=0)) == expected
+
+
+def test_wins_take_longer_from_far(tablebase):
+    board = Board.from_fen("8/8/8/3k4/8/8/8/K6R w - - 0 1", verbose=0)
+    assert tablebase.probe_wdl(board) == 1
+    assert tablebase.probe(board)[1] > 10
+
+
+def test_best_move(tablebase):
+    board = Board.from_fen("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1", verbose=0)
+    assert move_to_text(tablebase.best_move(board)) == "g1g8"
+
+
+def test_positions_out_of_the_tables(tablebase):
+    assert tablebase.probe(Board(verbose=0)) is None
+    assert tablebase.probe(Board.from_fen("k7/8/1K6/8/8/8/8/6BB w - - 0 1", verbose=0)) is None
+
+
+def test_best_move_tries_each_promotion(tablebase):
+    board = Board.from_fen("8/1P6/k7/8/K7/8/8/8 w - - 0 1", verbose=0) #b8=Q stalemates
+    pawn = board.pieces_by_pos[(1, 1)]
+    assert pawn.promote_class_wanted is None
+    move = tablebase.best_move(board)
+    assert move_to_text(move) == "b7b8r" and pawn.promote_class_wanted is Rook
+    board.make_move(move)
+    assert tablebase.probe(board) == (-1, 12)
+
+
+def test_best_move_leaves_the_pawns_unchanged(tablebase):
+    board = Board.from_fen("3K4/kP6/8/8/8/8/8/8 w - - 0 1", verbose=0) #b8 is defended by the Check in a7
+    fen = board.to_fen()
+    assert move_to_text(tablebase.best_move(board)) == "d8c7"
+    assert board.pieces_by_pos[(1, 1)].promote_class_wanted is None and board.to_fen() == fen
+
+
+def test_best_move_skips_the_moves_out_of_the_tables(tablebase, tmp_path):
+    for signature in tablebase.tables:
+        if signature != "KQvK":
+            shutil.copy(tablebase.tables[signature], tmp_path)
+    partial_tablebase = Tablebase(str(tmp_path))
+    board = Board.from_fen("k7/2P5/1K6/8/8/8/8/8 w - - 0 1", verbose=0)
+    assert tablebase.probe(board) == (1, 1)
+    assert move_to_text(tablebase.best_move(board)) == "c7c8q"
+    assert move_to_text(partial_tablebase.best_move(board, search_depth=0)) == "c7c8r" #c8=Q isn't counted as a draw
+    assert move_to_text(partial_tablebase.best_move(board)) == "c7c8q" #the search finds that it checkmates
+    partial_tablebase.close()